@@ -7,8 +7,9 @@ as a source even if we haven't verified the specific address. This provides a pa
 for future verification.
 """
 
-import json
-import glob
+import os
+
+from branch_store import BranchStore, REPO_ROOT
 
 # Known chain store locators
 CHAIN_LOCATORS = {
@@ -47,21 +48,12 @@ def add_chain_locator_sources():
         'files_modified': set()
     }
     
-    files = glob.glob("supply-house-directory/us/**/*.json", recursive=True)
+    store = BranchStore.load()
     
-    for file_path in files:
-        if "/_meta/" in file_path or "STATEWIDE" in file_path:
-            continue
-        
-        modified = False
-        
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+    for branch_file in store.files:
+        file_path = os.path.relpath(branch_file.path, REPO_ROOT)
         
-        if "branches" not in data:
-            continue
-        
-        for branch in data["branches"]:
+        for branch in branch_file.branches:
             stats['total_processed'] += 1
             verification = branch.get('verification', {})
             
@@ -93,7 +85,7 @@ def add_chain_locator_sources():
                 stats['sources_added'] += 1
                 stats['branches_updated'] += 1
                 stats['files_modified'].add(file_path)
-                modified = True
+                branch_file.mark_modified()
                 
                 # Update verification metadata to indicate this needs verification
                 if 'verification' not in branch:
@@ -104,12 +96,9 @@ def add_chain_locator_sources():
                         branch['verification']['addressSource'] = "Chain reference (requires direct verification)"
                     else:
                         branch['verification']['addressSource'] = "Chain store locator (requires address verification)"
-        
-        # Write back if modified
-        if modified:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                f.write('\n')
+    
+    # Write back modified files
+    store.save_modified()
     
     return stats
 
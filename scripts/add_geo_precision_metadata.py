@@ -10,12 +10,14 @@ This script adds the following optional fields based on existing verification da
 These fields enhance routing accuracy tracking and prevent future degradation of coordinate precision.
 """
 
-import json
+import argparse
 import os
 import sys
-from pathlib import Path
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+from file_pool import add_workers_argument, map_files
+
 
 def determine_geo_precision(branch):
     """
@@ -134,73 +136,35 @@ def add_geo_metadata_to_branch(branch):
     return added
 
 
-def process_json_file(file_path):
+def process_branch_file(branch_file):
     """
-    Process a single JSON file to add geo precision metadata to all branches.
+    Add geo precision metadata to all branches in a branch file, in a single pass.
     
-    Returns (total_branches, updated_branches) tuple.
+    Marks the file modified if anything changed; writing is left to the
+    caller. Returns (total_branches, updated_branches) tuple.
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        branches = data.get("branches", [])
-        if not branches:
-            return (0, 0)
-        
-        total = len(branches)
-        updated = 0
-        
-        for branch in branches:
-            if add_geo_metadata_to_branch(branch):
-                updated += 1
-        
-        # Write back to file with proper formatting
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-            f.write('\n')  # Add trailing newline
-        
-        return (total, updated)
+    total = 0
+    updated = 0
     
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}", file=sys.stderr)
-        return (0, 0)
-
-
-def find_branch_files(base_dir):
-    """
-    Find all JSON files containing branch data.
+    for branch in branch_file.branches:
+        total += 1
+        if add_geo_metadata_to_branch(branch):
+            updated += 1
     
-    Excludes metadata files in _meta directories.
-    """
-    branch_files = []
-    
-    for root, dirs, files in os.walk(base_dir):
-        # Skip _meta directories
-        if '_meta' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.json') and not file.startswith('_'):
-                file_path = os.path.join(root, file)
-                
-                # Quick check if file contains branches
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if "branches" in data:
-                            branch_files.append(file_path)
-                except:
-                    pass  # Skip files that can't be parsed
+    if updated:
+        branch_file.mark_modified()
     
-    return sorted(branch_files)
+    return (total, updated)
 
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Add geolocation precision metadata to branches.")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+    
     # Determine base directory
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    repo_root = REPO_ROOT
     supply_dir = repo_root / "supply-house-directory"
     
     if not supply_dir.exists():
@@ -214,8 +178,9 @@ def main():
     print(f"Scanning: {supply_dir}")
     print()
     
-    # Find all branch files
-    branch_files = find_branch_files(supply_dir)
+    # Discover branch files; each is streamed and rewritten in one pass
+    store = BranchStore.stream(supply_dir, rewrite=True)
+    branch_files = store.files
     
     if not branch_files:
         print("No branch files found!", file=sys.stderr)
@@ -229,9 +194,14 @@ def main():
     total_updated = 0
     files_modified = 0
     
-    for file_path in branch_files:
-        rel_path = os.path.relpath(file_path, repo_root)
-        branches, updated = process_json_file(file_path)
+    for result in map_files(process_branch_file, branch_files, workers=args.workers):
+        rel_path = os.path.relpath(result.branch_file.path, repo_root)
+        
+        if result.error:
+            print(f"Error processing {result.branch_file.path}: {result.error}", file=sys.stderr)
+            continue
+        
+        branches, updated = result.stats
         
         total_branches += branches
         total_updated += updated
@@ -4,8 +4,10 @@ Analyze address verification status across all supply house branches.
 """
 
 import json
-import glob
-from collections import defaultdict
+import os
+
+from branch_store import BranchStore, REPO_ROOT
+from keyword_matcher import keyword_categories
 
 def analyze_verification_status():
     stats = {
@@ -17,83 +19,61 @@ def analyze_verification_status():
         'needs_review': []
     }
     
-    authoritative_sources = [
-        'google business',
-        'google maps',
-        'store locator',
-        'official website',
-        'company location'
-    ]
-    
-    non_authoritative_sources = [
-        'manufacturer line card',
-        'line card',
-        'directory',
-        'manufacturer tools'
-    ]
+    store = BranchStore.load()
     
-    files = glob.glob("supply-house-directory/us/**/*.json", recursive=True)
+    for rel_path, error in store.load_errors:
+        print(f"Error processing {rel_path}: {error}")
     
-    for file_path in files:
-        if "/_meta/" in file_path:
-            continue
+    for branch_file in store.files:
+        file_path = os.path.relpath(branch_file.path, REPO_ROOT)
+        
+        for branch in branch_file.branches:
+            stats['total_branches'] += 1
+            branch_id = branch.get('id', 'unknown')
+            branch_name = branch.get('name', 'unknown')
             
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                
-            if "branches" not in data:
-                continue
-                
-            for branch in data["branches"]:
-                stats['total_branches'] += 1
-                branch_id = branch.get('id', 'unknown')
-                branch_name = branch.get('name', 'unknown')
-                
-                issues = []
-                
-                if branch.get('lat') is None or branch.get('lon') is None:
-                    stats['missing_coords'] += 1
-                    issues.append('Missing coordinates')
-                
-                verification = branch.get('verification', {})
+            issues = []
+            
+            if branch.get('lat') is None or branch.get('lon') is None:
+                stats['missing_coords'] += 1
+                issues.append('Missing coordinates')
+            
+            verification = branch.get('verification', {})
+            
+            if not verification:
+                stats['missing_verification'] += 1
+                issues.append('No verification metadata')
+            else:
+                if 'addressVerified' not in verification:
+                    issues.append('Missing addressVerified field')
                 
-                if not verification:
-                    stats['missing_verification'] += 1
-                    issues.append('No verification metadata')
-                else:
-                    if 'addressVerified' not in verification:
-                        issues.append('Missing addressVerified field')
+                # Only check for non-authoritative sources if branch is NOT verified
+                # If addressVerified is True, we trust the verification metadata
+                if not verification.get('addressVerified'):
+                    sources = branch.get('sources', []) + [branch.get('notes', '')]
+                    source_hits = keyword_categories(' '.join(str(s) for s in sources))
                     
-                    # Only check for non-authoritative sources if branch is NOT verified
-                    # If addressVerified is True, we trust the verification metadata
-                    if not verification.get('addressVerified'):
-                        sources = branch.get('sources', []) + [branch.get('notes', '')]
-                        sources_text = ' '.join(str(s).lower() for s in sources)
-                        
-                        has_authoritative = any(auth in sources_text for auth in authoritative_sources)
-                        has_non_authoritative = any(non_auth in sources_text for non_auth in non_authoritative_sources)
-                        
-                        if has_non_authoritative and not has_authoritative:
-                            stats['non_authoritative_source'] += 1
-                            issues.append('Only non-authoritative sources')
-                
-                accuracy = branch.get('accuracy', {})
-                if accuracy.get('coordinates') in ['approx', 'needs_geocoding', 'approximate']:
-                    stats['approx_coords'] += 1
-                    issues.append('Approximate or needs geocoding')
-                
-                if issues:
-                    stats['needs_review'].append({
-                        'id': branch_id,
-                        'name': branch_name,
-                        'file': file_path,
-                        'address': f"{branch.get('address1', '')}, {branch.get('city', '')}",
-                        'issues': issues
-                    })
+                    # Keyword lists live in keyword_matcher.KEYWORDS
+                    has_authoritative = 'authoritative_source' in source_hits
+                    has_non_authoritative = 'non_authoritative_source' in source_hits
                     
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
+                    if has_non_authoritative and not has_authoritative:
+                        stats['non_authoritative_source'] += 1
+                        issues.append('Only non-authoritative sources')
+            
+            accuracy = branch.get('accuracy', {})
+            if accuracy.get('coordinates') in ['approx', 'needs_geocoding', 'approximate']:
+                stats['approx_coords'] += 1
+                issues.append('Approximate or needs geocoding')
+            
+            if issues:
+                stats['needs_review'].append({
+                    'id': branch_id,
+                    'name': branch_name,
+                    'file': file_path,
+                    'address': f"{branch.get('address1', '')}, {branch.get('city', '')}",
+                    'issues': issues
+                })
     
     return stats
 
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the branch tooling.
+
+Times the operations every script and engine depends on, against the real
+us/co data or a generated dataset:
+
+- cold load (fresh interpreter) and warm load of the index hierarchy
+- each validator's per-file logic and the single-pass validation engine
+- road-snap risk scoring, per branch and batched
+- duplicate detection
+- spatial index build and nearest/radius queries, plus lazily loaded nearest
+  queries from a cold start
+- filter index build and filtered queries, and typeahead text queries
+- JSON write-back of whole files, and the streamed read-and-rewrite pass
+  the migration scripts now use (both into a temp directory)
+
+Each benchmark is a function registered with @benchmark that does its setup
+and returns a zero-argument callable; only the callable is timed. Results are
+written as JSON. With --compare, the run is checked against an earlier
+result file and exits non-zero when a benchmark's best time (the least noisy
+statistic for short runs) slows down by more than --threshold.
+
+Usage:
+    python3 scripts/benchmark.py
+    python3 scripts/benchmark.py --synthetic 100k --repeat 3 -o build/bench-100k.json
+    python3 scripts/benchmark.py --compare build/benchmark-results.json
+"""
+
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+
+import detect_road_centerline_coords as centerline
+import identify_road_snapped_coords as road_snap
+import validate_arrival_coordinates as arrival
+import validate_geo_precision as geo_precision
+from branch_store import BranchStore, DEFAULT_ROOT, REPO_ROOT, write_json, write_json_atomic
+from dedup_engine import DedupEngine
+from filter_index import FilterIndex
+from generate_synthetic_dataset import DatasetGenerator
+from lazy_store import LazyBranchStore
+from risk_batch import RiskFeatures, score_features
+from text_index import TextIndex, tokenize
+from geo_index import GeoIndex
+from json_stream import BranchReader, BranchWriter
+from validation_engine import ValidationEngine
+
+
+DEFAULT_OUTPUT = REPO_ROOT / "build" / "benchmark-results.json"
+
+# Synthetic dataset presets: (states, metros per state, branches per metro)
+SYNTHETIC_SIZES = {
+    "10k": (5, 10, 200),
+    "100k": (25, 20, 200),
+    "1m": (50, 20, 1000),
+}
+
+# Number of queries per query benchmark
+QUERY_COUNT = 1000
+
+# Slowdowns smaller than this many seconds are treated as noise
+MIN_REGRESSION_SECONDS = 0.005
+
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name):
+    """Register a benchmark. The function gets a BenchContext and returns the timed callable."""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class BenchContext:
+    """Shared state for one benchmark run; expensive setup is built once."""
+
+    def __init__(self, root: Path, seed: int = 1234):
+        self.root = Path(root)
+        self.seed = seed
+        self._store = None
+        self._geo = None
+        self._filter = None
+
+    @property
+    def store(self) -> BranchStore:
+        if self._store is None:
+            self._store = BranchStore.load(self.root)
+        return self._store
+
+    @property
+    def geo(self) -> GeoIndex:
+        if self._geo is None:
+            self._geo = GeoIndex.from_store(self.store)
+        return self._geo
+
+    @property
+    def filter(self) -> FilterIndex:
+        if self._filter is None:
+            self._filter = FilterIndex.from_store(self.store)
+        return self._filter
+
+    def query_points(self, count=QUERY_COUNT):
+        """Random points inside the bounding box of the data."""
+        rng = random.Random(self.seed)
+        lats = [r.lat for r in self.store.branches() if r.lat is not None]
+        lons = [r.lon for r in self.store.branches() if r.lon is not None]
+        return [(rng.uniform(min(lats), max(lats)), rng.uniform(min(lons), max(lons)))
+                for _ in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+@benchmark("load_cold")
+def bench_load_cold(ctx):
+    code = (
+        "import sys, time; t = time.perf_counter(); "
+        "from branch_store import BranchStore; BranchStore.load(sys.argv[1]); "
+        "print(time.perf_counter() - t)"
+    )
+
+    def run():
+        result = subprocess.run([sys.executable, "-c", code, str(ctx.root)],
+                                capture_output=True, text=True, check=True,
+                                cwd=Path(__file__).resolve().parent)
+        return float(result.stdout.strip())
+    return run
+
+
+@benchmark("load_warm")
+def bench_load_warm(ctx):
+    ctx.store  # make sure the files are in the OS cache
+    return lambda: BranchStore.load(ctx.root)
+
+
+@benchmark("validate_geo_precision")
+def bench_validate_geo_precision(ctx):
+    files = ctx.store.files
+    return lambda: [geo_precision.validate_branch_file(f) for f in files]
+
+
+@benchmark("validate_arrival_coordinates")
+def bench_validate_arrival(ctx):
+    files = ctx.store.files
+    return lambda: [arrival.validate_file(f, REPO_ROOT) for f in files]
+
+
+@benchmark("detect_road_centerline_coords")
+def bench_detect_centerline(ctx):
+    files = ctx.store.files
+    return lambda: [centerline.validate_branch_file(f, REPO_ROOT) for f in files]
+
+
+@benchmark("validation_engine")
+def bench_validation_engine(ctx):
+    engine = ValidationEngine()
+    store = ctx.store
+    return lambda: engine.run(store)
+
+
+@benchmark("risk_scoring")
+def bench_risk_scoring(ctx):
+    branches = [r.data for r in ctx.store.branches()]
+    return lambda: [road_snap.calculate_risk_score(b) for b in branches]
+
+
+@benchmark("risk_scoring_batch")
+def bench_risk_scoring_batch(ctx):
+    branches = [r.data for r in ctx.store.branches()]
+    return lambda: score_features(RiskFeatures.from_branches(branches))
+
+
+@benchmark("dedup")
+def bench_dedup(ctx):
+    store = ctx.store
+    return lambda: DedupEngine().run(store)
+
+
+@benchmark("geo_index_build")
+def bench_geo_build(ctx):
+    store = ctx.store
+    return lambda: GeoIndex.from_store(store)
+
+
+@benchmark("nearest_query")
+def bench_nearest(ctx):
+    index = ctx.geo
+    points = ctx.query_points()
+    return lambda: [index.nearest(lat, lon, k=5) for lat, lon in points]
+
+
+@benchmark("radius_query")
+def bench_radius(ctx):
+    index = ctx.geo
+    points = ctx.query_points()
+    return lambda: [index.within(lat, lon, 10) for lat, lon in points]
+
+
+@benchmark("lazy_nearest_cold")
+def bench_lazy_nearest(ctx):
+    # Fresh store each run: startup plus the file loads the queries fault in
+    points = ctx.query_points()
+    root = ctx.root
+
+    def run():
+        store = LazyBranchStore(root)
+        return [store.nearest(lat, lon, k=5) for lat, lon in points]
+    return run
+
+
+@benchmark("filter_index_build")
+def bench_filter_build(ctx):
+    store = ctx.store
+    return lambda: FilterIndex.from_store(store)
+
+
+@benchmark("filter_query")
+def bench_filter_query(ctx):
+    index = ctx.filter
+    rng = random.Random(ctx.seed)
+    trades = index.values("trades")
+    brands = index.values("brandsRep")
+    queries = [
+        {"trades": rng.choice(trades), "brandsRep": rng.choice(brands)}
+        for _ in range(QUERY_COUNT)
+    ]
+    return lambda: [index.count(index.match(q)) for q in queries]
+
+
+@benchmark("filter_near_query")
+def bench_filter_near(ctx):
+    index = ctx.filter
+    index.geo  # build outside the timed region
+    rng = random.Random(ctx.seed)
+    trades = index.values("trades")
+    queries = [({"trades": rng.choice(trades)}, point) for point in ctx.query_points()]
+    return lambda: [index.search(c, near=p, k=5) for c, p in queries]
+
+
+@benchmark("typeahead_query")
+def bench_typeahead(ctx):
+    index = TextIndex(ctx.filter)
+    rng = random.Random(ctx.seed)
+    queries = []
+    for _ in range(QUERY_COUNT):
+        words = tokenize(rng.choice(index.records).name)
+        queries.append(" ".join(w[:rng.randint(1, len(w))] for w in words[:rng.randint(1, 2)]))
+    return lambda: [index.search(q, k=10) for q in queries]
+
+
+@benchmark("write_back")
+def bench_write_back(ctx):
+    files = ctx.store.files
+    target = Path(tempfile.mkdtemp(prefix="bench-write-"))
+    atexit.register(shutil.rmtree, target, ignore_errors=True)
+    for f in files:
+        (target / f.rel_path).parent.mkdir(parents=True, exist_ok=True)
+    return lambda: [write_json_atomic(target / f.rel_path, f.data) for f in files]
+
+
+@benchmark("stream_rewrite")
+def bench_stream_rewrite(ctx):
+    files = ctx.store.files
+    target = Path(tempfile.mkdtemp(prefix="bench-stream-"))
+    atexit.register(shutil.rmtree, target, ignore_errors=True)
+    for f in files:
+        (target / f.rel_path).parent.mkdir(parents=True, exist_ok=True)
+
+    def rewrite(branch_file):
+        with BranchReader(branch_file.path) as reader, \
+                open(target / branch_file.rel_path, "w", encoding="utf-8") as out:
+            writer = BranchWriter(out, reader.header)
+            for branch in reader:
+                writer.write(branch)
+            writer.close(reader.trailer)
+    return lambda: [rewrite(f) for f in files]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def time_callable(func, repeat):
+    """Run func `repeat` times; return per-run seconds."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        reported = func()
+        elapsed = time.perf_counter() - start
+        # A benchmark may time itself (e.g. in a subprocess) and return seconds
+        timings.append(reported if isinstance(reported, float) else elapsed)
+    return timings
+
+
+def run_benchmarks(ctx, names, repeat):
+    results = {}
+    for name in names:
+        func = BENCHMARKS[name](ctx)
+        timings = time_callable(func, repeat)
+        results[name] = {
+            "repeat": repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+        }
+        print(f"  {name:32} median {results[name]['median'] * 1000:10.2f} ms", file=sys.stderr)
+    return results
+
+
+def git_commit():
+    result = subprocess.run(["git", "-C", str(REPO_ROOT), "rev-parse", "--short", "HEAD"],
+                            capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def synthetic_root(size, seed=42):
+    """Generate (once) and return a synthetic dataset for a preset size."""
+    states, metros, per_metro = SYNTHETIC_SIZES[size]
+    root = REPO_ROOT / "build" / f"synthetic-{size}"
+    if not (root / "us" / "index.json").exists():
+        print(f"Generating {size} synthetic dataset in {root} ...", file=sys.stderr)
+        DatasetGenerator(root, states=states, metros_per_state=metros,
+                         branches_per_metro=per_metro, seed=seed).generate()
+    return root
+
+
+def compare(current, baseline, threshold):
+    """Return (lines, regressions) comparing best-of-N timings."""
+    lines = [f"{'benchmark':32} {'baseline':>12} {'current':>12} {'change':>8}"]
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            lines.append(f"{name:32} {'-':>12} {result['min'] * 1000:10.2f}ms {'new':>8}")
+            continue
+        ratio = result["min"] / base["min"] if base["min"] else float("inf")
+        slower = result["min"] - base["min"]
+        flag = ""
+        if ratio > 1 + threshold and slower > MIN_REGRESSION_SECONDS:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(f"{name:32} {base['min'] * 1000:10.2f}ms {result['min'] * 1000:10.2f}ms "
+                     f"{(ratio - 1) * 100:+7.1f}%{flag}")
+    return lines, regressions
+
+
+def main():
+    """Run the benchmarks and optionally compare against a previous run."""
+    parser = argparse.ArgumentParser(description="Benchmark the branch tooling.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--root", help=f"Directory to benchmark (default: {DEFAULT_ROOT})")
+    source.add_argument("--synthetic", choices=sorted(SYNTHETIC_SIZES),
+                        help="Benchmark a generated dataset of this size")
+    parser.add_argument("--only", action="append", metavar="NAME", help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT),
+                        help="Result file (default: %(default)s)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Previous result file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown of the best time before failing (default: %(default)s)")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    names = args.only or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Error: unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    root = synthetic_root(args.synthetic) if args.synthetic else Path(args.root or DEFAULT_ROOT)
+    ctx = BenchContext(root)
+    print(f"Benchmarking {root} ({len(ctx.store)} branches, {len(ctx.store.files)} files)",
+          file=sys.stderr)
+
+    current = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "dataset": {
+            "root": str(root),
+            "synthetic": args.synthetic,
+            "files": len(ctx.store.files),
+            "branches": len(ctx.store),
+        },
+        "results": run_benchmarks(ctx, names, args.repeat),
+    }
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_json(output, current)
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("dataset", {}).get("branches") != current["dataset"]["branches"]:
+        print("Warning: baseline was recorded on a different dataset size", file=sys.stderr)
+
+    lines, regressions = compare(current, baseline, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than baseline by more than "
+              f"{args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Shared in-memory store for supply house branch data.
+
+Every script used to walk supply-house-directory on its own, json.load every
+file just to check for a "branches" key, and then load the file a second time
+to process it. BranchStore replaces that with a single pass:
+
+1. Walk the index.json hierarchy (us/index.json -> us/<state>/index.json ->
+   trade indexes) to discover the branch files.
+2. Parse each referenced file exactly once.
+3. Expose the branches as typed records that remember which file (and which
+   metro/trade) they came from, so callers can edit them in place and write
+   back only the files they touched.
+
+For files too large to hold in memory, BranchStore.stream() discovers the
+same files but parses only their top-level metadata; each pass over a file's
+branches reads it incrementally (see json_stream.py), and with rewrite=True
+writes the branches back as the pass goes.
+
+Usage:
+    from branch_store import BranchStore
+
+    store = BranchStore.load()
+    for record in store.branches():
+        print(record.id, record.file.rel_path)
+"""
+
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from json_stream import BranchReader, BranchWriter
+
+
+# Default data location, relative to this script
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ROOT = REPO_ROOT / "supply-house-directory"
+
+# Entry point of the index hierarchy, relative to the directory root
+ROOT_INDEX = "us/index.json"
+
+
+def read_json(path):
+    """Read a JSON document from disk."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def format_json(data):
+    """
+    Serialize a JSON document using the repository's formatting.
+
+    All data files are stored with indent=2, literal UTF-8 characters and a
+    trailing newline.
+    """
+    return json.dumps(data, indent=2, ensure_ascii=False) + '\n'
+
+
+def write_json(path, data):
+    """Write a JSON document using the repository's formatting."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(format_json(data))
+
+
+def write_json_atomic(path, data):
+    """
+    Write a JSON document via a temporary sibling and rename.
+
+    Readers never see a partially written file, and an interrupted write
+    leaves the previous contents in place.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(format_json(data))
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class BranchFile:
+    """A parsed branch data file and where it sits in the index hierarchy."""
+
+    path: Path
+    rel_path: str
+    state: str
+    metro: Optional[str]
+    trade: Optional[str]
+    data: dict
+    modified: bool = False
+
+    @property
+    def root(self) -> Path:
+        """The data directory `rel_path` is relative to."""
+        return self.path.parents[self.rel_path.count("/")]
+
+    @property
+    def branches(self) -> List[dict]:
+        """The raw branch dictionaries, in file order."""
+        return self.data.get("branches", [])
+
+    def branch_count(self) -> int:
+        """Number of branches in the file."""
+        return len(self.branches)
+
+    def mark_modified(self):
+        """Flag this file so save_modified() writes it back."""
+        self.modified = True
+
+    def save(self):
+        """Write the file back to disk atomically and clear the modified flag."""
+        write_json_atomic(self.path, self.data)
+        self.modified = False
+
+    def finish(self):
+        """Called once a worker is done with the file; nothing to do in memory."""
+
+    def discard(self):
+        """Called when a worker failed on the file; in-memory edits are simply not saved."""
+        self.modified = False
+
+
+@dataclass
+class StreamedBranchFile(BranchFile):
+    """
+    A branch file whose branches are read from disk one at a time.
+
+    `data` holds only the top-level members before the "branches" array.
+    Every pass over `branches` re-reads the file. With `rewrite`, a pass
+    also writes each branch, after the caller has moved on to the next one
+    (so in-place edits are kept), to a temporary sibling file; finish()
+    completes the pass and discards the copy unless the file was marked
+    modified, and save() moves it into place. A rewriting file allows a
+    single pass per run.
+    """
+
+    rewrite: bool = False
+    _pass: Optional[Iterator[dict]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def tmp_path(self) -> Path:
+        return self.path.with_name(self.path.name + '.tmp')
+
+    @property
+    def branches(self) -> Iterable[dict]:
+        if not self.rewrite:
+            return _ReadPass(self.path)
+        if self._pass is not None:
+            raise RuntimeError(f"{self.rel_path}: a rewriting pass was already started")
+        self._pass = self._rewrite_pass()
+        return self._pass
+
+    def branch_count(self) -> int:
+        """Count the branches with a separate read, leaving any rewriting pass untouched."""
+        return len(_ReadPass(self.path))
+
+    def _rewrite_pass(self) -> Iterator[dict]:
+        try:
+            with BranchReader(self.path) as reader, \
+                    open(self.tmp_path, 'w', encoding='utf-8') as out:
+                writer = BranchWriter(out, reader.header)
+                for branch in reader:
+                    yield branch
+                    writer.write(branch)
+                writer.close(reader.trailer)
+        except BaseException:
+            self.tmp_path.unlink(missing_ok=True)
+            raise
+
+    def finish(self):
+        """Write any branches the caller did not read; drop the copy if unmodified."""
+        if self.rewrite:
+            if self._pass is None:
+                self._pass = self._rewrite_pass()
+            for _ in self._pass:
+                pass
+            if not self.modified:
+                self.tmp_path.unlink(missing_ok=True)
+
+    def discard(self):
+        """Abandon the pass and delete its partial copy."""
+        if self.rewrite:
+            if self._pass is not None:
+                self._pass.close()
+            self.tmp_path.unlink(missing_ok=True)
+        self.modified = False
+
+    def save(self):
+        """Replace the file with the rewritten copy from finish()."""
+        if not self.tmp_path.exists():
+            raise OSError(f"{self.rel_path}: no rewritten copy to save "
+                          f"(stream the store with rewrite=True)")
+        os.replace(self.tmp_path, self.path)
+        self.modified = False
+
+
+class _ReadPass:
+    """Re-iterable read-only view of a streamed file's branches."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __iter__(self) -> Iterator[dict]:
+        with BranchReader(self.path) as reader:
+            yield from reader
+
+    def __len__(self):
+        """Count the branches by reading the file once more, one branch at a time."""
+        with BranchReader(self.path) as reader:
+            for _ in reader:
+                pass
+            return reader.count
+
+
+@dataclass
+class BranchRecord:
+    """
+    A single branch plus its provenance.
+
+    `data` is the branch dictionary inside `file.data`, so edits made through
+    it are reflected when the file is saved.
+    """
+
+    data: dict
+    file: BranchFile
+    position: int
+
+    @property
+    def id(self) -> str:
+        return self.data.get("id", "unknown")
+
+    @property
+    def name(self) -> str:
+        return self.data.get("name", "unknown")
+
+    @property
+    def lat(self) -> Optional[float]:
+        return self.data.get("lat")
+
+    @property
+    def lon(self) -> Optional[float]:
+        return self.data.get("lon")
+
+    @property
+    def arrival_lat(self) -> Optional[float]:
+        return self.data.get("arrivalLat")
+
+    @property
+    def arrival_lon(self) -> Optional[float]:
+        return self.data.get("arrivalLon")
+
+    @property
+    def trades(self) -> List[str]:
+        return self.data.get("trades", [])
+
+    @property
+    def routing_coords(self) -> Tuple[Optional[float], Optional[float]]:
+        """Navigation destination, falling back to display coordinates."""
+        lat = self.arrival_lat if self.arrival_lat is not None else self.lat
+        lon = self.arrival_lon if self.arrival_lon is not None else self.lon
+        return lat, lon
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def mark_modified(self):
+        self.file.mark_modified()
+
+
+@dataclass
+class BranchStore:
+    """All branch files reachable from the root index, parsed once."""
+
+    root: Path
+    files: List[BranchFile] = field(default_factory=list)
+    load_errors: List[Tuple[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, root=None):
+        """Walk the index hierarchy under `root` and parse every branch file."""
+        store = cls(root=Path(root) if root else DEFAULT_ROOT)
+        store._load_hierarchy()
+        return store
+
+    @classmethod
+    def stream(cls, root=None, rewrite=False):
+        """
+        Discover the same files as load(), reading only their metadata.
+
+        The files are StreamedBranchFile instances: memory use is bounded by
+        the largest branch, not the largest file. Malformed content inside a
+        "branches" array surfaces as a json.JSONDecodeError during the pass.
+        len() of the store or of a file's branches counts them with an
+        extra read pass per file.
+        """
+        store = cls(root=Path(root) if root else DEFAULT_ROOT)
+        store._load_hierarchy(stream=True, rewrite=rewrite)
+        return store
+
+    @property
+    def on_disk(self) -> bool:
+        """True when the files were read from `root`, so their stat() describes them."""
+        return True
+
+    def _read(self, rel_path):
+        """Read a file relative to the root, recording failures."""
+        try:
+            return read_json(self.root / rel_path)
+        except (OSError, json.JSONDecodeError) as e:
+            self.load_errors.append((rel_path, str(e)))
+            return None
+
+    def _read_header(self, rel_path):
+        """Top-level members before "branches", or None for a non-branch file."""
+        try:
+            with BranchReader(self.root / rel_path) as reader:
+                return reader.header if reader.has_branches else None
+        except (OSError, json.JSONDecodeError) as e:
+            self.load_errors.append((rel_path, str(e)))
+            return None
+
+    def _load_hierarchy(self, stream=False, rewrite=False):
+        seen = set()
+
+        def add_metros(index, state, trade):
+            for metro in index.get("metros", []):
+                rel_path = metro.get("file")
+                if not rel_path or rel_path in seen:
+                    continue
+                seen.add(rel_path)
+
+                provenance = dict(
+                    path=self.root / rel_path,
+                    rel_path=rel_path,
+                    state=state,
+                    metro=metro.get("id"),
+                    trade=trade,
+                )
+
+                if stream:
+                    header = self._read_header(rel_path)
+                    if header is not None:
+                        self.files.append(StreamedBranchFile(data=header, rewrite=rewrite, **provenance))
+                    continue
+
+                data = self._read(rel_path)
+                if not isinstance(data, dict) or "branches" not in data:
+                    continue
+
+                self.files.append(BranchFile(data=data, **provenance))
+
+        country_index = self._read(ROOT_INDEX) or {}
+        for state_entry in country_index.get("states", []):
+            state_index = self._read(state_entry["index"])
+            if not state_index:
+                continue
+            state = state_index.get("state", state_entry.get("code", ""))
+
+            add_metros(state_index, state, None)
+
+            for trade, trade_entry in state_index.get("trades", {}).items():
+                trade_index = self._read(trade_entry["index"])
+                if trade_index:
+                    add_metros(trade_index, state, trade)
+
+        self.files.sort(key=lambda f: f.rel_path)
+
+    def branches(self) -> Iterator[BranchRecord]:
+        """Iterate over every branch in every file."""
+        for branch_file in self.files:
+            for position, branch in enumerate(branch_file.branches):
+                yield BranchRecord(data=branch, file=branch_file, position=position)
+
+    def by_id(self) -> Dict[str, List[BranchRecord]]:
+        """Group records by branch id (an id may appear in several files)."""
+        grouped = {}
+        for record in self.branches():
+            grouped.setdefault(record.id, []).append(record)
+        return grouped
+
+    def modified_files(self) -> List[BranchFile]:
+        return [f for f in self.files if f.modified]
+
+    def save_modified(self) -> List[BranchFile]:
+        """Write back every file flagged as modified, then refresh the indexes listing them."""
+        from build_indexes import refresh_indexes
+
+        saved = []
+        for branch_file in self.modified_files():
+            branch_file.save()
+            saved.append(branch_file)
+        if saved:
+            refresh_indexes(saved)
+        return saved
+
+    def __len__(self):
+        return sum(f.branch_count() for f in self.files)
+
+
+def main():
+    """Print a summary of the store contents."""
+    store = BranchStore.load()
+
+    print(f"Root: {store.root}")
+    print(f"Files:    {len(store.files)}")
+    print(f"Branches: {len(store)}")
+
+    for branch_file in store.files:
+        print(f"  {len(branch_file.branches):4}  {branch_file.rel_path}")
+
+    for rel_path, error in store.load_errors:
+        print(f"  ❌ {rel_path}: {error}", file=sys.stderr)
+
+    return 1 if store.load_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
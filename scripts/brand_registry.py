@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Canonical brand and manufacturer names with small integer ids.
+
+Brand names arrive with variant spellings ("AO Smith", "A.O. Smith",
+"Mitsubishi Electric"), and standardize_manufacturer_names.py used to fix
+them from a hardcoded map that new data kept outgrowing. The canonical
+names and their aliases now live with the data:
+
+    _meta/brands.json         {"brands": [canonical, ...],
+                               "aliases": {canonical: [variant, ...]}}
+    _meta/manufacturers.json  {"manufacturers": [...], "aliases": {...}}
+
+BrandRegistry reads both into one id space (brands first, in file order,
+then manufacturers not already listed). Lookups ignore case, accents,
+punctuation and spacing, so "a.o. smith", "AO Smith" and "A. O. Smith"
+all resolve to the same id. Raw strings are cached after their first
+lookup, and the same few hundred brand strings repeat across every branch.
+Names that resolve to nothing are counted for the unknown-name report
+instead of raising, so a typo in one branch never blocks a load.
+
+Usage:
+    registry = BrandRegistry.load(store.root)
+    registry.ids(branch.get("brandsRep"))   # (3, 17, 42)
+    registry.canonical("Mitsubishi Electric")  # "Mitsubishi"
+
+    python3 scripts/brand_registry.py            # unknown and non-canonical names
+    python3 scripts/brand_registry.py --json
+"""
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from branch_store import DEFAULT_ROOT, BranchStore, read_json
+
+
+# Branch fields holding brand or manufacturer names
+BRAND_FIELDS = ("brandsRep", "manufacturersPartsFor")
+
+# (meta file, key of its canonical list)
+META_SOURCES = (("brands.json", "brands"), ("manufacturers.json", "manufacturers"))
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def brand_key(name: str) -> str:
+    """Lookup key: casefolded, accents and everything but letters/digits removed."""
+    text = unicodedata.normalize("NFKD", str(name).casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub("", text)
+
+
+class BrandRegistry:
+    """Canonical names, alias table and a per-string lookup cache."""
+
+    def __init__(self, names: Iterable[str] = (), aliases: Optional[Dict[str, Iterable[str]]] = None):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._cache: Dict[str, Optional[int]] = {}
+        self.unknown: Counter = Counter()
+        for name in names:
+            self.add(name)
+        for canonical, variants in (aliases or {}).items():
+            for variant in variants:
+                self.add_alias(canonical, variant)
+
+    @classmethod
+    def load(cls, root=None) -> "BrandRegistry":
+        """Read _meta/brands.json and _meta/manufacturers.json under `root`."""
+        meta = (Path(root) if root else DEFAULT_ROOT) / "_meta"
+        registry = cls()
+        for file_name, list_key in META_SOURCES:
+            path = meta / file_name
+            if not path.exists():
+                continue
+            data = read_json(path)
+            for name in data.get(list_key, []):
+                registry.add(name)
+            for canonical, variants in data.get("aliases", {}).items():
+                for variant in variants:
+                    registry.add_alias(canonical, variant)
+        return registry
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name: str) -> int:
+        """Register a canonical name (idempotent) and return its id."""
+        key = brand_key(name)
+        if key in self._ids:
+            return self._ids[key]
+        brand_id = len(self.names)
+        self.names.append(name)
+        self._ids[key] = brand_id
+        self._cache.clear()
+        return brand_id
+
+    def add_alias(self, canonical: str, variant: str):
+        brand_id = self._ids.get(brand_key(canonical))
+        if brand_id is None:
+            raise ValueError(f"Alias '{variant}' points to unknown brand '{canonical}'")
+        key = brand_key(variant)
+        existing = self._ids.get(key)
+        if existing is not None and existing != brand_id:
+            raise ValueError(f"Alias '{variant}' of '{canonical}' already names '{self.names[existing]}'")
+        self._ids[key] = brand_id
+        self._cache.clear()
+
+    def lookup(self, name: str, count_unknown: bool = True) -> Optional[int]:
+        """Brand id for any spelling of a name, or None (counted as unknown)."""
+        try:
+            brand_id = self._cache[name]
+        except KeyError:
+            brand_id = self._cache[name] = self._ids.get(brand_key(name))
+        if brand_id is None and count_unknown:
+            self.unknown[name] += 1
+        return brand_id
+
+    def ids(self, values) -> Tuple[int, ...]:
+        """Distinct ids of a brand list (or single name), in first-seen order; unknowns dropped."""
+        if not values:
+            return ()
+        seen = []
+        for value in values if isinstance(values, list) else [values]:
+            brand_id = self.lookup(value)
+            if brand_id is not None and brand_id not in seen:
+                seen.append(brand_id)
+        return tuple(seen)
+
+    def canonical(self, name: str) -> str:
+        """Canonical spelling of a name; unknown names are returned unchanged."""
+        brand_id = self.lookup(name)
+        return name if brand_id is None else self.names[brand_id]
+
+    def is_canonical(self, name: str) -> bool:
+        return self.canonical(name) == name
+
+
+def audit_store(store: BranchStore, registry: BrandRegistry) -> dict:
+    """Unknown and non-canonical brand names in a store, with where they occur."""
+    unknown: Dict[str, List[str]] = {}
+    variants: Dict[str, dict] = {}
+    references = 0
+    for record in store.branches():
+        for field in BRAND_FIELDS:
+            values = record.get(field) or []
+            for value in values if isinstance(values, list) else [values]:
+                references += 1
+                brand_id = registry.lookup(value)
+                if brand_id is None:
+                    unknown.setdefault(value, []).append(record.id)
+                elif registry.names[brand_id] != value:
+                    entry = variants.setdefault(value, {"canonical": registry.names[brand_id], "ids": []})
+                    entry["ids"].append(record.id)
+    return {
+        "brands": len(registry),
+        "references": references,
+        "unknown": {name: sorted(set(ids)) for name, ids in sorted(unknown.items())},
+        "nonCanonical": {name: {"canonical": v["canonical"], "ids": sorted(set(v["ids"]))}
+                         for name, v in sorted(variants.items())},
+    }
+
+
+def main():
+    """Report brand names that are unknown or not in canonical form."""
+    parser = argparse.ArgumentParser(description="Check brand names against the canonical registry.")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    store = BranchStore.load(args.root)
+    try:
+        registry = BrandRegistry.load(store.root)
+    except ValueError as e:
+        print(f"❌ Invalid alias table: {e}", file=sys.stderr)
+        return 2
+    report = audit_store(store, registry)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"Canonical brands: {report['brands']}, brand references: {report['references']}")
+        for name, entry in report["nonCanonical"].items():
+            print(f"⚠️  '{name}' -> '{entry['canonical']}' ({len(entry['ids'])} branches)")
+        for name, ids in report["unknown"].items():
+            print(f"❌ Unknown brand '{name}' ({len(ids)} branches, e.g. {ids[0]})")
+        if not report["unknown"] and not report["nonCanonical"]:
+            print("✅ All brand names are canonical")
+    return 1 if report["unknown"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Regenerate the index.json hierarchy and STATEWIDE_SUMMARY.json aggregates.
+
+The index files were maintained by hand: only denver-metro had a `center`,
+nothing recorded how many branches a file holds, and a client had to
+download every metro file to find the ones near it. This builder walks the
+hierarchy and annotates every entry with values computed from the files it
+points to:
+
+- metro entries (state and trade indexes):
+    centroid     mean branch coordinate
+    bbox         {minLat, minLon, maxLat, maxLon} of the branches
+    branchCount  branches in the file
+    tradeCounts  branches per trade
+    sha256, bytes  of the file as stored
+- trade and state entries: sha256 and bytes of the referenced index, plus
+  branchCount and bbox for states
+- us/<state>/STATEWIDE_SUMMARY.json: distinct branch count, per-trade and
+  per-metro counts and the state bounding box
+
+Hand-written fields (names, `center`, notes, status, dates) are preserved.
+Indexes are rebuilt bottom-up so each hash covers the final bytes of the
+file it names, and the output is byte-stable: a second run changes nothing.
+
+Writers keep the indexes current through refresh_indexes(), which
+BranchStore.save_modified(), file_pool.map_files() and
+patch_engine.commit_files() call with the files they saved: only the
+states that list one of those files are rebuilt.
+
+Usage:
+    python3 scripts/build_indexes.py
+    python3 scripts/build_indexes.py --check
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from branch_store import DEFAULT_ROOT, ROOT_INDEX, BranchFile, format_json
+
+
+SUMMARY_FILE = "STATEWIDE_SUMMARY.json"
+
+# Decimal places kept for centroids (~11 m)
+CENTROID_PRECISION = 4
+
+# Fields this builder owns; they are removed and re-added so their position
+# in each entry is the same on every run
+COMPUTED_KEYS = ("centroid", "bbox", "branchCount", "tradeCounts", "metroCounts", "sha256", "bytes")
+
+
+def content_stats(content: str) -> dict:
+    raw = content.encode("utf-8")
+    return {"sha256": hashlib.sha256(raw).hexdigest(), "bytes": len(raw)}
+
+
+def branch_trades(branch: dict, default_trade: Optional[str] = None) -> List[str]:
+    """Trades a branch serves: `trades`, else `trade`, else the file's trade."""
+    trades = branch.get("trades")
+    if trades:
+        return list(trades)
+    if branch.get("trade"):
+        return [branch["trade"]]
+    return [default_trade] if default_trade else []
+
+
+def bounding_box(points: Iterable[tuple]) -> Optional[dict]:
+    points = list(points)
+    if not points:
+        return None
+    lats = [lat for lat, _ in points]
+    lons = [lon for _, lon in points]
+    return {"minLat": min(lats), "minLon": min(lons), "maxLat": max(lats), "maxLon": max(lons)}
+
+
+def merge_boxes(boxes: Iterable[Optional[dict]]) -> Optional[dict]:
+    boxes = [b for b in boxes if b]
+    if not boxes:
+        return None
+    return {
+        "minLat": min(b["minLat"] for b in boxes),
+        "minLon": min(b["minLon"] for b in boxes),
+        "maxLat": max(b["maxLat"] for b in boxes),
+        "maxLon": max(b["maxLon"] for b in boxes),
+    }
+
+
+def replace_computed(entry: dict, values: dict):
+    """Drop previously computed fields from `entry` and append `values`."""
+    for key in COMPUTED_KEYS:
+        entry.pop(key, None)
+    entry.update(values)
+
+
+def metro_aggregates(branches: List[dict], trade: Optional[str] = None) -> dict:
+    """centroid, bbox, branchCount and tradeCounts for one branch file."""
+    points = [(b["lat"], b["lon"]) for b in branches
+              if isinstance(b.get("lat"), (int, float)) and isinstance(b.get("lon"), (int, float))]
+    trade_counts: Dict[str, int] = {}
+    for branch in branches:
+        for name in branch_trades(branch, trade):
+            trade_counts[name] = trade_counts.get(name, 0) + 1
+
+    aggregates = {}
+    if points:
+        aggregates["centroid"] = {
+            "lat": round(sum(p[0] for p in points) / len(points), CENTROID_PRECISION),
+            "lon": round(sum(p[1] for p in points) / len(points), CENTROID_PRECISION),
+        }
+        aggregates["bbox"] = bounding_box(points)
+    aggregates["branchCount"] = len(branches)
+    aggregates["tradeCounts"] = dict(sorted(trade_counts.items()))
+    return aggregates
+
+
+class IndexBuilder:
+    """
+    Renders annotated index documents.
+
+    `read(rel_path)` returns a file's current text or None; it lets the
+    canonical store feed in freshly rendered view files instead of disk.
+    """
+
+    def __init__(self, read: Callable[[str], Optional[str]]):
+        self.read = read
+        self.rendered: Dict[str, str] = {}
+
+    @classmethod
+    def from_root(cls, root=None):
+        root = Path(root) if root else DEFAULT_ROOT
+
+        def read(rel_path):
+            try:
+                return (root / rel_path).read_text(encoding="utf-8")
+            except OSError:
+                return None
+
+        return cls(read)
+
+    def _text(self, rel_path):
+        return self.rendered.get(rel_path) or self.read(rel_path)
+
+    def _document(self, rel_path):
+        text = self._text(rel_path)
+        return json.loads(text) if text is not None else None
+
+    def _annotate_metros(self, index: dict, trade: Optional[str],
+                         distinct: Dict[str, List[str]]) -> List[dict]:
+        """
+        Annotate an index's metro entries in place; returns the annotated ones.
+
+        Each file's branches are only held while it is annotated: `distinct`
+        collects the trades of the first copy of every branch id seen, which
+        is all the state summary needs.
+        """
+        annotated = []
+        for entry in index.get("metros", []):
+            text = self._text(entry["file"])
+            if text is None:
+                continue
+            data = json.loads(text)
+            branches = data.get("branches", [])
+            file_trade = trade or data.get("trade")
+            for branch in branches:
+                if branch.get("id") not in distinct:
+                    distinct[branch.get("id")] = branch_trades(branch, file_trade)
+            replace_computed(entry, {**metro_aggregates(branches, file_trade), **content_stats(text)})
+            annotated.append(entry)
+        return annotated
+
+    def _state_files(self, rel_path) -> set:
+        """Branch files listed by a state index and its trade indexes."""
+        files = set()
+        indexes = [self._document(rel_path)]
+        for trade_entry in (indexes[0] or {}).get("trades", {}).values():
+            indexes.append(self._document(trade_entry["index"]))
+        for index in indexes:
+            files.update(m["file"] for m in (index or {}).get("metros", []) if m.get("file"))
+        return files
+
+    def _emit(self, rel_path, document):
+        self.rendered[rel_path] = format_json(document)
+        return self.rendered[rel_path]
+
+    def _build_state(self, rel_path) -> Optional[dict]:
+        index = self._document(rel_path)
+        if index is None:
+            return None
+
+        # Distinct branches across the state's metro and trade files: id -> trades
+        distinct: Dict[str, List[str]] = {}
+        entries = self._annotate_metros(index, None, distinct)
+        per_metro = {entry["id"]: entry["branchCount"] for entry in entries}
+
+        for trade, trade_entry in index.get("trades", {}).items():
+            trade_index = self._document(trade_entry["index"])
+            if trade_index is None:
+                continue
+            entries += self._annotate_metros(trade_index, trade, distinct)
+            replace_computed(trade_entry, content_stats(self._emit(trade_entry["index"], trade_index)))
+
+        trade_counts: Dict[str, int] = {}
+        for trades in distinct.values():
+            for name in trades:
+                trade_counts[name] = trade_counts.get(name, 0) + 1
+
+        state_bbox = merge_boxes(entry.get("bbox") for entry in entries)
+
+        summary_path = posixpath.join(posixpath.dirname(rel_path), SUMMARY_FILE)
+        summary = self._document(summary_path)
+        if summary is not None:
+            values = {
+                "branchCount": len(distinct),
+                "tradeCounts": dict(sorted(trade_counts.items())),
+                "metroCounts": per_metro,
+            }
+            if state_bbox:
+                values["bbox"] = state_bbox
+            replace_computed(summary, values)
+            self._emit(summary_path, summary)
+
+        text = self._emit(rel_path, index)
+        aggregates = {"branchCount": len(distinct)}
+        if state_bbox:
+            aggregates["bbox"] = state_bbox
+        aggregates.update(content_stats(text))
+        return aggregates
+
+    def build(self, changed: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Render every index and summary; returns rel_path -> contents.
+
+        With `changed` (branch file rel_paths), only the states listing one
+        of those files are rebuilt; the other states keep their entries and
+        files as they are.
+        """
+        self.rendered = {}
+        changed = set(changed) if changed is not None else None
+        country = self._document(ROOT_INDEX)
+        if country is None:
+            raise FileNotFoundError(ROOT_INDEX)
+        for state_entry in country.get("states", []):
+            if changed is not None and not changed & self._state_files(state_entry["index"]):
+                continue
+            aggregates = self._build_state(state_entry["index"])
+            if aggregates:
+                replace_computed(state_entry, aggregates)
+        self._emit(ROOT_INDEX, country)
+        return dict(self.rendered)
+
+
+def render_indexes(read: Callable[[str], Optional[str]]) -> Dict[str, str]:
+    """Annotated index and summary files for the files `read` returns."""
+    return IndexBuilder(read).build()
+
+
+def write_rendered(root: Path, builder: IndexBuilder, rendered: Dict[str, str]) -> List[str]:
+    """Atomically write the rendered files that differ from disk; returns their rel_paths."""
+    stale = [rel for rel, text in rendered.items() if builder.read(rel) != text]
+    for rel in stale:
+        path = root / rel
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(rendered[rel], encoding="utf-8")
+        tmp_path.replace(path)
+    return stale
+
+
+def refresh_indexes(branch_files: Iterable[BranchFile]) -> List[str]:
+    """
+    Rebuild the index entries covering files that were just written.
+
+    Returns the rel_paths of the index and summary files that changed.
+    """
+    by_root: Dict[Path, List[str]] = {}
+    for branch_file in branch_files:
+        by_root.setdefault(branch_file.root, []).append(branch_file.rel_path)
+    written = []
+    for root, rel_paths in by_root.items():
+        builder = IndexBuilder.from_root(root)
+        written += write_rendered(root, builder, builder.build(changed=rel_paths))
+    return written
+
+
+def main():
+    """Rewrite (or check) every index.json and STATEWIDE_SUMMARY.json."""
+    parser = argparse.ArgumentParser(description="Regenerate index.json files with aggregates.")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report files that are out of date (exit 1 if any)")
+    args = parser.parse_args()
+
+    root = Path(args.root) if args.root else DEFAULT_ROOT
+    builder = IndexBuilder.from_root(root)
+    rendered = builder.build()
+
+    if args.check:
+        stale = [rel for rel, text in rendered.items() if builder.read(rel) != text]
+        for rel in stale:
+            print(f"  stale: {rel}")
+        if stale:
+            print(f"❌ {len(stale)} index files are out of date")
+            return 1
+        print("✅ Index files are up to date")
+        return 0
+
+    stale = write_rendered(root, builder, rendered)
+    for rel in stale:
+        print(f"  wrote {rel}")
+    print(f"{len(stale)} of {len(rendered)} index files changed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
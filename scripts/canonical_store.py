@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Canonical one-record-per-id branch store with generated file views.
+
+The published layout repeats a branch in both us/<state>/<metro>.json and
+us/<state>/<trade>/<metro>.json, so every edit has to find and update each
+copy, and the copies drift apart. The canonical store keeps each branch id
+exactly once and describes the published files as views over it:
+
+    <root>/_canonical/branches.json   every branch, one record per id, sorted by id
+    <root>/_canonical/layout.json     index documents plus, for each view file,
+                                      its header fields, the index entry that
+                                      lists it, the ordered branch ids and any
+                                      per-view branch fields; and the sha256 of
+                                      every generated file as last built
+
+A record holds the fields every copy of the branch agrees on. Fields that
+only some files carry, or carry with different values (the "trade" key of
+trade files, trade-specific services or phone formatting), are stored with
+the view that publishes them, together with that copy's key order when it
+differs from the default (record fields, then view fields). Edit shared
+fields in branches.json; extract lists the ids that have per-view fields.
+
+`build` regenerates every view file and the metro lists of every index.json
+from those two files, then refreshes the index aggregates (see
+build_indexes.py). Output uses format_json and the stored ordering, so
+building twice gives identical bytes and unchanged files are not rewritten.
+
+Scripts that edit the published files directly (patch_engine, the
+migrations) bypass the canonical store. `build` therefore refuses to
+overwrite a file whose contents no longer match the hash recorded when it
+was last built or extracted, since that would silently revert the edit;
+re-run `extract` to adopt such edits, or pass --force to discard them.
+`check` lists these files separately.
+
+Usage:
+    # one-time: derive the canonical store from the current files
+    python3 scripts/canonical_store.py extract
+
+    # after editing _canonical/branches.json
+    python3 scripts/canonical_store.py build
+
+    # fail if the published files differ from what build would write
+    python3 scripts/canonical_store.py check
+"""
+
+import argparse
+import hashlib
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from branch_store import DEFAULT_ROOT, ROOT_INDEX, format_json, read_json, write_json_atomic
+from build_indexes import render_indexes
+
+
+CANONICAL_DIR = "_canonical"
+BRANCHES_FILE = "branches.json"
+LAYOUT_FILE = "layout.json"
+LAYOUT_VERSION = 3
+
+
+class DriftError(Exception):
+    """Published files were edited outside the canonical store."""
+
+    def __init__(self, files: List[str]):
+        super().__init__(f"{len(files)} generated files were edited outside {CANONICAL_DIR}: "
+                         f"{', '.join(files)}")
+        self.files = files
+
+
+def _sha256(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _split_copies(found: List[tuple]):
+    """
+    Shared record and per-file fields for the copies of one id.
+
+    `found` is [(rel_path, branch), ...]. Returns (record, {rel_path: fields}),
+    where record holds the fields equal in every copy, in the key order of
+    the first copy, and fields holds the rest of each copy.
+    """
+    first = found[0][1]
+    record = {key: value for key, value in first.items()
+              if all(key in branch and branch[key] == value for _, branch in found[1:])}
+    fields = {rel_path: {key: value for key, value in branch.items() if key not in record}
+              for rel_path, branch in found}
+    return record, fields
+
+
+@dataclass
+class View:
+    """One published branch file."""
+
+    file: str
+    index: str
+    entry: dict
+    header: dict
+    # Per-view branch fields and key orders, by branch id
+    fields: Dict[str, dict] = field(default_factory=dict)
+    key_order: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def branch_ids(self) -> List[str]:
+        return self.header["branches"]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(file=data["file"], index=data["index"], entry=data["entry"],
+                   header=data["header"], fields=data.get("fields", {}),
+                   key_order=data.get("keyOrder", {}))
+
+    def to_dict(self):
+        data = {"file": self.file, "index": self.index, "entry": self.entry, "header": self.header}
+        if self.fields:
+            data["fields"] = self.fields
+        if self.key_order:
+            data["keyOrder"] = self.key_order
+        return data
+
+    def branch(self, record: dict) -> dict:
+        """This view's copy of a branch: the shared record plus the view's fields."""
+        own = self.fields.get(record["id"])
+        if not own:
+            return record
+        merged = {**record, **own}
+        order = self.key_order.get(record["id"])
+        return {key: merged[key] for key in order} if order else merged
+
+
+@dataclass
+class CanonicalStore:
+    """Branch records keyed by id plus the layout of the generated files."""
+
+    root: Path
+    records: Dict[str, dict] = field(default_factory=dict)
+    views: List[View] = field(default_factory=list)
+    indexes: Dict[str, dict] = field(default_factory=dict)
+    # Ids whose copies disagreed during extract, with the fields kept per view
+    conflicts: Dict[str, List[str]] = field(default_factory=dict)
+    # rel_path -> sha256 of each generated file as last built (or extracted)
+    built: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def directory(self) -> Path:
+        return self.root / CANONICAL_DIR
+
+    @classmethod
+    def load(cls, root=None):
+        """Read the canonical store under `root`."""
+        root = Path(root) if root else DEFAULT_ROOT
+        store = cls(root=root)
+        branches = read_json(store.directory / BRANCHES_FILE)
+        layout = read_json(store.directory / LAYOUT_FILE)
+        if layout.get("version") != LAYOUT_VERSION:
+            raise ValueError(f"Unsupported layout version {layout.get('version')!r}")
+        store.records = {branch["id"]: branch for branch in branches["branches"]}
+        store.indexes = layout["indexes"]
+        store.views = [View.from_dict(view) for view in layout["views"]]
+        store.built = layout.get("built", {})
+        return store
+
+    @classmethod
+    def extract(cls, root=None):
+        """
+        Build a canonical store from the published files under `root`.
+
+        Walks the same index hierarchy as BranchStore. When an id appears in
+        several files with different contents, the fields the copies share
+        become the record, the rest stay with each view, and the id is listed
+        in `conflicts`; build then reproduces every file exactly.
+        """
+        root = Path(root) if root else DEFAULT_ROOT
+        store = cls(root=root)
+        copies: Dict[str, List[tuple]] = {}
+        views: Dict[str, View] = {}
+
+        def add_index(rel_path):
+            index = read_json(root / rel_path)
+            store.indexes[rel_path] = index
+            for entry in index.get("metros", []):
+                data = read_json(root / entry["file"])
+                header = dict(data)
+                header["branches"] = [branch["id"] for branch in data.get("branches", [])]
+                view = View(file=entry["file"], index=rel_path, entry=entry, header=header)
+                store.views.append(view)
+                views[entry["file"]] = view
+                for branch in data.get("branches", []):
+                    copies.setdefault(branch["id"], []).append((entry["file"], branch))
+            return index
+
+        country_index = add_index(ROOT_INDEX)
+        for state_entry in country_index.get("states", []):
+            state_index = add_index(state_entry["index"])
+            for trade_entry in state_index.get("trades", {}).values():
+                add_index(trade_entry["index"])
+
+        for branch_id in sorted(copies):
+            found = copies[branch_id]
+            record, fields = _split_copies(found)
+            store.records[branch_id] = record
+            for rel_path, branch in found:
+                if not fields[rel_path]:
+                    continue
+                view = views[rel_path]
+                view.fields[branch_id] = fields[rel_path]
+                if list(view.branch(record)) != list(branch):
+                    view.key_order[branch_id] = list(branch)
+            kept = sorted({key for own in fields.values() for key in own})
+            if kept:
+                store.conflicts[branch_id] = kept
+
+        for rel_path in store.render():
+            content = _read_text(root / rel_path)
+            if content is not None:
+                store.built[rel_path] = _sha256(content)
+        return store
+
+    def save(self):
+        """Write branches.json and layout.json."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.directory / BRANCHES_FILE, {
+            "branches": [self.records[branch_id] for branch_id in sorted(self.records)],
+        })
+        self._save_layout()
+
+    def _save_layout(self):
+        write_json_atomic(self.directory / LAYOUT_FILE, {
+            "version": LAYOUT_VERSION,
+            "indexes": self.indexes,
+            "views": [view.to_dict() for view in self.views],
+            "built": dict(sorted(self.built.items())),
+        })
+
+    def render(self) -> Dict[str, str]:
+        """Every generated file, rel_path -> exact file contents."""
+        missing = sorted({branch_id for view in self.views for branch_id in view.branch_ids
+                          if branch_id not in self.records})
+        if missing:
+            raise KeyError(f"Layout references unknown branch ids: {', '.join(missing)}")
+
+        rendered = {}
+        for rel_path, index in self.indexes.items():
+            document = dict(index)
+            if "metros" in document:
+                document["metros"] = [view.entry for view in self.views if view.index == rel_path]
+            rendered[rel_path] = format_json(document)
+
+        for view in self.views:
+            document = dict(view.header)
+            document["branches"] = [view.branch(self.records[branch_id]) for branch_id in view.branch_ids]
+            rendered[view.file] = format_json(document)
+
+        # Index aggregates (counts, bounding boxes, hashes) follow the views
+        def read(rel_path):
+            if rel_path in rendered:
+                return rendered[rel_path]
+            try:
+                return (self.root / rel_path).read_text(encoding="utf-8")
+            except OSError:
+                return None
+
+        rendered.update(render_indexes(read))
+        return rendered
+
+    def stale_files(self, output: Optional[Path] = None,
+                    rendered: Optional[Dict[str, str]] = None) -> List[str]:
+        """Generated files whose contents on disk differ from render() (or `rendered`)."""
+        output = Path(output) if output else self.root
+        if rendered is None:
+            rendered = self.render()
+        return [rel_path for rel_path, content in rendered.items()
+                if _read_text(output / rel_path) != content]
+
+    def drifted_files(self, stale: List[str]) -> List[str]:
+        """
+        Files among `stale` (under the root) edited since they were last built.
+
+        Their contents match neither render() nor the hash recorded by the
+        last build or extract, so building would discard someone's edit.
+        """
+        drifted = []
+        for rel_path in stale:
+            content = _read_text(self.root / rel_path)
+            if content is not None and self.built.get(rel_path) != _sha256(content):
+                drifted.append(rel_path)
+        return drifted
+
+    def build(self, output: Optional[Path] = None,
+              rendered: Optional[Dict[str, str]] = None, force: bool = False) -> List[str]:
+        """
+        Write every generated file that changed; returns the written paths.
+
+        Building into the root raises DriftError, writing nothing, if a file
+        it would replace was edited outside the canonical store, unless
+        `force` is set. The hashes of the written files are recorded.
+        """
+        in_root = output is None or Path(output).resolve() == self.root.resolve()
+        output = Path(output) if output else self.root
+        if rendered is None:
+            rendered = self.render()
+        stale = self.stale_files(output, rendered)
+        if in_root and not force:
+            drifted = self.drifted_files(stale)
+            if drifted:
+                raise DriftError(drifted)
+
+        written = []
+        for rel_path in stale:
+            path = output / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(rendered[rel_path], encoding="utf-8")
+            tmp_path.replace(path)
+            written.append(rel_path)
+
+        if in_root:
+            built = {rel_path: _sha256(content) for rel_path, content in rendered.items()}
+            if built != self.built:
+                self.built = built
+                self._save_layout()
+        return written
+
+    def views_of(self, branch_id: str) -> List[str]:
+        """Files a branch is published in."""
+        return [view.file for view in self.views if branch_id in view.branch_ids]
+
+
+def main():
+    """Extract, build or check the canonical store."""
+    parser = argparse.ArgumentParser(description="Canonical branch store and generated views.")
+    parser.add_argument("command", choices=("extract", "build", "check"))
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--output", help="Write views under this directory instead of --root")
+    parser.add_argument("--force", action="store_true",
+                        help="build: overwrite files edited outside the canonical store")
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        store = CanonicalStore.extract(args.root)
+        store.save()
+        print(f"Wrote {store.directory}: {len(store.records)} branches, {len(store.views)} views")
+        if store.conflicts:
+            print(f"\n⚠️  {len(store.conflicts)} ids have diverging copies; "
+                  f"these fields are kept per view in {LAYOUT_FILE}:")
+            for branch_id, keys in store.conflicts.items():
+                print(f"  {branch_id}: {', '.join(keys)}")
+        return 0
+
+    store = CanonicalStore.load(args.root)
+
+    if args.command == "build":
+        rendered = store.render()
+        try:
+            written = store.build(args.output, rendered, force=args.force)
+        except DriftError as e:
+            for rel_path in e.files:
+                print(f"  edited outside {CANONICAL_DIR}: {rel_path}")
+            print(f"❌ Refusing to overwrite {len(e.files)} edited files; "
+                  f"run extract to adopt the edits or build --force to discard them")
+            return 1
+        for rel_path in written:
+            print(f"  wrote {rel_path}")
+        print(f"{len(written)} of {len(rendered)} generated files changed")
+        return 0
+
+    stale = store.stale_files(args.output)
+    drifted = set(store.drifted_files(stale)) if not args.output else set()
+    for rel_path in stale:
+        reason = f"edited outside {CANONICAL_DIR}" if rel_path in drifted else "stale"
+        print(f"  {reason}: {rel_path}")
+    if drifted:
+        print(f"❌ {len(stale)} generated files are out of date, {len(drifted)} of them edited "
+              f"outside {CANONICAL_DIR}; run extract to adopt the edits")
+        return 1
+    if stale:
+        print(f"❌ {len(stale)} generated files are out of date; run build")
+        return 1
+    print("✅ Generated files are up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
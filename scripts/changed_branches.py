@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Validate and audit only the branches changed between two git revisions.
+
+A PR that edits one metro file should not trigger a review of the whole
+us/co tree. This script loads the branch data as it was at a base revision
+and as it is at a head revision (the working tree by default), diffs the two
+by branch `id` rather than by line, and then runs the validation engine
+(including road-snap risk scoring) and generates an audit checklist for the
+added, modified and moved branches only.
+
+Each id is classified by comparing where it occurs and what it contains:
+
+- added:    present only at head
+- removed:  present only at base (reported, not validated)
+- moved:    same content, different file(s)
+- modified: content changed (possibly also moved)
+
+Usage:
+    python3 scripts/changed_branches.py origin/main
+    python3 scripts/changed_branches.py HEAD~3 HEAD --json changes.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from branch_store import BranchRecord, BranchStore, DEFAULT_ROOT, REPO_ROOT, write_json
+from comprehensive_branch_audit import BranchAuditor
+from validation_cache import DEFAULT_CACHE_PATH, ValidationCache, branch_hash
+from validation_engine import ValidationEngine
+
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+MOVED = "moved"
+
+DEFAULT_CHECKLIST = REPO_ROOT / "BRANCH_AUDIT_CHECKLIST_CHANGED.md"
+
+
+class GitError(Exception):
+    """Raised when a git command fails or a revision does not exist."""
+    pass
+
+
+class GitRevision:
+    """
+    Read-only access to files at a git revision.
+
+    Blobs are fetched through a single long-running `git cat-file --batch`
+    process instead of one `git show` per file.
+    """
+
+    def __init__(self, revision: str, repo: Path = REPO_ROOT):
+        self.repo = Path(repo)
+        self.commit = self._git("rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}",
+                                error=f"Unknown revision '{revision}'").strip()
+        self.revision = revision
+        self._batch = None
+
+    def _git(self, *args, error=None):
+        result = subprocess.run(["git", "-C", str(self.repo), *args],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise GitError(error or result.stderr.strip())
+        return result.stdout
+
+    def read(self, path: str) -> Optional[bytes]:
+        """Contents of `path` (relative to the repo root), or None if absent."""
+        if self._batch is None:
+            self._batch = subprocess.Popen(
+                ["git", "-C", str(self.repo), "cat-file", "--batch"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            )
+
+        self._batch.stdin.write(f"{self.commit}:{path}\n".encode("utf-8"))
+        self._batch.stdin.flush()
+
+        header = self._batch.stdout.readline().split()
+        if len(header) != 3:
+            return None  # "<object> missing"
+
+        size = int(header[2])
+        content = self._batch.stdout.read(size)
+        self._batch.stdout.read(1)  # trailing newline
+        return content if header[1] == b"blob" else None
+
+    def close(self):
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch = None
+
+
+@dataclass
+class GitBranchStore(BranchStore):
+    """A BranchStore loaded from a git revision instead of the working tree."""
+
+    revision: Optional[GitRevision] = None
+
+    @classmethod
+    def at_revision(cls, revision: GitRevision, root=None):
+        store = cls(root=Path(root) if root else DEFAULT_ROOT, revision=revision)
+        store._load_hierarchy()
+        return store
+
+    @property
+    def on_disk(self) -> bool:
+        # Paths point into the working tree, whose files may differ from the revision
+        return False
+
+    def _read(self, rel_path):
+        git_path = (self.root / rel_path).relative_to(self.revision.repo).as_posix()
+        content = self.revision.read(git_path)
+        if content is None:
+            self.load_errors.append((rel_path, f"not present at {self.revision.revision}"))
+            return None
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            self.load_errors.append((rel_path, str(e)))
+            return None
+
+    def save_modified(self):
+        raise GitError(f"Store at {self.revision.revision} is read-only")
+
+
+@dataclass
+class BranchChange:
+    """How one branch id differs between two stores."""
+
+    id: str
+    status: str
+    old: List[BranchRecord] = field(default_factory=list)
+    new: List[BranchRecord] = field(default_factory=list)
+
+    @property
+    def name(self):
+        return (self.new or self.old)[0].name
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "name": self.name,
+            "oldFiles": sorted({r.file.rel_path for r in self.old}),
+            "newFiles": sorted({r.file.rel_path for r in self.new}),
+        }
+
+
+def diff_stores(old: BranchStore, new: BranchStore) -> List[BranchChange]:
+    """Compare two stores branch-by-branch, keyed by id."""
+    old_by_id = old.by_id()
+    new_by_id = new.by_id()
+    changes = []
+
+    for branch_id in sorted(old_by_id.keys() | new_by_id.keys()):
+        old_records = old_by_id.get(branch_id, [])
+        new_records = new_by_id.get(branch_id, [])
+
+        old_occurrences = {(r.file.rel_path, branch_hash(r.data)) for r in old_records}
+        new_occurrences = {(r.file.rel_path, branch_hash(r.data)) for r in new_records}
+        if old_occurrences == new_occurrences:
+            continue
+
+        if not old_records:
+            status = ADDED
+        elif not new_records:
+            status = REMOVED
+        elif {h for _, h in old_occurrences} == {h for _, h in new_occurrences}:
+            status = MOVED
+        else:
+            status = MODIFIED
+
+        changes.append(BranchChange(branch_id, status, old_records, new_records))
+
+    return changes
+
+
+def changed_records(changes: List[BranchChange]) -> List[BranchRecord]:
+    """Head-side records for every added, modified or moved branch."""
+    return [record for change in changes if change.status != REMOVED for record in change.new]
+
+
+def audit_entries(auditor: BranchAuditor, records: List[BranchRecord], changes) -> List[Dict]:
+    """Checklist entries in the format BranchAuditor.generate_audit_checklist expects."""
+    status_by_id = {c.id: c.status for c in changes}
+    entries = []
+    for record in records:
+        entry = auditor.prepare_branch_for_audit(record.data)
+        entry['file'] = record.file.rel_path
+        entry['status'] = status_by_id[record.id]
+        entries.append(entry)
+    return entries
+
+
+def main():
+    """Diff two revisions and check only the changed branches."""
+    parser = argparse.ArgumentParser(
+        description="Validate and audit branches changed between two git revisions.")
+    parser.add_argument("base", help="Base revision (e.g. origin/main)")
+    parser.add_argument("head", nargs="?", help="Head revision (default: working tree)")
+    parser.add_argument("--checklist", default=str(DEFAULT_CHECKLIST), metavar="PATH",
+                        help="Audit checklist output (default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="Write changes and findings as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the validation cache")
+    args = parser.parse_args()
+
+    revisions = []
+    try:
+        base = GitRevision(args.base)
+        revisions.append(base)
+        old_store = GitBranchStore.at_revision(base)
+        if args.head:
+            head = GitRevision(args.head)
+            revisions.append(head)
+            new_store = GitBranchStore.at_revision(head)
+        else:
+            new_store = BranchStore.load()
+    except GitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        for revision in revisions:
+            revision.close()
+
+    changes = diff_stores(old_store, new_store)
+    head_label = args.head or "working tree"
+
+    print(f"Comparing {args.base} -> {head_label}")
+    print(f"Branches: {len(old_store)} -> {len(new_store)}")
+    for status in (ADDED, MODIFIED, MOVED, REMOVED):
+        print(f"  {status:9} {sum(1 for c in changes if c.status == status)}")
+    print()
+
+    for change in changes:
+        files = sorted({r.file.rel_path for r in (change.new or change.old)})
+        print(f"  [{change.status}] {change.name} ({', '.join(files)})")
+
+    records = changed_records(changes)
+    engine = ValidationEngine()
+    cache = None if args.no_cache else ValidationCache.load(DEFAULT_CACHE_PATH, engine.fingerprint)
+    report = engine.run(new_store, records=records, cache=cache)
+    if cache is not None:
+        cache.save(prune=False)
+
+    print()
+    print(report.format_text())
+
+    if records:
+        auditor = BranchAuditor(new_store.root, store=new_store)
+        auditor.generate_audit_checklist(audit_entries(auditor, records, changes), args.checklist)
+        print(f"\nCreated: {args.checklist} ({len(records)} changed branches)")
+    else:
+        print("\nNo added, modified or moved branches; checklist not generated")
+
+    if args.json:
+        write_json(args.json, {
+            "base": base.commit,
+            "head": head_label if not args.head else revisions[-1].commit,
+            "changes": [c.to_dict() for c in changes],
+            "validation": report.to_dict(),
+        })
+        print(f"Wrote {args.json}")
+
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
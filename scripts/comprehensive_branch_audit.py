@@ -15,14 +15,17 @@ Methodology:
 - Identifies closed, relocated, or unverifiable branches
 """
 
-import json
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from branch_store import BranchFile, BranchStore, REPO_ROOT
+from build_indexes import refresh_indexes
+
 class BranchAuditor:
-    def __init__(self, base_path: str):
-        self.base_path = Path(base_path)
+    def __init__(self, base_path: str, store: Optional[BranchStore] = None):
+        self.base_path = Path(base_path).resolve()
+        self.store = store or BranchStore.load()
         self.audit_date = datetime.now().strftime("%Y-%m-%d")
         self.results = {
             'verified_open': [],
@@ -34,25 +37,17 @@ class BranchAuditor:
             'total_audited': 0
         }
         
-    def get_all_branch_files(self) -> List[Path]:
-        """Get all JSON files containing branch data"""
-        json_files = []
-        for json_file in self.base_path.rglob("*.json"):
-            if json_file.name not in ['index.json', 'STATEWIDE_SUMMARY.json', '_needs_verification.json']:
-                json_files.append(json_file)
-        return sorted(json_files)
-    
-    def load_branches_from_file(self, file_path: Path) -> Tuple[Dict, List[Dict]]:
-        """Load branch data from a JSON file"""
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data, data.get('branches', [])
+    def get_all_branch_files(self) -> List[BranchFile]:
+        """Get all loaded branch files under the audit base path"""
+        return [
+            branch_file for branch_file in self.store.files
+            if branch_file.path.is_relative_to(self.base_path)
+        ]
     
-    def save_branches_to_file(self, file_path: Path, data: Dict):
+    def save_branches_to_file(self, branch_file: BranchFile):
         """Save updated branch data to JSON file"""
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-            f.write('\n')
+        branch_file.save()
+        refresh_indexes([branch_file])
     
     def check_verification_status(self, branch: Dict) -> str:
         """Check current verification status of a branch"""
@@ -96,9 +91,9 @@ class BranchAuditor:
         # Collect all branches for audit
         all_branches = []
         
-        for file_path in all_files:
-            file_data, branches = self.load_branches_from_file(file_path)
-            rel_path = file_path.relative_to(self.base_path)
+        for branch_file in all_files:
+            branches = branch_file.branches
+            rel_path = branch_file.path.relative_to(self.base_path)
             
             print(f"Processing: {rel_path}")
             print(f"  Branches: {len(branches)}")
@@ -183,7 +178,7 @@ class BranchAuditor:
 
 def main():
     """Main entry point"""
-    base_path = "/home/runner/work/SupplyFind/SupplyFind/supply-house-directory/us/co"
+    base_path = REPO_ROOT / "supply-house-directory" / "us" / "co"
     
     auditor = BranchAuditor(base_path)
     all_branches, needs_verification, recently_verified = auditor.audit_all_branches()
@@ -192,14 +187,14 @@ def main():
     print("\nGenerating audit checklist...")
     auditor.generate_audit_checklist(
         needs_verification,
-        "/home/runner/work/SupplyFind/SupplyFind/BRANCH_AUDIT_CHECKLIST_PRIORITY.md"
+        REPO_ROOT / "BRANCH_AUDIT_CHECKLIST_PRIORITY.md"
     )
     print("Created: BRANCH_AUDIT_CHECKLIST_PRIORITY.md (branches needing verification)")
     
     # Generate checklist for all branches
     auditor.generate_audit_checklist(
         all_branches,
-        "/home/runner/work/SupplyFind/SupplyFind/BRANCH_AUDIT_CHECKLIST_COMPLETE.md"
+        REPO_ROOT / "BRANCH_AUDIT_CHECKLIST_COMPLETE.md"
     )
     print("Created: BRANCH_AUDIT_CHECKLIST_COMPLETE.md (all branches)")
     
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Duplicate branch detection following audit/duplicate_audit_report.md.
+
+The December 2025 duplicate audit was done by hand with three rules:
+
+- exact match on normalized phone number
+- exact match on normalized name + address
+- chain + address (catches the same store listed under two trades)
+
+This engine applies the same normalization and rules automatically. Instead
+of comparing every pair of branches it only compares branches that share a
+blocking key:
+
+- phone block:   last 10 digits of the phone number
+- postal block:  postal code
+- geohash block: geohash cell (~150 m) of the display coordinates
+
+so the work is linear in the number of branches plus the (small) number of
+pairs inside each block. Blocks larger than MAX_BLOCK_SIZE are split by
+normalized address before pairing, keeping the worst case bounded.
+
+Matching pairs are merged into groups (DUP-001, DUP-002, ...). Each group
+gets a proposed canonical entry chosen with the report's selection criteria
+(most complete, verified coordinates, official website) and the values the
+other entries would contribute to it (union of brands, parts, sources).
+
+A branch id listed in several files (metro file and trade file) is one
+entity, not a duplicate.
+
+Usage:
+    python3 scripts/dedup_engine.py
+    python3 scripts/dedup_engine.py --root build/synthetic-100k --json build/duplicates.json
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from branch_store import BranchRecord, BranchStore, write_json
+
+
+# Largest block compared pairwise; larger blocks are sub-blocked by address
+MAX_BLOCK_SIZE = 64
+
+# Geohash characters used for the proximity block (7 chars ~ 153 m x 153 m)
+GEOHASH_PRECISION = 7
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+ADDRESS_ABBREVIATIONS = {
+    "st": "street", "ave": "avenue", "av": "avenue", "blvd": "boulevard",
+    "dr": "drive", "rd": "road", "ln": "lane", "ct": "court", "pl": "place",
+    "pkwy": "parkway", "hwy": "highway", "trl": "trail", "cir": "circle",
+    "hts": "heights", "fwy": "freeway", "n": "north", "s": "south",
+    "e": "east", "w": "west", "ne": "northeast", "nw": "northwest",
+    "se": "southeast", "sw": "southwest", "cr": "county road",
+}
+
+# Unit designators; the designator and the token after it are dropped
+UNIT_WORDS = {"suite", "ste", "unit", "apt", "bldg", "building", "#"}
+
+NAME_SUFFIXES = {"inc", "llc", "co", "company", "corp", "supply", "supplies", "the"}
+
+# Domains that indicate an aggregator rather than the company's own site
+AGGREGATOR_DOMAINS = ("yelp.", "google.", "facebook.", "mapquest.", "yellowpages.", "bbb.")
+
+MERGE_FIELDS = ("brandsRep", "manufacturersPartsFor", "partsFor", "trades", "tags", "sources")
+
+_PUNCTUATION = re.compile(r"[^\w\s#]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_phone(phone) -> str:
+    """Digits only, without a leading US country code."""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+
+def normalize_address(address, drop_unit=True) -> str:
+    """Lowercase, expand abbreviations, remove punctuation and (optionally) unit numbers."""
+    text = _PUNCTUATION.sub(" ", str(address or "").lower()).replace("#", " # ")
+    tokens = text.split()
+    result = []
+    skip_next = False
+    for token in tokens:
+        if skip_next:
+            skip_next = False
+            continue
+        if drop_unit and token in UNIT_WORDS:
+            skip_next = True
+            continue
+        result.append(ADDRESS_ABBREVIATIONS.get(token, token))
+    return " ".join(result)
+
+
+def normalize_name(name) -> str:
+    """Lowercase, remove punctuation and common company suffixes."""
+    text = _PUNCTUATION.sub(" ", str(name or "").lower())
+    return " ".join(token for token in text.split() if token not in NAME_SUFFIXES)
+
+
+def geohash(lat, lon, precision=GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash of a coordinate."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            rng[0] = mid
+        else:
+            bits = bits * 2
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+@dataclass
+class Entity:
+    """One distinct branch id with its normalized keys."""
+
+    record: BranchRecord
+    files: List[str]
+    phone: str
+    name: str
+    chain: str
+    address: str
+    postal: str
+    cell: Optional[str]
+
+    @property
+    def id(self):
+        return self.record.id
+
+    @classmethod
+    def from_records(cls, records: List[BranchRecord]):
+        record = records[0]
+        lat, lon = record.lat, record.lon
+        return cls(
+            record=record,
+            files=sorted({r.file.rel_path for r in records}),
+            phone=normalize_phone(record.get("phone")),
+            name=normalize_name(record.name),
+            chain=normalize_name(record.get("chain")),
+            address=normalize_address(record.get("address1")),
+            postal=str(record.get("postalCode") or "").strip()[:5],
+            cell=geohash(lat, lon) if lat is not None and lon is not None else None,
+        )
+
+
+def match_reasons(a: Entity, b: Entity) -> List[str]:
+    """The audit rules that a pair of entities satisfies."""
+    reasons = []
+    if a.phone and len(a.phone) >= 10 and a.phone == b.phone:
+        reasons.append("phone")
+    if a.address and a.address == b.address:
+        if a.name and a.name == b.name:
+            reasons.append("name+address")
+        if a.chain and a.chain == b.chain:
+            reasons.append("chain+address")
+    return reasons
+
+
+def canonical_score(entity: Entity) -> Tuple:
+    """
+    Ranking key for canonical selection (higher is better).
+
+    Follows the report: most complete fields, verified coordinates, official
+    website, richer brand list, cleaner (shorter) address.
+    """
+    data = entity.record.data
+    website = str(data.get("website", "")).lower()
+    filled = sum(1 for value in data.values() if value not in (None, "", [], {}))
+    return (
+        data.get("coordsStatus") == "verified",
+        bool(website) and not any(d in website for d in AGGREGATOR_DOMAINS),
+        bool(data.get("verification", {}).get("addressVerified")),
+        filled,
+        len(data.get("brandsRep", [])),
+        -len(str(data.get("address1", ""))),
+    )
+
+
+@dataclass
+class DuplicateGroup:
+    """A set of entities judged to be the same location."""
+
+    group_id: str
+    entities: List[Entity]
+    reasons: List[str]
+    canonical: Entity = None
+    merge: Dict[str, list] = field(default_factory=dict)
+
+    def to_dict(self):
+        def entry(e):
+            return {
+                "id": e.id,
+                "name": e.record.name,
+                "chain": e.record.get("chain"),
+                "address": e.record.get("address1"),
+                "city": e.record.get("city"),
+                "postalCode": e.record.get("postalCode"),
+                "phone": e.record.get("phone"),
+                "files": e.files,
+                "action": "keep" if e is self.canonical else "remove",
+            }
+
+        return {
+            "group": self.group_id,
+            "reasons": self.reasons,
+            "canonical": self.canonical.id,
+            "entries": [entry(e) for e in self.entities],
+            "proposedMerge": self.merge,
+        }
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class DedupEngine:
+    """Blocked duplicate detection over the distinct branches of a store."""
+
+    def __init__(self, max_block_size: int = MAX_BLOCK_SIZE):
+        self.max_block_size = max_block_size
+        self.pairs_compared = 0
+
+    @staticmethod
+    def entities(store: BranchStore) -> List[Entity]:
+        return [Entity.from_records(records) for records in store.by_id().values()]
+
+    def blocks(self, entities: List[Entity]) -> Iterable[Tuple[str, List[int]]]:
+        """Yield (kind, entity indexes) for each block that needs comparing."""
+        keyed = {}
+        for i, e in enumerate(entities):
+            if len(e.phone) >= 10:
+                keyed.setdefault(("phone", e.phone), []).append(i)
+            if e.postal:
+                keyed.setdefault(("postal", e.postal), []).append(i)
+            if e.cell:
+                keyed.setdefault(("cell", e.cell), []).append(i)
+
+        for (kind, _), members in keyed.items():
+            if len(members) < 2:
+                continue
+            if kind == "phone" or len(members) <= self.max_block_size:
+                yield kind, members
+                continue
+            by_address = {}
+            for i in members:
+                by_address.setdefault(entities[i].address, []).append(i)
+            for sub_block in by_address.values():
+                if len(sub_block) > 1:
+                    yield kind, sub_block
+
+    def find_groups(self, entities: List[Entity]) -> List[DuplicateGroup]:
+        union = _UnionFind(len(entities))
+        reasons: Dict[Tuple[int, int], set] = {}
+        seen_pairs = set()
+
+        for kind, block in self.blocks(entities):
+            if kind == "phone" and len(block) > self.max_block_size:
+                # A shared phone is a match on its own; link members to the first
+                first = block[0]
+                for other in block[1:]:
+                    union.union(first, other)
+                    reasons.setdefault((first, other), set()).add("phone")
+                continue
+
+            for x in range(len(block)):
+                for y in range(x + 1, len(block)):
+                    pair = (block[x], block[y])
+                    if pair in seen_pairs:
+                        continue
+                    seen_pairs.add(pair)
+                    self.pairs_compared += 1
+                    matched = match_reasons(entities[pair[0]], entities[pair[1]])
+                    if matched:
+                        union.union(*pair)
+                        reasons.setdefault(pair, set()).update(matched)
+
+        members: Dict[int, List[int]] = {}
+        for i in range(len(entities)):
+            root = union.find(i)
+            members.setdefault(root, []).append(i)
+
+        group_reasons: Dict[int, set] = {}
+        for (a, _), matched in reasons.items():
+            group_reasons.setdefault(union.find(a), set()).update(matched)
+
+        groups = []
+        for root in sorted(r for r, m in members.items() if len(m) > 1):
+            group_entities = [entities[i] for i in members[root]]
+            group = DuplicateGroup(
+                group_id=f"DUP-{len(groups) + 1:03d}",
+                entities=group_entities,
+                reasons=sorted(group_reasons.get(root, ())),
+            )
+            group.canonical = max(group_entities, key=canonical_score)
+            group.merge = proposed_merge(group.canonical, group_entities)
+            groups.append(group)
+        return groups
+
+    def run(self, store: BranchStore) -> List[DuplicateGroup]:
+        self.pairs_compared = 0
+        return self.find_groups(self.entities(store))
+
+
+def proposed_merge(canonical: Entity, entities: List[Entity]) -> Dict[str, list]:
+    """Values the removed entries would add to the canonical entry's list fields."""
+    merge = {}
+    for field_name in MERGE_FIELDS:
+        existing = canonical.record.get(field_name) or []
+        if not isinstance(existing, list):
+            continue
+        known = {str(v).casefold() for v in existing}
+        additions = []
+        for entity in entities:
+            if entity is canonical:
+                continue
+            for value in entity.record.get(field_name) or []:
+                key = str(value).casefold()
+                if key not in known:
+                    known.add(key)
+                    additions.append(value)
+        if additions:
+            merge[field_name] = additions
+    return merge
+
+
+def format_report(groups: List[DuplicateGroup], total: int) -> str:
+    """Markdown summary in the style of audit/duplicate_audit_report.md."""
+    lines = [
+        "# Supply House Directory - Duplicate Detection Report",
+        "",
+        f"**Total Entries Scanned:** {total}  ",
+        f"**Duplicate Groups Found:** {len(groups)}  ",
+        f"**Entries to Remove:** {sum(len(g.entities) - 1 for g in groups)}",
+        "",
+    ]
+    for group in groups:
+        lines.append(f"### {group.group_id}: {group.canonical.record.name}")
+        lines.append("")
+        lines.append(f"**Reason:** {', '.join(group.reasons)}  ")
+        lines.append("")
+        for e in group.entities:
+            action = "CANONICAL - KEEP" if e is group.canonical else "REMOVE"
+            lines.append(f"- **{action}:** `{e.id}` - {e.record.name}, "
+                         f"{e.record.get('address1', '')}, {e.record.get('city', '')} "
+                         f"({e.record.get('phone', '')}) [{', '.join(e.files)}]")
+        for field_name, values in group.merge.items():
+            lines.append(f"- **Merge {field_name}:** {', '.join(map(str, values))}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    """Detect duplicate branches and print DUP-xxx groups."""
+    parser = argparse.ArgumentParser(description="Detect duplicate supply house branches.")
+    parser.add_argument("--root", help="Directory to scan (default: supply-house-directory)")
+    parser.add_argument("--json", metavar="PATH", help="Write groups as JSON")
+    args = parser.parse_args()
+
+    store = BranchStore.load(args.root)
+    engine = DedupEngine()
+    entities = engine.entities(store)
+    groups = engine.find_groups(entities)
+
+    print(format_report(groups, len(entities)))
+    print(f"Pairs compared: {engine.pairs_compared}")
+
+    if args.json:
+        write_json(args.json, {
+            "totalEntries": len(entities),
+            "pairsCompared": engine.pairs_compared,
+            "groups": [g.to_dict() for g in groups],
+        })
+        print(f"Wrote {args.json}")
+
+    return 1 if groups else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Delta-update feed between dataset versions.
+
+A client holding yesterday's metro files should not re-download a whole
+file because one branch's arrivalLat moved. This script records dataset
+versions and publishes field-level patches between them:
+
+    <feed>/head.json                       current version, version history and,
+                                           for recent versions, a direct
+                                           catch-up patch to head
+    <feed>/patches/<from>..<to>.json       patch documents
+    <feed>/_states/<version>.json.gz       private snapshots used to diff
+
+A version is the first 16 hex digits of a sha256 over the branch content
+(file, id, data), so re-running on unchanged data adds nothing. Every new
+version gets a chain patch from the previous head, and each of the last
+MAX_CATCH_UP versions gets a direct patch to the new head: a client at
+version N downloads head.json and then exactly one patch (or follows the
+chain if N is older, or re-syncs the full files if N is unknown).
+
+Patch documents list changes per (file, id):
+
+    {"op": "add",    "file": ..., "id": ..., "position": 3, "branch": {...}}
+    {"op": "remove", "file": ..., "id": ...}
+    {"op": "modify", "file": ..., "id": ..., "patch": [
+        {"op": "replace", "path": "/arrivalLat", "value": 39.7810},
+        {"op": "add", "path": "/verification/addressVerified", "value": true},
+        {"op": "remove", "path": "/notes"}]}
+
+Field operations use RFC 6902 JSON Patch syntax relative to the branch;
+nested objects are diffed key by key, lists are replaced whole. A branch
+moved between files is a remove plus an add; a file that disappears gets
+a single {"op": "removeFile", "file": ...}. Versions hash branch content
+with sorted keys, so reordering branches within a file is not a change.
+Index files are small and carry content hashes (build_indexes.py), so
+they are not part of the feed.
+
+Usage:
+    python3 scripts/delta_feed.py append                  # working tree
+    python3 scripts/delta_feed.py append --revision HEAD~1
+    python3 scripts/delta_feed.py plan <version>
+"""
+
+import argparse
+import copy
+import gzip
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from branch_store import BranchStore, REPO_ROOT, read_json, write_json_atomic
+from changed_branches import GitBranchStore, GitError, GitRevision
+
+
+DEFAULT_FEED = REPO_ROOT / "build" / "feed"
+HEAD_FILE = "head.json"
+FEED_VERSION = 1
+
+# Versions that keep a direct patch to head (and a stored snapshot)
+MAX_CATCH_UP = 20
+
+# file -> id -> branch
+State = Dict[str, Dict[str, dict]]
+
+
+def store_state(store: BranchStore) -> State:
+    """Branch content of a store keyed by file and id."""
+    return {f.rel_path: {b.get("id"): b for b in f.branches} for f in store.files}
+
+
+def state_version(state: State) -> str:
+    digest = hashlib.sha256(json.dumps(state, sort_keys=True, ensure_ascii=False,
+                                       separators=(",", ":")).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _pointer(path: str, key: str) -> str:
+    return f"{path}/{key.replace('~', '~0').replace('/', '~1')}"
+
+
+def diff_values(old: dict, new: dict, path: str = "") -> List[dict]:
+    """JSON Patch operations turning object `old` into `new`."""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": _pointer(path, key)})
+    for key, value in new.items():
+        pointer = _pointer(path, key)
+        if key not in old:
+            ops.append({"op": "add", "path": pointer, "value": value})
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            ops.extend(diff_values(old[key], value, pointer))
+        elif old[key] != value or type(old[key]) is not type(value):
+            ops.append({"op": "replace", "path": pointer, "value": value})
+    return ops
+
+
+def diff_states(old: State, new: State) -> List[dict]:
+    """Per-(file, id) changes between two states, in file then id order."""
+    changes = []
+    for rel_path in sorted(set(old) | set(new)):
+        if rel_path not in new:
+            changes.append({"op": "removeFile", "file": rel_path})
+            continue
+        old_branches = old.get(rel_path, {})
+        new_branches = new[rel_path]
+        for branch_id in sorted(old_branches.keys() - new_branches.keys()):
+            changes.append({"op": "remove", "file": rel_path, "id": branch_id})
+        for position, (branch_id, branch) in enumerate(new_branches.items()):
+            if branch_id not in old_branches:
+                changes.append({"op": "add", "file": rel_path, "id": branch_id,
+                                "position": position, "branch": branch})
+            elif old_branches[branch_id] != branch:
+                changes.append({"op": "modify", "file": rel_path, "id": branch_id,
+                                "patch": diff_values(old_branches[branch_id], branch)})
+    return changes
+
+
+def _apply_ops(branch: dict, ops: List[dict]):
+    for op in ops:
+        keys = [k.replace("~1", "/").replace("~0", "~") for k in op["path"].split("/")[1:]]
+        target = branch
+        for key in keys[:-1]:
+            target = target[key]
+        if op["op"] == "remove":
+            del target[keys[-1]]
+        else:
+            target[keys[-1]] = op["value"]
+
+
+def apply_patch(state: State, patch: dict) -> State:
+    """Return a new state with a patch document applied (what a client does)."""
+    state = copy.deepcopy(state)
+    for change in patch["changes"]:
+        branches = state.setdefault(change["file"], {})
+        if change["op"] == "removeFile":
+            del state[change["file"]]
+        elif change["op"] == "remove":
+            del branches[change["id"]]
+        elif change["op"] == "add":
+            items = list(branches.items())
+            items.insert(change["position"], (change["id"], copy.deepcopy(change["branch"])))
+            state[change["file"]] = dict(items)
+        else:
+            _apply_ops(branches[change["id"]], change["patch"])
+    return state
+
+
+class DeltaFeed:
+    """The on-disk feed: version history, snapshots and patch documents."""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else DEFAULT_FEED
+        head_path = self.directory / HEAD_FILE
+        self.head = read_json(head_path) if head_path.exists() else {
+            "feedVersion": FEED_VERSION, "head": None, "versions": [], "catchUp": {},
+        }
+
+    @property
+    def versions(self) -> List[dict]:
+        return self.head["versions"]
+
+    def _state_path(self, version: str) -> Path:
+        return self.directory / "_states" / f"{version}.json.gz"
+
+    def _patch_name(self, old: str, new: str) -> str:
+        return f"patches/{old}..{new}.json"
+
+    def load_state(self, version: str) -> Optional[State]:
+        path = self._state_path(version)
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self, version: str, state: State):
+        path = self._state_path(version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+
+    def _write_patch(self, old: str, new: str, old_state: State, new_state: State) -> dict:
+        changes = diff_states(old_state, new_state)
+        name = self._patch_name(old, new)
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"from": old, "to": new, "changes": changes},
+                                       ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        tmp_path.replace(path)
+        return {"path": name, "changes": len(changes), "bytes": path.stat().st_size}
+
+    def append(self, state: State, label: Optional[str] = None) -> Optional[str]:
+        """Record `state` as the new head; returns its version, or None if unchanged."""
+        version = state_version(state)
+        previous = self.head["head"]
+        if version == previous:
+            return None
+
+        entry = {"version": version, "sequence": len(self.versions) + 1,
+                 "created": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        if label:
+            entry["label"] = label
+
+        if previous is not None:
+            previous_state = self.load_state(previous)
+            self.versions[-1]["next"] = self._write_patch(previous, version, previous_state, state)
+        self.versions.append(entry)
+        self._save_state(version, state)
+
+        # Catch-up patches to the old head are obsolete (chain patches stay)
+        chain_paths = {v["next"]["path"] for v in self.versions if "next" in v}
+        for old_patch in self.head["catchUp"].values():
+            old_path = self.directory / old_patch["path"]
+            if old_patch["path"] not in chain_paths and old_path.exists():
+                old_path.unlink()
+
+        catch_up = {}
+        for old_entry in self.versions[-(MAX_CATCH_UP + 1):-1]:
+            old_version = old_entry["version"]
+            if old_version == previous:
+                catch_up[old_version] = old_entry["next"]
+                continue
+            old_state = self.load_state(old_version)
+            if old_state is not None:
+                catch_up[old_version] = self._write_patch(old_version, version, old_state, state)
+
+        # Versions that fell out of the window no longer need their snapshot
+        for old_entry in self.versions[:-(MAX_CATCH_UP + 1)]:
+            path = self._state_path(old_entry["version"])
+            if path.exists():
+                path.unlink()
+
+        self.head["head"] = version
+        self.head["catchUp"] = catch_up
+        write_json_atomic(self.directory / HEAD_FILE, self.head)
+        return version
+
+    def plan(self, version: str) -> Optional[List[str]]:
+        """Patch paths that bring a client from `version` to head (None: full re-sync)."""
+        if version == self.head["head"]:
+            return []
+        if version in self.head["catchUp"]:
+            return [self.head["catchUp"][version]["path"]]
+        chain = None
+        for entry in self.versions:
+            if entry["version"] == version:
+                chain = []
+            if chain is not None and "next" in entry:
+                chain.append(entry["next"]["path"])
+        return chain
+
+
+def main():
+    """Append the current dataset as a feed version, or print a catch-up plan."""
+    parser = argparse.ArgumentParser(description="Field-level delta feed between dataset versions.")
+    parser.add_argument("--feed", help=f"Feed directory (default: {DEFAULT_FEED})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    append_parser = sub.add_parser("append", help="Record the data as a new version")
+    append_parser.add_argument("--revision", help="Read the data at this git revision "
+                                                  "(default: working tree)")
+    plan_parser = sub.add_parser("plan", help="Patches needed to reach head from a version")
+    plan_parser.add_argument("version")
+    args = parser.parse_args()
+
+    feed = DeltaFeed(args.feed)
+
+    if args.command == "plan":
+        patches = feed.plan(args.version)
+        if patches is None:
+            print(f"Unknown version {args.version}: full re-sync required", file=sys.stderr)
+            return 1
+        print(f"{args.version} -> {feed.head['head']}: {len(patches)} patch(es)")
+        for path in patches:
+            print(f"  {path}")
+        return 0
+
+    if args.revision:
+        try:
+            revision = GitRevision(args.revision)
+            store = GitBranchStore.at_revision(revision)
+            revision.close()
+        except GitError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        label = revision.commit
+    else:
+        store = BranchStore.load()
+        label = None
+
+    version = feed.append(store_state(store), label=label)
+    if version is None:
+        print(f"Unchanged: head is still {feed.head['head']}")
+        return 0
+
+    print(f"New head {version} (version {len(feed.versions)})")
+    previous = feed.versions[-2] if len(feed.versions) > 1 else None
+    if previous:
+        link = previous["next"]
+        print(f"  chain patch {link['path']}: {link['changes']} changes, {link['bytes']:,} bytes")
+    print(f"  catch-up patches: {len(feed.head['catchUp'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
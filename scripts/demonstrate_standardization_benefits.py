@@ -6,8 +6,7 @@ This script shows how the standardized names are easier to work with in
 practical applications, particularly for the Price-Cal supply page integration.
 """
 
-import json
-import glob
+from branch_store import BranchStore
 
 
 def demonstrate_old_vs_new_parsing():
@@ -78,16 +77,13 @@ def show_real_world_example():
     print("REAL-WORLD EXAMPLE FROM SUPPLYFIND DATA")
     print("="*70)
     
-    # Load a sample file
-    filepath = 'supply-house-directory/us/co/electrical/denver-metro.json'
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-    
-    # Find a branch with standardized names
+    # Find a branch with standardized names in the Denver electrical file
     sample_branch = None
-    for branch in data['branches']:
-        if branch.get('brandsRep') and 'Schneider' in branch['brandsRep']:
-            sample_branch = branch
+    for record in BranchStore.load().branches():
+        if record.file.rel_path != 'us/co/electrical/denver-metro.json':
+            continue
+        if record.get('brandsRep') and 'Schneider' in record.get('brandsRep'):
+            sample_branch = record.data
             break
     
     if sample_branch:
@@ -113,16 +109,9 @@ def analyze_parsing_efficiency():
     
     all_brands = set()
     
-    for filepath in glob.glob('supply-house-directory/us/co/**/*.json', recursive=True):
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-                if 'branches' in data:
-                    for branch in data['branches']:
-                        if 'brandsRep' in branch:
-                            all_brands.update(branch['brandsRep'])
-        except:
-            pass
+    for record in BranchStore.load().branches():
+        if record.file.state == 'CO' and 'brandsRep' in record.data:
+            all_brands.update(record.data['brandsRep'])
     
     # Count complexity metrics
     single_word = sum(1 for b in all_brands if len(b.split()) == 1)
@@ -12,16 +12,32 @@ Detection methods:
 4. Identify branches that should be reviewed based on location type
 """
 
-import json
 import os
 import sys
-from pathlib import Path
-from datetime import datetime
+
+from branch_store import BranchStore, REPO_ROOT
+from keyword_matcher import keyword_categories
 
 
 # Constants
 COORDINATE_SCALE_FACTOR = 1000000  # Used to convert coordinates to check decimal precision
 
+# Keyword categories (keyword_matcher.KEYWORDS) for the generic-entrance check
+MAJOR_ROAD_CATEGORIES = frozenset({"major_road"})
+VAGUE_SOURCE_CATEGORIES = frozenset({"vague_source"})
+
+
+def is_vague_entrance_on_major_road(branch):
+    """
+    True for 'entrance' precision on a boulevard/parkway/freeway address
+    whose geoSource does not identify a verified entrance.
+    """
+    if branch.get("geoPrecision") != "entrance":
+        return False
+    if not keyword_categories(branch.get("address1", "")) & MAJOR_ROAD_CATEGORIES:
+        return False
+    return bool(keyword_categories(branch.get("geoSource", "")) & VAGUE_SOURCE_CATEGORIES)
+
 
 def check_coordinate_precision(lat, lon):
     """
@@ -136,77 +152,38 @@ def validate_branch_coordinates(branch, file_path):
         )
     
     # Check for generic entrance + suspicious patterns
-    if branch.get("geoPrecision") == "entrance":
-        address1 = branch.get("address1", "").lower()
-        geo_source = branch.get("geoSource", "").lower()
-        
-        if "boulevard" in address1 or "parkway" in address1 or "freeway" in address1:
-            if "previously verified" in geo_source or "approximate" in geo_source:
-                warnings.append(
-                    f"{branch_name}: ⚠️  Generic 'entrance' precision on Boulevard/Parkway with non-specific source"
-                )
+    if is_vague_entrance_on_major_road(branch):
+        warnings.append(
+            f"{branch_name}: ⚠️  Generic 'entrance' precision on Boulevard/Parkway with non-specific source"
+        )
     
     return warnings
 
 
-def validate_json_file(file_path, repo_root):
+def validate_branch_file(branch_file, repo_root):
     """
-    Validate a single JSON file for road-snapping issues.
+    Validate a branch file for road-snapping issues, in a single pass.
     
     Returns (total_branches, warnings) tuple.
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        return (0, [f"JSON parse error in {file_path}: {e}"])
-    except Exception as e:
-        return (0, [f"Error reading {file_path}: {e}"])
-    
-    branches = data.get("branches", [])
-    if not branches:
-        return (0, [])
-    
+    total = 0
     all_warnings = []
-    rel_path = os.path.relpath(file_path, repo_root)
+    rel_path = os.path.relpath(branch_file.path, repo_root)
     
-    for branch in branches:
-        branch_warnings = validate_branch_coordinates(branch, file_path)
+    for branch in branch_file.branches:
+        total += 1
+        branch_warnings = validate_branch_coordinates(branch, branch_file.path)
         if branch_warnings:
             all_warnings.append(f"\n[{rel_path}]")
             all_warnings.extend([f"  {w}" for w in branch_warnings])
     
-    return (len(branches), all_warnings)
-
-
-def find_branch_files(base_dir):
-    """Find all JSON files containing branch data."""
-    branch_files = []
-    
-    for root, dirs, files in os.walk(base_dir):
-        if '_meta' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.json') and not file.startswith('_'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if "branches" in data:
-                            branch_files.append(file_path)
-                except:
-                    pass
-    
-    return sorted(branch_files)
+    return (total, all_warnings)
 
 
 def main():
     """Main validation function."""
     # Determine base directory
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    repo_root = REPO_ROOT
     supply_dir = repo_root / "supply-house-directory"
     
     if not supply_dir.exists():
@@ -221,8 +198,9 @@ def main():
     print("centerlines rather than actual building entrances.")
     print()
     
-    # Find all branch files
-    branch_files = find_branch_files(supply_dir)
+    # Discover branch files; each is streamed while it is validated
+    store = BranchStore.stream(supply_dir)
+    branch_files = store.files
     
     if not branch_files:
         print("No branch files found!", file=sys.stderr)
@@ -236,8 +214,13 @@ def main():
     all_warnings = []
     files_with_warnings = 0
     
-    for file_path in branch_files:
-        branches, warnings = validate_json_file(file_path, repo_root)
+    for rel_path, error in store.load_errors:
+        files_with_warnings += 1
+        all_warnings.append(f"\n[{rel_path}]")
+        all_warnings.append(f"  Error reading file: {error}")
+    
+    for branch_file in branch_files:
+        branches, warnings = validate_branch_file(branch_file, repo_root)
         
         total_branches += branches
         
@@ -252,7 +235,8 @@ def main():
     print(f"Files validated:        {len(branch_files)}")
     print(f"Total branches:         {total_branches}")
     print(f"Files with warnings:    {files_with_warnings}")
-    print(f"Total warnings:         {len([w for w in all_warnings if not w.startswith('\n')])}")
+    warning_count = len([w for w in all_warnings if not w.startswith("\n")])
+    print(f"Total warnings:         {warning_count}")
     print()
     
     if all_warnings:
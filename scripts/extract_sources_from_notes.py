@@ -7,10 +7,14 @@ This script extracts that information and adds it to the sources array so it can
 used for verification.
 """
 
-import json
-import glob
+import argparse
+import os
 import re
 
+from branch_store import BranchStore, REPO_ROOT
+from file_pool import add_workers_argument, map_files
+from source_registry import canonical_key
+
 def extract_sources_from_notes(notes):
     """
     Extract source URLs and mentions from notes field.
@@ -20,9 +24,9 @@ def extract_sources_from_notes(notes):
     
     sources = []
     
-    # Extract URLs
+    # Extract URLs (without sentence punctuation that ends a URL in prose)
     urls = re.findall(r'https?://[^\s,;]+', notes)
-    sources.extend(urls)
+    sources.extend(url.rstrip('.)') for url in urls)
     
     # Extract source mentions (e.g., "Source: Company Name")
     # Look for common patterns like "Source:", "Verified via", etc.
@@ -42,78 +46,94 @@ def extract_sources_from_notes(notes):
     
     return sources
 
-def update_sources():
+def update_file_sources(branch_file):
     """
-    Update sources array from notes field for branches missing sources.
+    Fill the sources array from notes for branches in one file.
+    
+    Marks the file modified if anything changed; writing is left to the caller.
     """
     stats = {
         'total_processed': 0,
         'sources_added': 0,
-        'branches_updated': 0,
-        'files_modified': set()
+        'branches_updated': 0
     }
     
-    files = glob.glob("supply-house-directory/us/**/*.json", recursive=True)
-    
-    for file_path in files:
-        if "/_meta/" in file_path or "STATEWIDE" in file_path:
-            continue
+    for branch in branch_file.branches:
+        stats['total_processed'] += 1
         
-        modified = False
+        # Skip if already has sources
+        existing_sources = branch.get('sources', [])
+        verification = branch.get('verification', {})
+        verification_sources = verification.get('sources', [])
         
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        all_sources = existing_sources + verification_sources
         
-        if "branches" not in data:
+        if len(all_sources) > 0:
             continue
         
-        for branch in data["branches"]:
-            stats['total_processed'] += 1
-            
-            # Skip if already has sources
-            existing_sources = branch.get('sources', [])
-            verification = branch.get('verification', {})
-            verification_sources = verification.get('sources', [])
-            
-            all_sources = existing_sources + verification_sources
-            
-            if len(all_sources) > 0:
-                continue
+        # Extract from notes
+        notes = branch.get('notes', '')
+        extracted = extract_sources_from_notes(notes)
+        
+        if extracted:
+            # Add to sources array
+            if 'sources' not in branch:
+                branch['sources'] = []
             
-            # Extract from notes
-            notes = branch.get('notes', '')
-            extracted = extract_sources_from_notes(notes)
+            # Add unique sources only (compared in canonical form, so
+            # "https://www.x.com/locations/" and "http://x.com/locations" are one source)
+            seen = {canonical_key(source) for source in branch['sources']}
+            for source in extracted:
+                key = canonical_key(source)
+                if key not in seen:
+                    seen.add(key)
+                    branch['sources'].append(source)
+                    stats['sources_added'] += 1
             
-            if extracted:
-                # Add to sources array
-                if 'sources' not in branch:
-                    branch['sources'] = []
-                
-                # Add unique sources only
-                for source in extracted:
-                    if source not in branch['sources']:
-                        branch['sources'].append(source)
-                        stats['sources_added'] += 1
-                
-                stats['branches_updated'] += 1
-                stats['files_modified'].add(file_path)
-                modified = True
+            stats['branches_updated'] += 1
+            branch_file.mark_modified()
+    
+    return stats
+
+def update_sources(workers=None):
+    """
+    Update sources array from notes field for branches missing sources.
+    """
+    stats = {
+        'total_processed': 0,
+        'sources_added': 0,
+        'branches_updated': 0,
+        'files_modified': set()
+    }
+    
+    store = BranchStore.stream(rewrite=True)
+    
+    for result in map_files(update_file_sources, store.files, workers=workers):
+        file_path = os.path.relpath(result.branch_file.path, REPO_ROOT)
         
-        # Write back if modified
-        if modified:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                f.write('\n')
+        if result.error:
+            print(f"Error processing {file_path}: {result.error}")
+            continue
+        
+        for key in ('total_processed', 'sources_added', 'branches_updated'):
+            stats[key] += result.stats[key]
+        
+        if result.modified:
+            stats['files_modified'].add(file_path)
     
     return stats
 
 def main():
+    parser = argparse.ArgumentParser(description="Copy source references from notes into sources.")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("EXTRACTING SOURCES FROM NOTES")
     print("=" * 80)
     print()
     
-    stats = update_sources()
+    stats = update_sources(workers=args.workers)
     
     print("RESULTS:")
     print("=" * 80)
@@ -127,7 +147,6 @@ def main():
         print("✅ Successfully extracted sources from notes")
         print()
         print("Modified files:")
-        import os
         cwd = os.getcwd()
         for f in sorted(stats['files_modified']):
             rel_path = os.path.relpath(f, cwd) if f.startswith(cwd) else f
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Run independent per-file work over a process pool.
+
+The migration scripts (add_geo_precision_metadata, migrate_arrival_coordinates,
+migrate_verification_metadata, standardize_manufacturer_names,
+extract_sources_from_notes) each transform one branch file at a time with no
+state shared between files. map_files() fans that work out over worker
+processes:
+
+- the worker is a module-level function that takes a BranchFile, edits its
+  data in place, calls mark_modified() if it changed anything and returns
+  per-file stats. An exception in the worker is recorded as that file's
+  error, its partial work is discarded and the other files carry on;
+- results come back in input order regardless of which worker finished
+  first, so summaries are deterministic;
+- edited data is shipped back to the parent, which alone writes files, one
+  at a time and atomically. Files from BranchStore.stream(rewrite=True) are
+  rewritten to a temporary sibling during the worker's pass instead, and
+  the parent only moves the finished copy into place. Once the files are
+  written, the index entries listing them are rebuilt
+  (build_indexes.refresh_indexes).
+
+With workers=1 (or a single file) everything runs in-process.
+
+Usage:
+    results = map_files(process_branch_file, store.files, workers=args.workers)
+    for result in results:
+        print(result.branch_file.rel_path, result.stats)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Iterable, List, Optional
+
+from branch_store import BranchFile
+from build_indexes import refresh_indexes
+
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+@dataclass
+class FileJobResult:
+    """Outcome of running the worker on one file."""
+
+    branch_file: BranchFile
+    stats: Any
+    modified: bool = False
+    error: Optional[str] = None
+
+
+def _run_job(worker, branch_file):
+    """Worker-process side: run the job and return only what changed, or the error."""
+    try:
+        stats = worker(branch_file)
+        branch_file.finish()
+    except Exception as e:
+        branch_file.discard()
+        return None, False, None, f"{type(e).__name__}: {e}"
+    return stats, branch_file.modified, branch_file.data if branch_file.modified else None, None
+
+
+def add_workers_argument(parser):
+    """Add the standard --workers option to an argparse parser."""
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, metavar="N",
+                        help="Worker processes (default: %(default)s; 1 runs in-process)")
+
+
+def map_files(worker: Callable[[BranchFile], Any], branch_files: Iterable[BranchFile],
+              workers: Optional[int] = None, save: bool = True) -> List[FileJobResult]:
+    """
+    Run `worker` on every file and return one FileJobResult per file, in order.
+
+    Modified files are written by this (the parent) process after all work
+    has finished, unless save=False. A worker exception or a failed write is
+    recorded in the result's `error` (with stats None for a worker
+    exception) instead of aborting the remaining files.
+    """
+    files = list(branch_files)
+    workers = min(workers or DEFAULT_WORKERS, len(files))
+
+    if workers <= 1:
+        outputs = [_run_job(worker, f) for f in files]
+    else:
+        chunksize = max(1, len(files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(partial(_run_job, worker), files, chunksize=chunksize))
+
+    results = []
+    for branch_file, (stats, modified, data, error) in zip(files, outputs):
+        if data is not None:
+            branch_file.data = data
+        if modified:
+            branch_file.mark_modified()
+        results.append(FileJobResult(branch_file, stats, modified, error))
+
+    if save:
+        saved = []
+        for result in results:
+            if not result.modified:
+                continue
+            try:
+                result.branch_file.save()
+                saved.append(result.branch_file)
+            except OSError as e:
+                result.error = str(e)
+        if saved:
+            refresh_indexes(saved)
+
+    return results
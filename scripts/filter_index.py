@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Inverted indexes for filtering branches by trade, brand, chain and tags.
+
+FILTERING_EXAMPLES.md describes client-side filters such as
+`branches.filter(b => b.trades.includes('HVAC'))`, which scan every branch on
+every keystroke. FilterIndex precomputes one posting list per (field, value)
+pair instead. Posting lists are bitmaps stored as Python ints (bit n set means
+document n matches), so AND/OR across filters run as single C-level bitwise
+operations no matter how many branches are indexed. Brand fields are keyed
+by BrandRegistry id, so "Mitsubishi Electric" and "mitsubishi" share one
+posting list; brand names missing from _meta are indexed as plain strings
+and counted in `index.brands.unknown`.
+
+Boolean filters can be combined with the GeoIndex spatial index:
+
+    index = FilterIndex.from_store(BranchStore.load())
+    hits = index.search({"primaryTrade": "HVAC", "brandsRep": "Daikin"},
+                        near=(39.7392, -104.9903), radius_miles=25)
+
+Usage:
+    python3 scripts/filter_index.py --where primaryTrade=HVAC --where brandsRep=Daikin \\
+        --lat 39.7392 --lon -104.9903 --radius 25
+"""
+
+import argparse
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from brand_registry import BRAND_FIELDS, BrandRegistry
+from branch_store import BranchStore
+from geo_index import GeoIndex, Neighbor
+
+
+# Branch fields that get posting lists (list-valued or scalar)
+INDEXED_FIELDS = (
+    "trades",
+    "primaryTrade",
+    "brandsRep",
+    "manufacturersPartsFor",
+    "partsFor",
+    "chain",
+    "parentChain",
+    "tags",
+)
+
+# Bit positions set in each byte value, used to decode bitmaps quickly
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def normalize_value(value):
+    """Posting list key for a field value (case and whitespace insensitive)."""
+    return str(value).strip().casefold()
+
+
+def bitmap(doc_ids: Sequence[int]) -> int:
+    """
+    Bitmap with the given (ascending) document ids set.
+
+    Built in a bytearray and converted once: OR-ing bits into an int one by
+    one copies the whole int each time, which is quadratic for dense lists.
+    """
+    if not doc_ids:
+        return 0
+    data = bytearray((doc_ids[-1] >> 3) + 1)
+    for doc_id in doc_ids:
+        data[doc_id >> 3] |= 1 << (doc_id & 7)
+    return int.from_bytes(data, "little")
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of set bits in ascending order."""
+    if mask <= 0:
+        return
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for byte_index, value in enumerate(data):
+        if value:
+            base = byte_index * 8
+            for bit in _BYTE_BITS[value]:
+                yield base + bit
+
+
+class BitmapSet:
+    """O(1) membership tests against a bitmap, for use as a query predicate."""
+
+    def __init__(self, mask: int, size: int):
+        self._bits = mask.to_bytes((size + 7) // 8 or 1, "little")
+
+    def __contains__(self, doc_id):
+        return self._bits[doc_id >> 3] >> (doc_id & 7) & 1 == 1
+
+
+class FilterIndex:
+    """
+    Posting lists keyed by (field, normalized value).
+
+    Documents are numbered in load order; a branch id that appears in several
+    files is indexed once. `records[doc_id]` maps back to the BranchRecord.
+    """
+
+    def __init__(self, records: Sequence[object], fields: Iterable[str] = INDEXED_FIELDS,
+                 brands: Optional[BrandRegistry] = None):
+        self.records = list(records)
+        self.fields = tuple(fields)
+        self.brands = brands
+        self.all_docs = (1 << len(self.records)) - 1
+        self._geo = None
+
+        # Collect ascending doc ids per key, then build each bitmap once
+        doc_ids: Dict[str, Dict[object, List[int]]] = {field: {} for field in self.fields}
+        for doc_id, record in enumerate(self.records):
+            for field in self.fields:
+                value = record.get(field)
+                if value is None:
+                    continue
+                values = value if isinstance(value, list) else [value]
+                field_ids = doc_ids[field]
+                for item in values:
+                    ids = field_ids.setdefault(self._key(field, item), [])
+                    if not ids or ids[-1] != doc_id:
+                        ids.append(doc_id)
+        self.postings: Dict[str, Dict[object, int]] = {
+            field: {key: bitmap(ids) for key, ids in field_ids.items()}
+            for field, field_ids in doc_ids.items()
+        }
+
+    @classmethod
+    def from_store(cls, store: BranchStore, fields: Iterable[str] = INDEXED_FIELDS):
+        """Index every distinct branch in a BranchStore, with brands from its _meta tables."""
+        records = []
+        seen = set()
+        for record in store.branches():
+            if record.id not in seen:
+                seen.add(record.id)
+                records.append(record)
+        return cls(records, fields=fields, brands=BrandRegistry.load(store.root))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def geo(self) -> GeoIndex:
+        """Spatial index over the same document ids, built on first use."""
+        if self._geo is None:
+            points = []
+            doc_ids = []
+            for doc_id, record in enumerate(self.records):
+                lat, lon = record.routing_coords
+                if lat is not None and lon is not None:
+                    points.append((lat, lon))
+                    doc_ids.append(doc_id)
+            self._geo = GeoIndex(points, doc_ids)
+        return self._geo
+
+    def _key(self, field: str, value, count_unknown: bool = True):
+        """
+        Posting list key: the registry's integer id for a known brand (so
+        every spelling shares one list), else the normalized value.
+        """
+        if self.brands is not None and field in BRAND_FIELDS:
+            brand_id = self.brands.lookup(value, count_unknown=count_unknown)
+            if brand_id is not None:
+                return brand_id
+        return normalize_value(value)
+
+    def values(self, field: str) -> List[str]:
+        """Distinct indexed values for a field (canonical names for known brands)."""
+        return sorted(self.brands.names[key] if isinstance(key, int) else key
+                      for key in self.postings[field])
+
+    def posting(self, field: str, value) -> int:
+        """Bitmap of documents whose field contains value."""
+        if field not in self.postings:
+            raise KeyError(f"Field '{field}' is not indexed. Indexed fields: {', '.join(self.fields)}")
+        return self.postings[field].get(self._key(field, value, count_unknown=False), 0)
+
+    def match(self, criteria: Dict[str, object]) -> int:
+        """
+        Evaluate a conjunctive filter.
+
+        Each criterion maps a field to a value or a list of values; values for
+        the same field are OR-ed, fields are AND-ed. An empty filter matches
+        every document.
+        """
+        mask = self.all_docs
+        for field, wanted in criteria.items():
+            options = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            field_mask = 0
+            for value in options:
+                field_mask |= self.posting(field, value)
+            mask &= field_mask
+            if not mask:
+                break
+        return mask
+
+    def count(self, mask: int) -> int:
+        return bin(mask).count("1")
+
+    def doc_ids(self, mask: int) -> List[int]:
+        return list(iter_bits(mask))
+
+    def search(self, criteria: Dict[str, object],
+               near: Optional[Tuple[float, float]] = None,
+               radius_miles: Optional[float] = None,
+               k: Optional[int] = None) -> List[Neighbor]:
+        """
+        Filter branches and optionally restrict/order them by distance.
+
+        Without `near`, matches are returned in document order with a distance
+        of 0. With `near`, either every match within radius_miles or the k
+        nearest matches (optionally capped by radius_miles) are returned.
+        """
+        mask = self.match(criteria)
+        if not mask:
+            return []
+
+        if near is None:
+            return [Neighbor(0.0, self.records[d]) for d in iter_bits(mask)]
+
+        members = BitmapSet(mask, len(self.records))
+        predicate = None if mask == self.all_docs else members.__contains__
+        lat, lon = near
+
+        if k is None:
+            if radius_miles is None:
+                raise ValueError("search near a point needs radius_miles or k")
+            hits = self.geo.within(lat, lon, radius_miles, predicate=predicate)
+        else:
+            hits = self.geo.nearest(lat, lon, k=k, predicate=predicate, max_miles=radius_miles)
+
+        return [Neighbor(miles, self.records[doc_id]) for miles, doc_id in hits]
+
+
+def parse_criteria(expressions: Sequence[str]) -> Dict[str, List[str]]:
+    """Turn ["field=value", ...] into a criteria dict (repeated fields are OR-ed)."""
+    criteria = {}
+    for expression in expressions:
+        field, sep, value = expression.partition("=")
+        if not sep or not field or not value:
+            raise ValueError(f"Invalid filter '{expression}'. Expected field=value")
+        criteria.setdefault(field.strip(), []).append(value.strip())
+    return criteria
+
+
+def main():
+    """Run a filtered (and optionally proximity) branch search."""
+    parser = argparse.ArgumentParser(description="Filter supply houses using inverted indexes.")
+    parser.add_argument("--where", action="append", default=[], metavar="FIELD=VALUE",
+                        help=f"Filter on one of: {', '.join(INDEXED_FIELDS)}")
+    parser.add_argument("--lat", type=float, help="Latitude to search near")
+    parser.add_argument("--lon", type=float, help="Longitude to search near")
+    parser.add_argument("--radius", type=float, help="Search radius in miles")
+    parser.add_argument("-k", type=int, help="Return only the k nearest matches")
+    args = parser.parse_args()
+
+    try:
+        criteria = parse_criteria(args.where)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    near = None
+    if args.lat is not None or args.lon is not None:
+        if args.lat is None or args.lon is None:
+            print("Error: --lat and --lon must be given together", file=sys.stderr)
+            return 2
+        if args.radius is None and args.k is None:
+            args.k = 10
+        near = (args.lat, args.lon)
+
+    index = FilterIndex.from_store(BranchStore.load())
+
+    try:
+        results = index.search(criteria, near=near, radius_miles=args.radius, k=args.k)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 2
+
+    print(f"Indexed {len(index)} branches, {len(results)} match")
+    print()
+
+    for i, (miles, record) in enumerate(results, 1):
+        distance = f"{miles:7.2f} mi  " if near else ""
+        print(f"{i:3}. {distance}{record.name}  [{', '.join(record.trades)}]")
+
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic supply house directory for scale testing.
+
+The real dataset (218 Colorado branches) is too small to show how the
+tooling scales. This script writes a directory with the same layout and
+branch schema as supply-house-directory:
+
+    <output>/_meta/{brands,manufacturers,chains}.json
+    <output>/us/index.json
+    <output>/us/<state>/index.json
+    <output>/us/<state>/<metro>.json
+    <output>/us/<state>/<trade>/index.json
+    <output>/us/<state>/<trade>/<metro>.json
+
+so BranchStore.load(<output>) and every script that accepts a root can run
+against it. Generation is deterministic for a given seed, and files are
+written one metro at a time, so 1M branches never have to sit in memory.
+
+Duplicates are injected at --duplicate-rate, split evenly between:
+- exact duplicates: the same branch (same id) listed again in another file
+- near duplicates: a new id for an existing location with a reworded name,
+  reformatted phone and coordinates shifted by a few meters
+Both kinds are recorded in <output>/synthetic_manifest.json as ground truth
+for the dedup tooling.
+
+Usage:
+    python3 scripts/generate_synthetic_dataset.py build/synthetic-10k --states 5 --metros-per-state 10 --branches-per-metro 200
+    python3 scripts/generate_synthetic_dataset.py build/synthetic-1m --states 50 --metros-per-state 20 --branches-per-metro 1000
+"""
+
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from branch_store import DEFAULT_ROOT, REPO_ROOT, read_json, write_json
+from build_indexes import IndexBuilder
+
+
+# (code, name, center lat, center lon, half-height deg, half-width deg)
+STATES = [
+    ("CO", "Colorado", 39.0, -105.5, 2.0, 3.5), ("AL", "Alabama", 32.8, -86.8, 2.0, 1.5),
+    ("AK", "Alaska", 61.4, -150.0, 2.0, 4.0), ("AZ", "Arizona", 34.2, -111.7, 2.2, 2.2),
+    ("AR", "Arkansas", 34.9, -92.4, 1.4, 2.0), ("CA", "California", 36.8, -119.4, 4.0, 3.0),
+    ("CT", "Connecticut", 41.6, -72.7, 0.4, 0.8), ("DE", "Delaware", 39.0, -75.5, 0.6, 0.3),
+    ("FL", "Florida", 28.6, -82.4, 2.5, 2.0), ("GA", "Georgia", 32.7, -83.4, 2.0, 1.8),
+    ("HI", "Hawaii", 21.3, -157.9, 0.5, 1.5), ("ID", "Idaho", 44.1, -114.6, 2.5, 1.8),
+    ("IL", "Illinois", 40.0, -89.2, 2.5, 1.5), ("IN", "Indiana", 39.9, -86.3, 1.8, 1.0),
+    ("IA", "Iowa", 42.0, -93.5, 1.2, 2.8), ("KS", "Kansas", 38.5, -98.4, 1.3, 3.5),
+    ("KY", "Kentucky", 37.5, -85.3, 1.0, 3.0), ("LA", "Louisiana", 31.0, -92.0, 1.8, 2.0),
+    ("ME", "Maine", 45.3, -69.2, 1.8, 1.5), ("MD", "Maryland", 39.0, -76.8, 0.7, 1.5),
+    ("MA", "Massachusetts", 42.3, -71.8, 0.5, 1.5), ("MI", "Michigan", 43.3, -84.5, 2.2, 2.0),
+    ("MN", "Minnesota", 46.3, -94.3, 2.8, 2.5), ("MS", "Mississippi", 32.7, -89.7, 2.0, 1.2),
+    ("MO", "Missouri", 38.4, -92.5, 1.8, 2.5), ("MT", "Montana", 47.0, -109.6, 1.9, 5.5),
+    ("NE", "Nebraska", 41.5, -99.8, 1.4, 3.5), ("NV", "Nevada", 39.3, -116.6, 3.0, 2.0),
+    ("NH", "New Hampshire", 43.7, -71.6, 1.2, 0.6), ("NJ", "New Jersey", 40.1, -74.7, 1.0, 0.6),
+    ("NM", "New Mexico", 34.4, -106.1, 2.5, 2.5), ("NY", "New York", 42.9, -75.5, 1.8, 3.0),
+    ("NC", "North Carolina", 35.5, -79.4, 1.2, 3.5), ("ND", "North Dakota", 47.4, -100.5, 1.4, 3.5),
+    ("OH", "Ohio", 40.3, -82.8, 1.7, 1.8), ("OK", "Oklahoma", 35.6, -97.5, 1.3, 3.0),
+    ("OR", "Oregon", 44.0, -120.5, 2.0, 3.0), ("PA", "Pennsylvania", 40.9, -77.8, 1.0, 2.8),
+    ("RI", "Rhode Island", 41.7, -71.5, 0.3, 0.2), ("SC", "South Carolina", 33.9, -80.9, 1.1, 1.8),
+    ("SD", "South Dakota", 44.4, -100.2, 1.4, 3.5), ("TN", "Tennessee", 35.9, -86.4, 0.8, 3.5),
+    ("TX", "Texas", 31.0, -99.3, 4.5, 5.5), ("UT", "Utah", 39.3, -111.7, 2.0, 1.9),
+    ("VT", "Vermont", 44.0, -72.7, 1.2, 0.6), ("VA", "Virginia", 37.5, -78.8, 1.0, 3.0),
+    ("WA", "Washington", 47.4, -120.5, 1.4, 3.0), ("WV", "West Virginia", 38.6, -80.6, 1.2, 1.5),
+    ("WI", "Wisconsin", 44.6, -89.9, 2.0, 2.0), ("WY", "Wyoming", 43.0, -107.5, 2.0, 3.5),
+]
+
+TRADES = ("HVAC", "Plumbing", "Electrical", "Filter")
+DEFAULT_TRADE_MIX = "HVAC=0.45,Plumbing=0.3,Electrical=0.2,Filter=0.05"
+
+GEO_PRECISIONS = ("storefront", "storefront", "storefront", "entrance", "warehouse")
+ARRIVAL_TYPES = {"storefront": "storefront", "warehouse": "warehouse", "entrance": "will_call"}
+
+STREET_NAMES = (
+    "Main", "Oak", "Industrial", "Commerce", "Market", "Railroad", "Mill", "Depot",
+    "Quarry", "Union", "Pioneer", "Lincoln", "Washington", "Jackson", "Cedar", "Pine",
+    "Elm", "Maple", "Park", "Ridge", "Valley", "Airport", "Factory", "Warehouse",
+)
+STREET_SUFFIXES = ("St", "Ave", "Blvd", "Dr", "Way", "Ct", "Pkwy", "Rd", "Pl")
+CITY_PARTS = (
+    ("Spring", "Cedar", "Pine", "Stone", "River", "Oak", "Elk", "Fox", "Maple", "Clear"),
+    ("field", "ville", "ton", "brook", "dale", "wood", "port", "ridge", "haven", "creek"),
+)
+INDEPENDENT_SUFFIXES = ("Supply", "Supply Co", "Distributors", "Wholesale", "Trade Supply")
+TAGS = {
+    "HVAC": ("hvac", "refrigeration", "commercial", "residential"),
+    "Plumbing": ("plumbing", "pvf", "waterworks", "commercial"),
+    "Electrical": ("electrical", "lighting", "industrial", "commercial"),
+    "Filter": ("filter", "iaq", "commercial"),
+}
+
+
+def parse_trade_mix(text):
+    """Parse "HVAC=0.5,Plumbing=0.5" into normalized weights."""
+    weights = {}
+    for item in text.split(","):
+        trade, sep, weight = item.partition("=")
+        trade = trade.strip()
+        if not sep or trade not in TRADES:
+            raise ValueError(f"Invalid trade mix entry '{item}'. Trades: {', '.join(TRADES)}")
+        weights[trade] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Trade mix weights must sum to a positive number")
+    return {trade: weight / total for trade, weight in weights.items()}
+
+
+def slugify(text):
+    return "".join(c if c.isalnum() else "-" for c in text.lower()).strip("-")
+
+
+class DatasetGenerator:
+    """Deterministic generator for one synthetic directory."""
+
+    def __init__(self, output, states=1, metros_per_state=7, branches_per_metro=30,
+                 trade_mix=None, multi_trade_ratio=0.15, primary_trade_ratio=0.5,
+                 trade_file_ratio=0.6, brands_min=1, brands_max=6, duplicate_rate=0.02,
+                 seed=42, meta_root=DEFAULT_ROOT):
+        if not 1 <= states <= len(STATES):
+            raise ValueError(f"states must be between 1 and {len(STATES)}")
+
+        self.output = Path(output)
+        self.states = STATES[:states]
+        self.metros_per_state = metros_per_state
+        self.branches_per_metro = branches_per_metro
+        self.trade_mix = trade_mix or parse_trade_mix(DEFAULT_TRADE_MIX)
+        self.multi_trade_ratio = multi_trade_ratio
+        self.primary_trade_ratio = primary_trade_ratio
+        self.trade_file_ratio = trade_file_ratio
+        self.duplicate_rate = duplicate_rate
+        self.rng = random.Random(seed)
+        self.seed = seed
+
+        meta = Path(meta_root) / "_meta"
+        self.meta = {name: read_json(meta / f"{name}.json") for name in ("brands", "manufacturers", "chains")}
+        self.brands = self.meta["brands"]["brands"]
+        self.manufacturers = self.meta["manufacturers"]["manufacturers"]
+        self.chains = self.meta["chains"]["chains"]
+        self.brands_min = max(0, min(brands_min, len(self.brands)))
+        self.brands_max = max(self.brands_min, min(brands_max, len(self.brands)))
+
+        self.base_date = date(2025, 12, 1)
+        self.total = 0
+        self.exact_duplicates = []
+        self.near_duplicates = []
+
+    # -- random helpers -----------------------------------------------------
+
+    def pick_trades(self):
+        trades = list(self.trade_mix)
+        weights = [self.trade_mix[t] for t in trades]
+        first = self.rng.choices(trades, weights)[0]
+        if self.rng.random() >= self.multi_trade_ratio or len(trades) == 1:
+            return [first]
+        others = [t for t in trades if t != first]
+        second = self.rng.choices(others, [self.trade_mix[t] for t in others])[0]
+        return [first, second]
+
+    def random_date(self):
+        return (self.base_date + timedelta(days=self.rng.randrange(60))).isoformat()
+
+    def random_city(self):
+        return self.rng.choice(CITY_PARTS[0]) + self.rng.choice(CITY_PARTS[1])
+
+    # -- record builders ----------------------------------------------------
+
+    def make_branch(self, state, metro_id, metro_center, serial):
+        code = state[0]
+        trades = self.pick_trades()
+        primary = trades[0]
+
+        if self.rng.random() < 0.6:
+            chain = self.rng.choice(self.chains)
+        else:
+            chain = f"{self.random_city()} {self.rng.choice(INDEPENDENT_SUFFIXES)}"
+        city = self.random_city()
+
+        lat = round(metro_center[0] + self.rng.uniform(-0.35, 0.35), 6)
+        lon = round(metro_center[1] + self.rng.uniform(-0.45, 0.45), 6)
+        precision = self.rng.choice(GEO_PRECISIONS)
+        verified_date = self.random_date()
+
+        street = f"{self.rng.randint(100, 19999)} {self.rng.choice(STREET_NAMES)} {self.rng.choice(STREET_SUFFIXES)}"
+        brands = self.rng.sample(self.brands, self.rng.randint(self.brands_min, self.brands_max))
+        website = f"https://www.{slugify(chain).replace('-', '')}.com/locations"
+
+        branch = {
+            "id": f"{code.lower()}-{metro_id}-{slugify(chain)}-{serial:06d}",
+            "name": f"{chain} – {city}",
+            "chain": chain,
+            "address1": street,
+            "city": city,
+            "state": code,
+            "postalCode": f"{self.rng.randint(10000, 99999)}",
+            "phone": f"+1{self.rng.randint(201, 989)}{self.rng.randint(200, 999)}{self.rng.randint(0, 9999):04d}",
+            "website": website,
+            "lat": lat,
+            "lon": lon,
+            "brandsRep": brands,
+            "partsFor": [primary],
+            "trades": trades,
+            "tags": self.rng.sample(TAGS[primary], 2),
+            "notes": f"Synthetic branch generated for scale testing (seed {self.seed}).",
+            "verification": {
+                "coords_verified": verified_date,
+                "geocoding_method": "Google Maps verified coordinates",
+                "addressVerified": True,
+                "addressSource": "Official Store Locator",
+                "addressVerifiedDate": verified_date,
+            },
+            "coordsStatus": "verified",
+            "sources": [website],
+            "geoPrecision": precision,
+            "geoVerifiedDate": verified_date,
+            "geoSource": "Google Maps pin",
+            "arrivalLat": round(lat + self.rng.uniform(-0.0008, 0.0008), 6),
+            "arrivalLon": round(lon + self.rng.uniform(-0.0008, 0.0008), 6),
+            "arrivalType": ARRIVAL_TYPES[precision],
+        }
+
+        if self.rng.random() < 0.4:
+            branch["manufacturersPartsFor"] = self.rng.sample(
+                self.manufacturers, self.rng.randint(1, min(4, len(self.manufacturers))))
+        if len(trades) > 1 and self.rng.random() < self.primary_trade_ratio:
+            branch["primaryTrade"] = primary
+        return branch
+
+    def near_duplicate(self, branch, serial):
+        """Same location as `branch` under a new id with cosmetic differences."""
+        copy = dict(branch)
+        digits = branch["phone"][2:]
+        copy["id"] = f"{branch['id'].rsplit('-', 1)[0]}-{serial:06d}"
+        copy["name"] = branch["name"].replace(" – ", " - ")
+        copy["phone"] = f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
+        copy["lat"] = round(branch["lat"] + self.rng.uniform(-0.0002, 0.0002), 6)
+        copy["lon"] = round(branch["lon"] + self.rng.uniform(-0.0002, 0.0002), 6)
+        return copy
+
+    # -- output -------------------------------------------------------------
+
+    def write(self, rel_path, data):
+        path = self.output / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(path, data)
+
+    def metro_centers(self, state):
+        _, _, lat, lon, half_lat, half_lon = state
+        return [
+            (round(lat + self.rng.uniform(-half_lat, half_lat) * 0.8, 4),
+             round(lon + self.rng.uniform(-half_lon, half_lon) * 0.8, 4))
+            for _ in range(self.metros_per_state)
+        ]
+
+    def generate_state(self, state):
+        code, name = state[0], state[1]
+        state_dir = f"us/{code.lower()}"
+        metros = []
+        trade_metros = {slugify(t): [] for t in self.trade_mix}
+        recent = []  # bounded pool of earlier branches to duplicate from
+
+        for m, center in enumerate(self.metro_centers(state), 1):
+            metro_id = f"metro-{m:02d}"
+            metro_name = f"{name} Metro {m}"
+            general = []
+            by_trade = {slug: [] for slug in trade_metros}
+
+            for _ in range(self.branches_per_metro):
+                self.total += 1
+                serial = self.total
+
+                if recent and self.rng.random() < self.duplicate_rate:
+                    original = self.rng.choice(recent)
+                    if self.rng.random() < 0.5:
+                        branch = original
+                        self.exact_duplicates.append(original["id"])
+                    else:
+                        branch = self.near_duplicate(original, serial)
+                        self.near_duplicates.append([original["id"], branch["id"]])
+                else:
+                    branch = self.make_branch(state, metro_id, center, serial)
+                    if len(recent) < 1000:
+                        recent.append(branch)
+                    else:
+                        recent[self.rng.randrange(1000)] = branch
+
+                if self.rng.random() < self.trade_file_ratio:
+                    trade = slugify(branch["trades"][0])
+                    by_trade[trade].append(dict(branch, trade=trade))
+                else:
+                    general.append(branch)
+
+            header = {"version": "1.0.0", "updated": self.base_date.isoformat(),
+                      "state": code, "metro": metro_name}
+            metro_file = f"{state_dir}/{metro_id}.json"
+            self.write(metro_file, {**header, "branches": general})
+            metros.append({"id": metro_id, "name": metro_name, "file": metro_file,
+                           "center": {"lat": center[0], "lon": center[1]}})
+
+            for trade, branches in by_trade.items():
+                if not branches:
+                    continue
+                trade_file = f"{state_dir}/{trade}/{metro_id}.json"
+                self.write(trade_file, {**header, "trade": trade, "branches": branches})
+                trade_metros[trade].append({"id": metro_id, "name": metro_name, "file": trade_file})
+
+        trades = {}
+        for trade, entries in trade_metros.items():
+            if entries:
+                index_file = f"{state_dir}/{trade}/index.json"
+                self.write(index_file, {"version": "1.0.0", "updated": self.base_date.isoformat(),
+                                        "state": code, "trade": trade, "metros": entries})
+                trades[trade] = {"index": index_file}
+
+        self.write(f"{state_dir}/index.json", {
+            "version": "1.0.0", "updated": self.base_date.isoformat(), "state": code,
+            "metros": metros, "trades": trades,
+        })
+        return {"code": code, "name": name, "index": f"{state_dir}/index.json"}
+
+    def generate(self):
+        """Write the whole directory and return the manifest."""
+        for name, data in self.meta.items():
+            self.write(f"_meta/{name}.json", data)
+
+        states = [self.generate_state(state) for state in self.states]
+        self.write("us/index.json", {"version": "1.0.0", "updated": self.base_date.isoformat(),
+                                     "country": "US", "states": states})
+
+        # Same aggregates (bbox, counts, hashes) as the real indexes
+        for rel_path, content in IndexBuilder.from_root(self.output).build().items():
+            (self.output / rel_path).write_text(content, encoding="utf-8")
+
+        manifest = {
+            "seed": self.seed,
+            "states": len(self.states),
+            "metrosPerState": self.metros_per_state,
+            "branchesPerMetro": self.branches_per_metro,
+            "tradeMix": self.trade_mix,
+            "multiTradeRatio": self.multi_trade_ratio,
+            "primaryTradeRatio": self.primary_trade_ratio,
+            "duplicateRate": self.duplicate_rate,
+            "totalListings": self.total,
+            "exactDuplicates": self.exact_duplicates,
+            "nearDuplicates": self.near_duplicates,
+        }
+        self.write("synthetic_manifest.json", manifest)
+        return manifest
+
+
+def main():
+    """Generate a synthetic directory from command-line parameters."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic supply house directory.")
+    parser.add_argument("output", help="Output directory (must not be the real data directory)")
+    parser.add_argument("--states", type=int, default=1, help=f"Number of states (1-{len(STATES)})")
+    parser.add_argument("--metros-per-state", type=int, default=7)
+    parser.add_argument("--branches-per-metro", type=int, default=30)
+    parser.add_argument("--trade-mix", default=DEFAULT_TRADE_MIX,
+                        help="Trade weights (default: %(default)s)")
+    parser.add_argument("--multi-trade-ratio", type=float, default=0.15,
+                        help="Share of branches serving two trades")
+    parser.add_argument("--primary-trade-ratio", type=float, default=0.5,
+                        help="Share of multi-trade branches with primaryTrade set")
+    parser.add_argument("--trade-file-ratio", type=float, default=0.6,
+                        help="Share of branches listed in trade subfolders instead of the metro file")
+    parser.add_argument("--brands-min", type=int, default=1, help="Minimum brandsRep entries")
+    parser.add_argument("--brands-max", type=int, default=6, help="Maximum brandsRep entries")
+    parser.add_argument("--duplicate-rate", type=float, default=0.02,
+                        help="Share of listings that duplicate an earlier branch")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    output = Path(args.output).resolve()
+    if output == DEFAULT_ROOT or DEFAULT_ROOT in output.parents:
+        print(f"Error: refusing to write into {DEFAULT_ROOT.relative_to(REPO_ROOT)}", file=sys.stderr)
+        return 2
+
+    try:
+        generator = DatasetGenerator(
+            output,
+            states=args.states,
+            metros_per_state=args.metros_per_state,
+            branches_per_metro=args.branches_per_metro,
+            trade_mix=parse_trade_mix(args.trade_mix),
+            multi_trade_ratio=args.multi_trade_ratio,
+            primary_trade_ratio=args.primary_trade_ratio,
+            trade_file_ratio=args.trade_file_ratio,
+            brands_min=args.brands_min,
+            brands_max=args.brands_max,
+            duplicate_rate=args.duplicate_rate,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    manifest = generator.generate()
+
+    print(f"Wrote {output}")
+    print(f"  States:           {manifest['states']}")
+    print(f"  Metros:           {manifest['states'] * manifest['metrosPerState']}")
+    print(f"  Listings:         {manifest['totalListings']}")
+    print(f"  Exact duplicates: {len(manifest['exactDuplicates'])}")
+    print(f"  Near duplicates:  {len(manifest['nearDuplicates'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
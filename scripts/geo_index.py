@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Nearest-supplier queries over all branches using a spatial index.
+
+The branch files store lat/lon (and arrivalLat/arrivalLon) "for distance
+sorting", but until now every consumer had to scan every metro file and the
+scripts only had Euclidean-on-degrees helpers. GeoIndex builds a KD-tree once
+and answers:
+
+- "k nearest HVAC branches to this job site"
+- "all branches within R miles"
+
+Points are projected onto the unit sphere (x, y, z). Straight-line (chord)
+distance between unit vectors is monotonic in great-circle distance, so the
+tree can prune with plain axis-aligned splits while results are still ordered
+and reported by true great-circle miles.
+
+Usage:
+    python3 scripts/geo_index.py --lat 39.7392 --lon -104.9903 -k 5 --trade HVAC
+    python3 scripts/geo_index.py --lat 39.7392 --lon -104.9903 --radius 25
+"""
+
+import argparse
+import heapq
+import math
+import sys
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from branch_store import BranchStore
+
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Points per leaf; small leaves prune well, large leaves amortize Python overhead
+DEFAULT_LEAF_SIZE = 16
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in miles."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def to_unit_vector(lat, lon):
+    """Project a coordinate onto the unit sphere."""
+    phi = math.radians(lat)
+    lmb = math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lmb), cos_phi * math.sin(lmb), math.sin(phi))
+
+
+def miles_to_chord_sq(miles):
+    """Squared chord length on the unit sphere for a great-circle distance."""
+    theta = min(math.pi, miles / EARTH_RADIUS_MILES)
+    return (2 * math.sin(theta / 2)) ** 2
+
+
+def chord_sq_to_miles(chord_sq):
+    """Great-circle distance in miles for a squared unit-sphere chord length."""
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+
+
+class Neighbor(NamedTuple):
+    """A query result: great-circle distance and the indexed item."""
+
+    miles: float
+    item: object
+
+
+class GeoIndex:
+    """
+    Static KD-tree over (lat, lon) points.
+
+    Items are arbitrary payloads (BranchRecord when built with from_store).
+    Nodes are stored as flat tuples (start, end, axis, split, left, right);
+    leaves have left == -1 and own the point range [start, end).
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float]], items: Sequence[object],
+                 leaf_size: int = DEFAULT_LEAF_SIZE):
+        if len(points) != len(items):
+            raise ValueError("points and items must have the same length")
+
+        vectors = [to_unit_vector(lat, lon) for lat, lon in points]
+        order = list(range(len(vectors)))
+
+        self._leaf_size = max(1, leaf_size)
+        self._nodes = []
+        self._root = self._build(vectors, order, 0, len(order)) if order else -1
+
+        # Store coordinates and payloads in tree order so leaf scans are contiguous
+        self._xs = [vectors[i][0] for i in order]
+        self._ys = [vectors[i][1] for i in order]
+        self._zs = [vectors[i][2] for i in order]
+        self.items = [items[i] for i in order]
+
+    @classmethod
+    def from_store(cls, store: BranchStore, use_arrival: bool = True,
+                   leaf_size: int = DEFAULT_LEAF_SIZE):
+        """
+        Index every branch in a BranchStore by location.
+
+        With use_arrival=True the navigation destination (arrivalLat/arrivalLon,
+        falling back to lat/lon) is indexed; otherwise the display pin is used.
+        A branch id that appears in several files is indexed once.
+        """
+        points = []
+        items = []
+        seen = set()
+
+        for record in store.branches():
+            if record.id in seen:
+                continue
+
+            lat, lon = record.routing_coords if use_arrival else (record.lat, record.lon)
+            if lat is None or lon is None:
+                continue
+
+            seen.add(record.id)
+            points.append((lat, lon))
+            items.append(record)
+
+        return cls(points, items, leaf_size=leaf_size)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _build(self, vectors, order, start, end):
+        node_id = len(self._nodes)
+        self._nodes.append(None)
+
+        if end - start <= self._leaf_size:
+            self._nodes[node_id] = (start, end, 0, 0.0, -1, -1)
+            return node_id
+
+        # Split on the axis with the largest spread
+        spreads = []
+        for axis in range(3):
+            values = [vectors[order[i]][axis] for i in range(start, end)]
+            spreads.append(max(values) - min(values))
+        axis = spreads.index(max(spreads))
+
+        order[start:end] = sorted(order[start:end], key=lambda i: vectors[i][axis])
+        mid = (start + end) // 2
+        split = vectors[order[mid]][axis]
+
+        left = self._build(vectors, order, start, mid)
+        right = self._build(vectors, order, mid, end)
+        self._nodes[node_id] = (start, end, axis, split, left, right)
+        return node_id
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                predicate: Optional[Callable[[object], bool]] = None,
+                max_miles: Optional[float] = None) -> List[Neighbor]:
+        """
+        Return up to k items closest to (lat, lon), nearest first.
+
+        `predicate` restricts results (e.g. to one trade); `max_miles` caps the
+        search radius.
+        """
+        if k <= 0 or self._root < 0:
+            return []
+
+        query = to_unit_vector(lat, lon)
+        qx, qy, qz = query
+        bound = miles_to_chord_sq(max_miles) if max_miles is not None else 4.0
+
+        xs, ys, zs, items, nodes = self._xs, self._ys, self._zs, self.items, self._nodes
+        heap = []  # max-heap of (-chord_sq, position)
+        worst = bound
+        stack = [(self._root, 0.0)]
+
+        while stack:
+            node_id, plane_sq = stack.pop()
+            if plane_sq > worst:
+                continue
+
+            start, end, axis, split, left, right = nodes[node_id]
+
+            if left < 0:
+                for i in range(start, end):
+                    dx = xs[i] - qx
+                    dy = ys[i] - qy
+                    dz = zs[i] - qz
+                    d2 = dx * dx + dy * dy + dz * dz
+                    if d2 > worst:
+                        continue
+                    if predicate is not None and not predicate(items[i]):
+                        continue
+
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d2, i))
+                    else:
+                        heapq.heapreplace(heap, (-d2, i))
+                    if len(heap) == k:
+                        worst = min(bound, -heap[0][0])
+                continue
+
+            diff = query[axis] - split
+            if diff < 0:
+                near, far = left, right
+            else:
+                near, far = right, left
+
+            stack.append((far, diff * diff))
+            stack.append((near, plane_sq))
+
+        results = sorted((-neg_d2, i) for neg_d2, i in heap)
+        return [Neighbor(chord_sq_to_miles(d2), items[i]) for d2, i in results]
+
+    def within(self, lat: float, lon: float, radius_miles: float,
+               predicate: Optional[Callable[[object], bool]] = None) -> List[Neighbor]:
+        """Return every item within radius_miles of (lat, lon), nearest first."""
+        if self._root < 0:
+            return []
+
+        query = to_unit_vector(lat, lon)
+        qx, qy, qz = query
+        bound = miles_to_chord_sq(radius_miles)
+
+        xs, ys, zs, items, nodes = self._xs, self._ys, self._zs, self.items, self._nodes
+        hits = []
+        stack = [self._root]
+
+        while stack:
+            start, end, axis, split, left, right = nodes[stack.pop()]
+
+            if left < 0:
+                for i in range(start, end):
+                    dx = xs[i] - qx
+                    dy = ys[i] - qy
+                    dz = zs[i] - qz
+                    d2 = dx * dx + dy * dy + dz * dz
+                    if d2 <= bound and (predicate is None or predicate(items[i])):
+                        hits.append((d2, i))
+                continue
+
+            diff = query[axis] - split
+            if diff < 0 or diff * diff <= bound:
+                stack.append(left)
+            if diff >= 0 or diff * diff <= bound:
+                stack.append(right)
+
+        hits.sort()
+        return [Neighbor(chord_sq_to_miles(d2), items[i]) for d2, i in hits]
+
+
+def trade_filter(trade):
+    """Predicate matching BranchRecords that serve a trade (case-insensitive)."""
+    wanted = trade.lower()
+    return lambda record: any(t.lower() == wanted for t in record.trades)
+
+
+def main():
+    """Query the nearest branches to a location."""
+    parser = argparse.ArgumentParser(description="Find supply houses near a location.")
+    parser.add_argument("--lat", type=float, required=True, help="Job site latitude")
+    parser.add_argument("--lon", type=float, required=True, help="Job site longitude")
+    parser.add_argument("-k", type=int, default=5, help="Number of branches to return")
+    parser.add_argument("--radius", type=float, help="Return all branches within this many miles")
+    parser.add_argument("--trade", help="Only branches serving this trade (e.g. HVAC)")
+    parser.add_argument("--display-coords", action="store_true",
+                        help="Index display pins (lat/lon) instead of arrival coordinates")
+    args = parser.parse_args()
+
+    store = BranchStore.load()
+    index = GeoIndex.from_store(store, use_arrival=not args.display_coords)
+    predicate = trade_filter(args.trade) if args.trade else None
+
+    if args.radius is not None:
+        results = index.within(args.lat, args.lon, args.radius, predicate=predicate)
+    else:
+        results = index.nearest(args.lat, args.lon, k=args.k, predicate=predicate)
+
+    print(f"Indexed {len(index)} branches")
+    print()
+
+    if not results:
+        print("No branches found.")
+        return 1
+
+    for i, (miles, record) in enumerate(results, 1):
+        print(f"{i:3}. {miles:7.2f} mi  {record.name}")
+        print(f"               {record.get('address1', '')}, {record.get('city', '')}"
+              f"  [{', '.join(record.trades)}]")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,18 +17,20 @@ Risk factors:
 6. Missing or identical arrival coordinates
 """
 
-import json
 import math
 import os
 import sys
-from pathlib import Path
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+from keyword_matcher import keyword_categories
 
-# Constants for risk assessment
-INDUSTRIAL_KEYWORDS = ["industrial", "park", "business park", "warehouse", "distribution"]
-DRIVEWAY_KEYWORDS = ["blvd", "boulevard", "parkway", "freeway"]
-VAGUE_SOURCE_KEYWORDS = ["previously verified", "google maps", "approximate"]
+
+# Keyword categories (keyword_matcher.KEYWORDS) used for risk assessment
+INDUSTRIAL_CATEGORIES = frozenset({"industrial", "distribution"})
+DRIVEWAY_CATEGORIES = frozenset({"blvd", "major_road"})
+MULTI_TENANT_CATEGORIES = frozenset({"suite", "unit_number"})
+VAGUE_SOURCE_CATEGORIES = frozenset({"vague_source"})
 
 # Minimum distance to consider coordinates different (in degrees, ~11 meters)
 MIN_COORD_DIFFERENCE = 0.0001
@@ -49,12 +51,11 @@ def calculate_risk_score(branch):
     score = 0
     reasons = []
     
-    address1 = branch.get("address1", "").lower()
-    city = branch.get("city", "").lower()
     geo_precision = branch.get("geoPrecision", "")
     geo_source = branch.get("geoSource", "")
     geo_verified_date = branch.get("geoVerifiedDate", "")
-    notes = branch.get("notes", "").lower()
+    address_hits = keyword_categories(branch.get("address1", ""))
+    notes_hits = keyword_categories(branch.get("notes", ""))
     
     # Check arrival coordinates
     lat = branch.get("lat")
@@ -79,17 +80,17 @@ def calculate_risk_score(branch):
             reasons.append("Arrival coordinates identical to display coordinates - may route to wrong location")
     
     # Risk Factor 1: Industrial/warehouse locations (20 points)
-    if any(keyword in address1 or keyword in notes for keyword in INDUSTRIAL_KEYWORDS):
+    if (address_hits | notes_hits) & INDUSTRIAL_CATEGORIES:
         score += 20
         reasons.append("Industrial/warehouse location")
     
     # Risk Factor 2: Long driveway indicators (15 points)
-    if any(keyword in address1 for keyword in DRIVEWAY_KEYWORDS):
+    if address_hits & DRIVEWAY_CATEGORIES:
         score += 15
         reasons.append("Long driveway potential (Boulevard/Parkway/Freeway)")
     
     # Risk Factor 3: Multi-tenant complex (10 points)
-    if "suite" in address1 or "#" in address1:
+    if address_hits & MULTI_TENANT_CATEGORIES:
         score += 10
         reasons.append("Multi-tenant complex (Suite/Unit number)")
     
@@ -103,7 +104,7 @@ def calculate_risk_score(branch):
         reasons.append("CRITICAL: geoPrecision is 'centroid'")
     
     # Risk Factor 5: Non-specific geo source (15 points)
-    if any(vague in geo_source.lower() for vague in VAGUE_SOURCE_KEYWORDS):
+    if keyword_categories(geo_source) & VAGUE_SOURCE_CATEGORIES:
         score += 15
         reasons.append(f"Non-specific geoSource: '{geo_source}'")
     
@@ -137,49 +138,18 @@ def categorize_risk(score):
         return "⚪ MINIMAL"
 
 
-def find_branch_files(base_dir):
-    """Find all JSON files containing branch data."""
-    branch_files = []
-    
-    for root, dirs, files in os.walk(base_dir):
-        if '_meta' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.json') and not file.startswith('_'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if "branches" in data:
-                            branch_files.append(file_path)
-                except:
-                    pass
-    
-    return sorted(branch_files)
-
-
 def analyze_branch_files(branch_files):
     """Analyze all branches and return those with risk of road-snapping."""
     at_risk_branches = []
     
-    for file_path in branch_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except:
-            continue
-        
-        branches = data.get("branches", [])
-        
-        for branch in branches:
+    for branch_file in branch_files:
+        for branch in branch_file.branches:
             score, reasons = calculate_risk_score(branch)
             
             if score >= 20:  # Only report branches with meaningful risk
                 at_risk_branches.append({
                     "branch": branch,
-                    "file_path": file_path,
+                    "file_path": branch_file.path,
                     "score": score,
                     "reasons": reasons
                 })
@@ -259,16 +229,16 @@ def print_report(at_risk_branches, repo_root):
 def main():
     """Main analysis function."""
     # Determine base directory
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    repo_root = REPO_ROOT
     supply_dir = repo_root / "supply-house-directory"
     
     if not supply_dir.exists():
         print(f"Error: Supply house directory not found at {supply_dir}", file=sys.stderr)
         return 1
     
-    # Find all branch files
-    branch_files = find_branch_files(supply_dir)
+    # Load all branch files
+    store = BranchStore.load(supply_dir)
+    branch_files = store.files
     
     if not branch_files:
         print("No branch files found!", file=sys.stderr)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Incremental reading and writing of branch files, one branch at a time.
+
+Every script used to json.load a whole metro file and json.dump it back,
+so memory grew with the largest metro. A national shard with tens of
+thousands of branches does not fit that model. This module streams the
+"branches" array instead:
+
+- BranchReader parses the top-level members before "branches" into
+  `header`, then yields the array's elements one at a time, then parses
+  the remaining members into `trailer`. The file is read in CHUNK_SIZE
+  pieces and each element is decoded with the standard json decoder, so
+  only the current branch (plus one chunk) is held in memory.
+- BranchWriter writes the same document back: header members, the
+  branches as they are handed to it, then trailer members. Its output is
+  byte-identical to branch_store.format_json() of the whole document
+  (indent=2, literal UTF-8, trailing newline), so a streamed rewrite of
+  an unchanged file leaves it unchanged on disk.
+
+BranchStore.stream() builds on these to give migrations and validators
+the usual BranchFile interface in constant memory per file.
+
+Usage:
+    with BranchReader(path) as reader:
+        for branch in reader:
+            ...
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        writer = BranchWriter(f, reader.header)
+        writer.write(branch)
+        writer.close(reader.trailer)
+
+    python3 scripts/json_stream.py --check   # round-trip every branch file
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+
+# Characters read from disk per refill
+CHUNK_SIZE = 1 << 16
+
+# The top-level member that is streamed
+BRANCHES_KEY = "branches"
+
+# Indentation of the repository's JSON formatting (see format_json)
+INDENT = 2
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class BranchReader:
+    """
+    Pull parser for a branch file's top-level object.
+
+    `header` is available as soon as the reader is open; `trailer` once
+    the branches have been iterated. A file without a "branches" member
+    has `has_branches` False, everything in `header`, and yields nothing.
+    The branches can be iterated once per reader.
+    """
+
+    def __init__(self, path, chunk_size: int = CHUNK_SIZE):
+        self.path = Path(path)
+        self.header: dict = {}
+        self.trailer: dict = {}
+        self.has_branches = False
+        self.count = 0
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+        self._members = 0
+        self._iterated = False
+        self._file: Optional[TextIO] = open(self.path, "r", encoding="utf-8")
+        try:
+            self._expect("{")
+            self._read_members(self.header)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self) -> Iterator[dict]:
+        if self._iterated:
+            raise RuntimeError(f"{self.path}: branches were already read")
+        self._iterated = True
+        if not self.has_branches:
+            self.close()
+            return
+
+        self._expect("[")
+        while self._peek() != "]":
+            if self.count:
+                self._expect(",")
+            branch = self._value()
+            self.count += 1
+            yield branch
+        self._pos += 1
+        self._read_members(self.trailer)
+        self.close()
+
+    # -- tokenizer ----------------------------------------------------------
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the unread part of the buffer; False at EOF."""
+        if self._eof or self._file is None:
+            return False
+        rest = self._buf[self._pos:]
+        # Grow reads with the pending text so one huge value costs O(n), not O(n^2)
+        chunk = self._file.read(max(self._chunk_size, len(rest)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buf, self._pos = rest + chunk, 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at EOF)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def _value(self):
+        """Decode the JSON value at the cursor, reading more input as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                self._pos = e.pos
+                raise self._error(e.msg) from None
+            # A number at the very end of the buffer may continue in the next chunk
+            if end < len(self._buf) or not self._fill():
+                self._pos = end
+                return value
+
+    def _read_members(self, target: dict):
+        """Parse members into `target` until "branches" or the closing brace."""
+        while True:
+            if self._peek() == "}":
+                self._pos += 1
+                if self._peek():
+                    raise self._error("Extra data")
+                self.close()
+                return
+            if self._members:
+                self._expect(",")
+            if self._peek() != '"':
+                raise self._error("Expecting property name enclosed in double quotes")
+            key = self._value()
+            self._expect(":")
+            self._members += 1
+            if key == BRANCHES_KEY and not self.has_branches:
+                self.has_branches = True
+                return
+            target[key] = self._value()
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        """A decode error located by its character offset in the whole file."""
+        error = json.JSONDecodeError(message, self._buf, self._pos)
+        error.pos = self._offset + self._pos
+        error.args = (f"{self.path}: {message} (char {error.pos})",)
+        return error
+
+
+def iter_branches(path) -> Iterator[dict]:
+    """Yield the branches of a file one at a time."""
+    with BranchReader(path) as reader:
+        yield from reader
+
+
+def _dumps(value, level: int) -> str:
+    """json.dumps in the repository's formatting, nested `level` spaces deep."""
+    text = json.dumps(value, indent=INDENT, ensure_ascii=False)
+    return text.replace("\n", "\n" + " " * level) if level else text
+
+
+class BranchWriter:
+    """
+    Writes a branch file to an open text stream, one branch at a time.
+
+    The header is written with the first branch (or on close), so callers
+    may still adjust it until then; the trailer is passed to close().
+    """
+
+    def __init__(self, f: TextIO, header: Optional[dict] = None):
+        self._f = f
+        self._header = header if header is not None else {}
+        self._members = 0
+        self._started = False
+        self.count = 0
+
+    def _key(self, key: str):
+        self._f.write(",\n" if self._members else "\n")
+        self._f.write(" " * INDENT + json.dumps(key, ensure_ascii=False) + ": ")
+        self._members += 1
+
+    def _member(self, key: str, value):
+        self._key(key)
+        self._f.write(_dumps(value, INDENT))
+
+    def _start(self):
+        self._started = True
+        self._f.write("{")
+        for key, value in self._header.items():
+            self._member(key, value)
+        self._key(BRANCHES_KEY)
+        self._f.write("[")
+
+    def write(self, branch: dict):
+        if not self._started:
+            self._start()
+        indent = " " * (2 * INDENT)
+        self._f.write(("\n" if not self.count else ",\n") + indent + _dumps(branch, 2 * INDENT))
+        self.count += 1
+
+    def close(self, trailer: Optional[dict] = None):
+        """Close the branches array, write the trailer members and end the document."""
+        if not self._started:
+            self._start()
+        self._f.write("\n" + " " * INDENT + "]" if self.count else "]")
+        for key, value in (trailer or {}).items():
+            self._member(key, value)
+        self._f.write("\n}\n")
+
+
+def main():
+    """Check that streaming every branch file reproduces it exactly."""
+    from branch_store import BranchStore, format_json, read_json
+
+    parser = argparse.ArgumentParser(description="Streaming branch file reader/writer.")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--check", action="store_true",
+                        help="Round-trip every branch file and compare with format_json()")
+    args = parser.parse_args()
+
+    if not args.check:
+        parser.print_help()
+        return 0
+
+    store = BranchStore.stream(args.root)
+    for rel_path, error in store.load_errors:
+        print(f"❌ {rel_path}: {error}")
+
+    mismatches = 0
+    branches = 0
+    for branch_file in store.files:
+        out = io.StringIO()
+        with BranchReader(branch_file.path) as reader:
+            writer = BranchWriter(out, reader.header)
+            for branch in reader:
+                writer.write(branch)
+            writer.close(reader.trailer)
+        branches += writer.count
+        if out.getvalue() != format_json(read_json(branch_file.path)):
+            mismatches += 1
+            print(f"❌ {branch_file.rel_path}: streamed output differs from format_json()")
+
+    print(f"Round-tripped {len(store.files)} files, {branches} branches")
+    if mismatches or store.load_errors:
+        return 1
+    print("✅ Streaming output matches format_json() for every file")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Shared keyword registry and a single-pass multi-pattern matcher.
+
+The risk heuristics (identify_road_snapped_coords, risk_batch,
+refine_arrival_coords_intelligent) and the source-authority checks
+(analyze_address_verification, update_address_verification_status) used
+to keep their own keyword lists and test them with
+`any(kw in text for kw in ...)`, rescanning the same address, notes or
+source string once per keyword and once per list. Now:
+
+- KEYWORDS is the one registry of keyword categories. Categories are
+  fine-grained ("industrial" and "distribution", "major_road" and "blvd")
+  so each heuristic composes exactly the set it always used;
+- KeywordMatcher compiles all patterns once into an Aho-Corasick automaton
+  (goto transitions with failure links folded in, so each character costs
+  a single dict lookup) and returns every category found in a text in one
+  scan, case-insensitively. Results are memoized per text, since
+  geoSource values and source labels repeat across branches.
+
+Usage:
+    from keyword_matcher import keyword_categories
+    hits = keyword_categories(branch.get("address1", ""))
+    if hits & {"industrial", "distribution"}:
+        ...
+
+    python3 scripts/keyword_matcher.py "1234 Industrial Pkwy, Suite 5"
+"""
+
+import argparse
+import sys
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List
+
+# Keyword categories. Patterns are matched as lowercase substrings.
+KEYWORDS: Dict[str, tuple] = {
+    # Site type (address1 and notes)
+    "industrial": ("industrial", "park", "business park", "warehouse"),
+    "distribution": ("distribution",),
+    # Road type (address1)
+    "major_road": ("parkway", "boulevard", "freeway"),
+    "blvd": ("blvd",),
+    # Multi-tenant markers (address1)
+    "suite": ("suite",),
+    "unit": ("unit",),
+    "unit_number": ("#",),
+    # geoSource wording that does not identify a verified entrance
+    "vague_source": ("previously verified", "google maps", "approximate"),
+    # Source descriptions (sources and notes)
+    "authoritative_source": ("google business", "google maps", "store locator",
+                             "official website", "company location"),
+    "non_authoritative_source": ("manufacturer line card", "line card", "directory",
+                                 "manufacturer tools"),
+    # Source URLs
+    "google_business": ("google.com/maps", "google business"),
+    "store_locator": ("/locations", "/store", "locator"),
+    "location_page": ("/contact", "/about", "/location", "portal", "chamber"),
+    "line_card": ("line card", "line-card", "linecard", "line_card"),
+    "com_path": (".com/",),
+    "com_domain": (".com",),
+    "directory_domain": ("yellowpages", "mapquest", "manta", "alignable", "chamberofcommerce",
+                         "youtube", "finduslocal", "allpages", "thebluebook",
+                         "industrialfiltersource"),
+}
+
+# Memoized texts per matcher
+CACHE_SIZE = 65536
+
+_NONE: FrozenSet[str] = frozenset()
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton mapping texts to the keyword categories they contain."""
+
+    def __init__(self, keywords: Dict[str, Iterable[str]]):
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[set] = [set()]
+        for category, patterns in keywords.items():
+            for pattern in patterns:
+                state = 0
+                for ch in pattern.lower():
+                    if ch not in goto[state]:
+                        goto.append({})
+                        outputs.append(set())
+                        goto[state][ch] = len(goto) - 1
+                    state = goto[state][ch]
+                outputs[state].add(category)
+
+        # Breadth-first: failure links, inherited outputs and a complete
+        # transition table (a state's missing edges follow its failure link)
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            for ch, child in goto[state].items():
+                delta[state][ch] = child
+                if state:
+                    fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+            outputs[state] |= outputs[fail[state]]
+
+        self._delta = delta
+        self._outputs = [frozenset(out) if out else _NONE for out in outputs]
+        self.categories = frozenset(keywords)
+        self._cache: Dict[str, FrozenSet[str]] = {}
+
+    def match(self, text) -> FrozenSet[str]:
+        """Categories with at least one keyword in `text` (case-insensitive)."""
+        if not text:
+            return _NONE
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        delta, outputs = self._delta, self._outputs
+        found = set()
+        state = 0
+        for ch in str(text).lower():
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        result = frozenset(found) if found else _NONE
+
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
+
+
+@lru_cache(maxsize=None)
+def default_matcher() -> KeywordMatcher:
+    """The matcher for KEYWORDS, compiled on first use."""
+    return KeywordMatcher(KEYWORDS)
+
+
+def keyword_categories(text) -> FrozenSet[str]:
+    """Categories from KEYWORDS found in `text`."""
+    return default_matcher().match(text)
+
+
+def main():
+    """Print the keyword categories found in each argument."""
+    parser = argparse.ArgumentParser(description="Show keyword categories matched in texts.")
+    parser.add_argument("texts", nargs="+", help="Texts to scan (addresses, notes, sources)")
+    args = parser.parse_args()
+
+    for text in args.texts:
+        hits = keyword_categories(text)
+        print(f"{text!r}: {', '.join(sorted(hits)) if hits else '(none)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Lazy, locality-driven access to branch files.
+
+BranchStore parses every file up front, which is right for audits and
+migrations but wasteful for a consumer asking "suppliers near me": a Denver
+query has no reason to parse western-slope.json. LazyBranchStore reads
+only us/index.json and the state indexes at startup, then uses the
+per-file bounding boxes written by build_indexes.py to decide which metro
+and trade files a query can touch:
+
+- a file is loaded only if the query circle intersects its bounding box
+  (grown by BBOX_MARGIN_MILES, since arrival coordinates may sit slightly
+  outside the box of display pins);
+- `nearest` visits files in order of distance to their boxes and stops as
+  soon as the next box is farther than the k-th result so far;
+- trade queries skip files whose tradeCounts lack the trade;
+- loaded files (with a small GeoIndex each) live in an LRU capped at
+  `memory_cap` bytes of on-disk JSON; the least recently used files are
+  evicted once the cap is exceeded.
+
+Files missing a bbox (indexes not yet rebuilt) are always treated as
+candidates, so results stay correct, just less lazy.
+
+Usage:
+    store = LazyBranchStore()
+    for miles, record in store.nearest(39.7392, -104.9903, k=5, trade="HVAC"):
+        print(f"{miles:.1f}", record.name)
+
+    python3 scripts/lazy_store.py --lat 39.7392 --lon -104.9903 -k 5 --trade HVAC
+"""
+
+import argparse
+import heapq
+import math
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from branch_store import DEFAULT_ROOT, ROOT_INDEX, BranchFile, BranchRecord, read_json
+from geo_index import GeoIndex, Neighbor, haversine_miles
+
+
+# Default LRU budget, in bytes of on-disk JSON
+DEFAULT_MEMORY_CAP = 64 * 1024 * 1024
+
+# Slack around each bounding box for arrival coordinates near its edge
+BBOX_MARGIN_MILES = 1.0
+
+
+@dataclass
+class FileEntry:
+    """A branch file as described by its index entry."""
+
+    rel_path: str
+    state: str
+    metro: Optional[str]
+    trade: Optional[str]
+    bbox: Optional[dict]
+    trade_counts: Optional[Dict[str, int]]
+    size: Optional[int]
+
+    def miles_to(self, lat: float, lon: float) -> float:
+        """Distance from a point to the nearest edge of the bounding box (0 inside)."""
+        if not self.bbox:
+            return 0.0
+        box = self.bbox
+        clamped_lat = min(max(lat, box["minLat"]), box["maxLat"])
+        clamped_lon = min(max(lon, box["minLon"]), box["maxLon"])
+        return max(0.0, haversine_miles(lat, lon, clamped_lat, clamped_lon) - BBOX_MARGIN_MILES)
+
+    def may_serve(self, trade: Optional[str]) -> bool:
+        """False only when the index proves the file has no branch for `trade`."""
+        if trade is None or self.trade_counts is None:
+            return True
+        wanted = trade.lower()
+        return any(name.lower() == wanted for name in self.trade_counts)
+
+
+class _LoadedFile:
+    def __init__(self, branch_file: BranchFile, size: int):
+        self.branch_file = branch_file
+        self.size = size
+        points, items = [], []
+        for position, branch in enumerate(branch_file.branches):
+            record = BranchRecord(data=branch, file=branch_file, position=position)
+            lat, lon = record.routing_coords
+            if lat is None or lon is None:
+                continue
+            points.append((lat, lon))
+            items.append(record)
+        self.geo = GeoIndex(points, items)
+
+
+class LazyBranchStore:
+    """Index-driven store that loads branch files only when a query needs them."""
+
+    def __init__(self, root=None, memory_cap: int = DEFAULT_MEMORY_CAP):
+        self.root = Path(root) if root else DEFAULT_ROOT
+        self.memory_cap = memory_cap
+        self.entries: List[FileEntry] = []
+        self._cache: "OrderedDict[str, _LoadedFile]" = OrderedDict()
+        self._cached_bytes = 0
+        self._trade_indexes_loaded = set()
+        self._state_indexes: Dict[str, dict] = {}
+        self._state_boxes: Dict[str, Optional[dict]] = {}
+        self._paths = set()
+        self.stats = {"loads": 0, "hits": 0, "evictions": 0, "bytes_loaded": 0}
+
+        country = read_json(self.root / ROOT_INDEX)
+        for state_entry in country.get("states", []):
+            index = read_json(self.root / state_entry["index"])
+            state = index.get("state", state_entry.get("code", ""))
+            self._state_indexes[state] = index
+            self._state_boxes[state] = state_entry.get("bbox")
+            self._add_entries(index, state, None)
+
+    def _add_entries(self, index: dict, state: str, trade: Optional[str]) -> List[FileEntry]:
+        added = []
+        for metro in index.get("metros", []):
+            rel_path = metro.get("file")
+            if not rel_path or rel_path in self._paths:
+                continue
+            self._paths.add(rel_path)
+            added.append(FileEntry(
+                rel_path=rel_path,
+                state=state,
+                metro=metro.get("id"),
+                trade=trade,
+                bbox=metro.get("bbox"),
+                trade_counts=metro.get("tradeCounts"),
+                size=metro.get("bytes"),
+            ))
+        self.entries.extend(added)
+        return added
+
+    def _load_trade_indexes(self, state: str) -> List[FileEntry]:
+        """Read a state's trade indexes (once) and return their new entries."""
+        self._trade_indexes_loaded.add(state)
+        added = []
+        for trade, trade_entry in self._state_indexes[state].get("trades", {}).items():
+            added += self._add_entries(read_json(self.root / trade_entry["index"]), state, trade)
+        return added
+
+    def load(self, entry: FileEntry) -> _LoadedFile:
+        """Return a parsed file, from the LRU if possible."""
+        loaded = self._cache.get(entry.rel_path)
+        if loaded is not None:
+            self._cache.move_to_end(entry.rel_path)
+            self.stats["hits"] += 1
+            return loaded
+
+        path = self.root / entry.rel_path
+        size = entry.size if entry.size is not None else path.stat().st_size
+        branch_file = BranchFile(path=path, rel_path=entry.rel_path, state=entry.state,
+                                 metro=entry.metro, trade=entry.trade, data=read_json(path))
+        loaded = _LoadedFile(branch_file, size)
+        self.stats["loads"] += 1
+        self.stats["bytes_loaded"] += size
+
+        self._cache[entry.rel_path] = loaded
+        self._cached_bytes += size
+        # Evict least recently used files, but never the one just loaded
+        while self._cached_bytes > self.memory_cap and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted.size
+            self.stats["evictions"] += 1
+        return loaded
+
+    def _candidates(self, lat: float, lon: float, radius: Optional[float], trade: Optional[str]):
+        """
+        Yield (distance to box, entry) for files the query may touch, nearest first.
+
+        A state's trade indexes are read only when the walk reaches the
+        state's bounding box, so distant states cost no I/O at all.
+        """
+        heap = []
+
+        def push(entry):
+            distance = entry.miles_to(lat, lon)
+            if entry.may_serve(trade) and (radius is None or distance <= radius):
+                heapq.heappush(heap, (distance, 1, entry.rel_path, entry))
+
+        for entry in self.entries:
+            push(entry)
+        for state, state_box in self._state_boxes.items():
+            if state not in self._trade_indexes_loaded:
+                box = FileEntry("", state, None, None, state_box, None, None)
+                distance = box.miles_to(lat, lon)
+                if radius is None or distance <= radius:
+                    heapq.heappush(heap, (distance, 0, state, None))
+
+        while heap:
+            distance, kind, key, entry = heapq.heappop(heap)
+            if kind == 0:
+                if key not in self._trade_indexes_loaded:
+                    for added in self._load_trade_indexes(key):
+                        push(added)
+                continue
+            yield distance, entry
+
+    @staticmethod
+    def _predicate(trade):
+        if trade is None:
+            return None
+        wanted = trade.lower()
+        return lambda record: any(t.lower() == wanted for t in record.trades)
+
+    def within(self, lat: float, lon: float, radius_miles: float,
+               trade: Optional[str] = None) -> List[Neighbor]:
+        """Every branch within radius_miles, nearest first (each id once)."""
+        predicate = self._predicate(trade)
+        best: Dict[str, Neighbor] = {}
+        for _, entry in self._candidates(lat, lon, radius_miles, trade):
+            for hit in self.load(entry).geo.within(lat, lon, radius_miles, predicate=predicate):
+                if hit.item.id not in best:
+                    best[hit.item.id] = hit
+        return sorted(best.values(), key=lambda n: (n.miles, n.item.id))
+
+    def nearest(self, lat: float, lon: float, k: int = 1, trade: Optional[str] = None,
+                max_miles: Optional[float] = None) -> List[Neighbor]:
+        """Up to k closest branches, visiting files in order of box distance."""
+        if k <= 0:
+            return []
+        predicate = self._predicate(trade)
+        best: Dict[str, Neighbor] = {}
+
+        def kth_miles():
+            if len(best) < k:
+                return math.inf if max_miles is None else max_miles
+            return heapq.nsmallest(k, (n.miles for n in best.values()))[-1]
+
+        for distance, entry in self._candidates(lat, lon, max_miles, trade):
+            if distance > kth_miles():
+                break
+            # k + duplicates: an id already found in another file does not count
+            found = self.load(entry).geo.nearest(lat, lon, k=k + len(best),
+                                                 predicate=predicate, max_miles=max_miles)
+            for hit in found:
+                if hit.item.id not in best:
+                    best[hit.item.id] = hit
+
+        return sorted(best.values(), key=lambda n: (n.miles, n.item.id))[:k]
+
+    @property
+    def cached_files(self) -> List[str]:
+        return list(self._cache)
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._cached_bytes
+
+
+def main():
+    """Answer one proximity query and report how much data it touched."""
+    parser = argparse.ArgumentParser(description="Query nearby branches, loading only nearby files.")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--lat", type=float, required=True, help="Job site latitude")
+    parser.add_argument("--lon", type=float, required=True, help="Job site longitude")
+    parser.add_argument("-k", type=int, default=5, help="Number of branches to return")
+    parser.add_argument("--radius", type=float, help="Return all branches within this many miles")
+    parser.add_argument("--trade", help="Only branches serving this trade (e.g. HVAC)")
+    parser.add_argument("--memory-cap", type=int, default=DEFAULT_MEMORY_CAP,
+                        help="LRU budget in bytes of JSON (default: %(default)s)")
+    args = parser.parse_args()
+
+    store = LazyBranchStore(args.root, memory_cap=args.memory_cap)
+    if args.radius is not None:
+        results = store.within(args.lat, args.lon, args.radius, trade=args.trade)
+    else:
+        results = store.nearest(args.lat, args.lon, k=args.k, trade=args.trade)
+
+    for miles, record in results:
+        print(f"{miles:7.2f} mi  {record.name}  ({record.get('city', '')})  [{record.id}]")
+
+    print(f"\nIndexed files: {len(store.entries)}  loaded: {store.stats['loads']}  "
+          f"({store.stats['bytes_loaded']:,} bytes)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,12 +21,14 @@ Mapping:
 - geoPrecision "centroid" → arrivalType "will_call" (flagged for review)
 """
 
-import json
+import argparse
 import os
 import sys
-from pathlib import Path
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+from file_pool import add_workers_argument, map_files
+
 # Migration date
 MIGRATION_DATE = datetime.now().strftime("%Y-%m-%d")
 
@@ -82,33 +84,30 @@ def migrate_branch(branch):
     return branch, needs_review, review_reason
 
 
-def migrate_file(file_path):
+def migrate_file(branch_file):
     """
-    Migrate all branches in a single file.
+    Migrate all branches in a branch file, in a single pass.
+    
+    Marks the file modified if any branch gained arrival coordinates; writing
+    is left to the caller.
     
     Returns: (total_branches, migrated_count, needs_review_count, review_list)
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"  ❌ Error reading file: {e}")
-        return 0, 0, 0, []
-    
-    branches = data.get("branches", [])
-    if not branches:
-        return 0, 0, 0, []
-    
-    total = len(branches)
+    total = 0
     migrated = 0
     needs_review_count = 0
     review_list = []
     
-    for i, branch in enumerate(branches):
+    for branch in branch_file.branches:
+        total += 1
+        had_arrival = "arrivalLat" in branch and "arrivalLon" in branch
+        # migrate_branch edits the branch in place
         updated_branch, needs_review, reason = migrate_branch(branch)
-        branches[i] = updated_branch
         
         if "arrivalLat" in updated_branch and "arrivalLon" in updated_branch:
+            if not had_arrival:
+                branch_file.mark_modified()
+            
             if needs_review:
                 needs_review_count += 1
                 review_list.append({
@@ -121,46 +120,16 @@ def migrate_file(file_path):
             else:
                 migrated += 1
     
-    # Write updated data back
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-            f.write('\n')
-    except Exception as e:
-        print(f"  ❌ Error writing file: {e}")
-        return 0, 0, 0, []
-    
     return total, migrated, needs_review_count, review_list
 
 
-def find_branch_files(base_dir):
-    """Find all JSON files containing branch data."""
-    branch_files = []
-    
-    for root, dirs, files in os.walk(base_dir):
-        # Skip metadata directory
-        if '_meta' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.json') and not file.startswith('_'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if "branches" in data:
-                            branch_files.append(file_path)
-                except:
-                    pass
-    
-    return sorted(branch_files)
-
-
 def main():
     """Main migration function."""
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    parser = argparse.ArgumentParser(description="Add arrival coordinates to branches.")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+    
+    repo_root = REPO_ROOT
     supply_dir = repo_root / "supply-house-directory"
     
     if not supply_dir.exists():
@@ -174,8 +143,9 @@ def main():
     print(f"Date: {MIGRATION_DATE}")
     print()
     
-    # Find all branch files
-    branch_files = find_branch_files(supply_dir)
+    # Discover branch files; each is streamed and rewritten in one pass
+    store = BranchStore.stream(supply_dir, rewrite=True)
+    branch_files = store.files
     
     if not branch_files:
         print("No branch files found!", file=sys.stderr)
@@ -190,11 +160,16 @@ def main():
     total_needs_review = 0
     all_review_items = []
     
-    for file_path in branch_files:
-        rel_path = os.path.relpath(file_path, repo_root)
+    for result in map_files(migrate_file, branch_files, workers=args.workers):
+        rel_path = os.path.relpath(result.branch_file.path, repo_root)
         print(f"Processing: {rel_path}")
         
-        total, migrated, needs_review, review_list = migrate_file(file_path)
+        if result.error:
+            print(f"  ❌ Error: {result.error}")
+            print()
+            continue
+        
+        total, migrated, needs_review, review_list = result.stats
         
         total_branches += total
         total_migrated += migrated
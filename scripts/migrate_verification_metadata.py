@@ -4,10 +4,13 @@ Migrate existing verification metadata to new schema requirements.
 Adds addressVerified, addressSource, and addressVerifiedDate fields where missing.
 """
 
-import json
-import glob
+import argparse
+import os
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+from file_pool import add_workers_argument, map_files
+
 def determine_address_source(branch):
     """Determine address source based on existing data."""
     
@@ -32,10 +35,56 @@ def determine_address_source(branch):
     else:
         return "Requires verification"
 
-def migrate_verification_metadata():
+def migrate_file(branch_file):
+    """
+    Add required verification fields to the branches in one file, in a single pass.
+    
+    Marks the file modified if anything changed; writing is left to the caller.
+    """
+    stats = {
+        'branches_updated': 0,
+        'already_compliant': 0
+    }
+    
+    for branch in branch_file.branches:
+        verification = branch.get('verification', {})
+        
+        # Skip if already has all required fields
+        if 'addressVerified' in verification and 'addressSource' in verification and 'addressVerifiedDate' in verification:
+            stats['already_compliant'] += 1
+            continue
+        
+        # Add missing fields
+        if 'addressVerified' not in verification:
+            # If we have storefront_confirmed, consider it verified
+            if 'storefront_confirmed' in verification:
+                verification['addressVerified'] = True
+            else:
+                verification['addressVerified'] = False  # Needs verification
+        
+        if 'addressSource' not in verification:
+            verification['addressSource'] = determine_address_source(branch)
+        
+        if 'addressVerifiedDate' not in verification:
+            # Use existing verification date if available
+            if 'storefront_confirmed' in verification:
+                verification['addressVerifiedDate'] = verification['storefront_confirmed']
+            elif 'coords_verified' in verification:
+                verification['addressVerifiedDate'] = verification['coords_verified']
+            else:
+                # Use null for unverified entries to maintain schema consistency
+                verification['addressVerifiedDate'] = None
+        
+        branch['verification'] = verification
+        branch_file.mark_modified()
+        stats['branches_updated'] += 1
+    
+    return stats
+
+def migrate_verification_metadata(workers=None):
     """Add required verification fields to all branches."""
     
-    files = glob.glob("supply-house-directory/us/**/*.json", recursive=True)
+    store = BranchStore.stream(rewrite=True)
     
     stats = {
         'files_processed': 0,
@@ -43,66 +92,30 @@ def migrate_verification_metadata():
         'already_compliant': 0
     }
     
-    for file_path in files:
-        if "/_meta/" in file_path:
+    for rel_path, error in store.load_errors:
+        print(f"Error processing {rel_path}: {error}")
+    
+    for result in map_files(migrate_file, store.files, workers=workers):
+        file_path = os.path.relpath(result.branch_file.path, REPO_ROOT)
+        
+        if result.error:
+            print(f"Error processing {file_path}: {result.error}")
             continue
-            
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                
-            if "branches" not in data:
-                continue
-            
-            modified = False
-            
-            for branch in data["branches"]:
-                verification = branch.get('verification', {})
-                
-                # Skip if already has all required fields
-                if 'addressVerified' in verification and 'addressSource' in verification and 'addressVerifiedDate' in verification:
-                    stats['already_compliant'] += 1
-                    continue
-                
-                # Add missing fields
-                if 'addressVerified' not in verification:
-                    # If we have storefront_confirmed, consider it verified
-                    if 'storefront_confirmed' in verification:
-                        verification['addressVerified'] = True
-                    else:
-                        verification['addressVerified'] = False  # Needs verification
-                
-                if 'addressSource' not in verification:
-                    verification['addressSource'] = determine_address_source(branch)
-                
-                if 'addressVerifiedDate' not in verification:
-                    # Use existing verification date if available
-                    if 'storefront_confirmed' in verification:
-                        verification['addressVerifiedDate'] = verification['storefront_confirmed']
-                    elif 'coords_verified' in verification:
-                        verification['addressVerifiedDate'] = verification['coords_verified']
-                    else:
-                        # Use null for unverified entries to maintain schema consistency
-                        verification['addressVerifiedDate'] = None
-                
-                branch['verification'] = verification
-                modified = True
-                stats['branches_updated'] += 1
-            
-            if modified:
-                # Write back to file
-                with open(file_path, 'w') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                    f.write('\n')  # Add trailing newline
-                stats['files_processed'] += 1
-                print(f"Updated: {file_path}")
-                    
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
+        
+        stats['branches_updated'] += result.stats['branches_updated']
+        stats['already_compliant'] += result.stats['already_compliant']
+        
+        if result.modified:
+            stats['files_processed'] += 1
+            print(f"Updated: {file_path}")
     
     return stats
 
 def main():
+    parser = argparse.ArgumentParser(description="Add required address verification fields.")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("VERIFICATION METADATA MIGRATION")
     print("=" * 80)
@@ -110,7 +123,7 @@ def main():
     print("Adding addressVerified, addressSource, and addressVerifiedDate fields...")
     print()
     
-    stats = migrate_verification_metadata()
+    stats = migrate_verification_metadata(workers=args.workers)
     
     print()
     print("=" * 80)
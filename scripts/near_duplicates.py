@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Fuzzy duplicate detection with MinHash and locality-sensitive hashing.
+
+dedup_engine only matches on exact normalized keys, so it misses pairs such
+as an acquired branch re-listed under the new brand ("Rexel - Glenwood
+Springs" vs "CED - Glenwood Springs") or a street spelled two ways. This
+finder compares branches on the character shingles of their normalized
+name, address1 and city:
+
+1. Each distinct branch id becomes one shingle set.
+2. A one-permutation MinHash signature (NUM_HASHES bins, densified) is
+   computed from one hash per shingle.
+3. The signature is cut into BANDS bands; branches sharing any band bucket
+   become candidate pairs. Only candidates are compared, so the cost grows
+   with the number of branches and candidates rather than n^2.
+4. Candidates are re-scored with exact shingle Jaccard similarity, the
+   distance between their coordinates and the similarity of their phone
+   numbers, and reported above a score threshold.
+
+Ids listed in more than one file (a metro file and a trade file) are
+reported separately as cross-file listings; they come straight out of the
+by-id grouping and need no pairwise comparison.
+
+Usage:
+    python3 scripts/near_duplicates.py
+    python3 scripts/near_duplicates.py --threshold 0.5 --json build/near-duplicates.json
+"""
+
+import argparse
+import hashlib
+import sys
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from branch_store import BranchStore, write_json
+from dedup_engine import Entity, match_reasons, normalize_address, normalize_name
+from geo_index import haversine_miles
+
+
+SHINGLE_SIZE = 3
+
+# Signature length and banding: 12 bands of 5 rows puts the 50% candidate
+# probability near Jaccard 0.6 ((1/12) ** (1/5)); pairs above 0.8 become
+# candidates ~99% of the time
+NUM_HASHES = 60
+BANDS = 12
+ROWS = NUM_HASHES // BANDS
+
+# Buckets larger than this are common boilerplate (e.g. a chain name) and
+# would reintroduce quadratic work; they are skipped
+MAX_BUCKET_SIZE = 50
+
+# Distance beyond which coordinates add nothing to the score
+PROXIMITY_MILES = 0.5
+
+DEFAULT_THRESHOLD = 0.6
+
+# Score weights: text similarity, coordinate proximity, phone similarity
+WEIGHTS = (0.5, 0.3, 0.2)
+
+_MAX_HASH = (1 << 64) - 1
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> FrozenSet[str]:
+    """Character n-grams of a string (the whole string if it is shorter)."""
+    text = " ".join(text.split())
+    if len(text) <= size:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + size] for i in range(len(text) - size + 1))
+
+
+def entity_text(entity: Entity) -> str:
+    city = normalize_name(entity.record.get("city"))
+    # Keep unit numbers here: they are weak evidence, not noise
+    address = normalize_address(entity.record.get("address1"), drop_unit=False)
+    return f"{entity.name} | {address} | {city}"
+
+
+class MinHasher:
+    """One-permutation MinHash with rotation densification."""
+
+    def __init__(self, num_hashes: int = NUM_HASHES):
+        self.num_hashes = num_hashes
+        self._cache: Dict[str, int] = {}
+
+    def _hash(self, shingle: str) -> int:
+        value = self._cache.get(shingle)
+        if value is None:
+            digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "big")
+            self._cache[shingle] = value
+        return value
+
+    def signature(self, shingle_set) -> Tuple[int, ...]:
+        k = self.num_hashes
+        bins = [_MAX_HASH] * k
+        for shingle in shingle_set:
+            h = self._hash(shingle)
+            b = h % k
+            v = h // k
+            if v < bins[b]:
+                bins[b] = v
+        # Empty bins borrow the next non-empty bin to the right (circularly),
+        # offset by the distance so borrowed values stay distinguishable
+        if _MAX_HASH in bins and len(bins) != bins.count(_MAX_HASH):
+            filled = list(bins)
+            for i in range(k):
+                if bins[i] != _MAX_HASH:
+                    continue
+                j = 1
+                while bins[(i + j) % k] == _MAX_HASH:
+                    j += 1
+                filled[i] = bins[(i + j) % k] + j * (_MAX_HASH // (k * k))
+            bins = filled
+        return tuple(bins)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def phone_similarity(a: str, b: str) -> float:
+    """1.0 for the same number, 0.5 for the same area code and exchange."""
+    if len(a) < 10 or len(b) < 10:
+        return 0.0
+    if a == b:
+        return 1.0
+    if a[:6] == b[:6]:
+        return 0.5
+    return 0.0
+
+
+@dataclass
+class NearDuplicate:
+    """A scored candidate pair."""
+
+    a: Entity
+    b: Entity
+    score: float
+    similarity: float
+    miles: Optional[float]
+    phone: float
+
+    @property
+    def cross_file(self) -> bool:
+        return self.a.files != self.b.files
+
+    def to_dict(self):
+        def entry(e):
+            return {
+                "id": e.id,
+                "name": e.record.name,
+                "address": e.record.get("address1"),
+                "city": e.record.get("city"),
+                "phone": e.record.get("phone"),
+                "files": e.files,
+            }
+
+        return {
+            "score": round(self.score, 3),
+            "similarity": round(self.similarity, 3),
+            "miles": round(self.miles, 3) if self.miles is not None else None,
+            "phoneSimilarity": self.phone,
+            "crossFile": self.cross_file,
+            "exactRules": match_reasons(self.a, self.b),
+            "entries": [entry(self.a), entry(self.b)],
+        }
+
+
+class NearDuplicateFinder:
+    """MinHash/LSH candidate generation plus re-scoring."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, bands: int = BANDS,
+                 num_hashes: int = NUM_HASHES, max_bucket_size: int = MAX_BUCKET_SIZE):
+        if num_hashes % bands:
+            raise ValueError(f"num_hashes ({num_hashes}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.hasher = MinHasher(num_hashes)
+        self.max_bucket_size = max_bucket_size
+        self.candidates = 0
+        self.skipped_buckets = 0
+
+    def candidate_pairs(self, signatures: List[Tuple[int, ...]]) -> set:
+        buckets: Dict[Tuple, List[int]] = {}
+        for i, sig in enumerate(signatures):
+            for band in range(self.bands):
+                start = band * self.rows
+                key = (band,) + sig[start:start + self.rows]
+                buckets.setdefault(key, []).append(i)
+
+        pairs = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > self.max_bucket_size:
+                self.skipped_buckets += 1
+                continue
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pairs.add((members[x], members[y]))
+        return pairs
+
+    def score(self, a: Entity, b: Entity, similarity: float) -> NearDuplicate:
+        miles = None
+        proximity = 0.0
+        if a.record.lat is not None and b.record.lat is not None:
+            miles = haversine_miles(a.record.lat, a.record.lon, b.record.lat, b.record.lon)
+            proximity = max(0.0, 1.0 - miles / PROXIMITY_MILES)
+        phone = phone_similarity(a.phone, b.phone)
+        w_text, w_geo, w_phone = WEIGHTS
+        total = w_text * similarity + w_geo * proximity + w_phone * phone
+        return NearDuplicate(a, b, total, similarity, miles, phone)
+
+    def find(self, entities: List[Entity]) -> List[NearDuplicate]:
+        shingle_sets = [shingles(entity_text(e)) for e in entities]
+        signatures = [self.hasher.signature(s) for s in shingle_sets]
+        pairs = self.candidate_pairs(signatures)
+        self.candidates = len(pairs)
+
+        results = []
+        for i, j in pairs:
+            scored = self.score(entities[i], entities[j],
+                                jaccard(shingle_sets[i], shingle_sets[j]))
+            if scored.score >= self.threshold:
+                results.append(scored)
+        results.sort(key=lambda r: (-r.score, r.a.id, r.b.id))
+        return results
+
+    def run(self, store: BranchStore) -> List[NearDuplicate]:
+        return self.find([Entity.from_records(r) for r in store.by_id().values()])
+
+
+def cross_file_listings(store: BranchStore) -> Dict[str, List[str]]:
+    """Branch ids stored in more than one file, with their files."""
+    listings = {}
+    for branch_id, records in store.by_id().items():
+        files = sorted({r.file.rel_path for r in records})
+        if len(files) > 1:
+            listings[branch_id] = files
+    return listings
+
+
+def main():
+    """Report fuzzy duplicate candidates and ids listed in several files."""
+    parser = argparse.ArgumentParser(description="Find near-duplicate branches with MinHash/LSH.")
+    parser.add_argument("--root", help="Directory to scan (default: supply-house-directory)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum combined score to report (default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    args = parser.parse_args()
+
+    store = BranchStore.load(args.root)
+    finder = NearDuplicateFinder(threshold=args.threshold)
+    results = finder.run(store)
+    listings = cross_file_listings(store)
+
+    print("=" * 80)
+    print("NEAR-DUPLICATE BRANCHES")
+    print("=" * 80)
+    print(f"Candidate pairs: {finder.candidates}  "
+          f"(skipped {finder.skipped_buckets} oversized buckets)")
+    print(f"Pairs scoring >= {args.threshold}: {len(results)}")
+    print()
+
+    for r in results:
+        flags = []
+        if r.cross_file:
+            flags.append("cross-file")
+        exact = match_reasons(r.a, r.b)
+        if exact:
+            flags.append("exact: " + ", ".join(exact))
+        miles = f"{r.miles:.2f} mi" if r.miles is not None else "no coords"
+        print(f"{r.score:.2f}  text {r.similarity:.2f}  {miles}  phone {r.phone:.1f}"
+              + (f"  [{'; '.join(flags)}]" if flags else ""))
+        for e in (r.a, r.b):
+            print(f"      {e.id}: {e.record.name}, {e.record.get('address1', '')}, "
+                  f"{e.record.get('city', '')} ({', '.join(e.files)})")
+
+    if listings:
+        print()
+        print(f"Ids listed in more than one file: {len(listings)}")
+        for branch_id, files in sorted(listings.items()):
+            print(f"  {branch_id}: {', '.join(files)}")
+
+    if args.json:
+        write_json(args.json, {
+            "threshold": args.threshold,
+            "candidatePairs": finder.candidates,
+            "pairs": [r.to_dict() for r in results],
+            "crossFileListings": listings,
+        })
+        print(f"\nWrote {args.json}")
+
+    return 1 if results else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Batched, transactional patches for branch data files.
+
+Scripts such as refine_arrival_coordinates.py used to locate one branch,
+edit it and rewrite its whole metro file, once per change. PatchSet instead:
+
+1. groups patches by file,
+2. applies every patch to an in-memory copy of its file, checking each
+   patch's preconditions (e.g. the current lat/lon are within a tolerance of
+   the expected old values),
+3. if and only if every patch succeeded, writes each touched file exactly
+   once: all files are first written to temporary siblings, then renamed
+   over the originals.
+
+If any precondition fails, nothing is written and the store is left as it
+was. A patch whose updates are already present is reported as already
+applied rather than failed, so re-running a patch list is harmless.
+
+Usage:
+    patches = PatchSet([
+        Patch(file="us/co/denver-metro.json",
+              match={"name": "Lennox Stores - Centennial"},
+              expect={"lat": 39.58202, "lon": -104.84064},
+              update={"lat": 39.58383, "lon": -104.84121}),
+    ])
+    result = patches.apply(store)
+"""
+
+import copy
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from branch_store import BranchStore, format_json
+from build_indexes import refresh_indexes
+
+
+# Patch outcomes
+APPLIED = "applied"
+ALREADY_APPLIED = "already_applied"
+FAILED = "failed"
+
+
+class PatchError(Exception):
+    """Raised when a patch set cannot be committed."""
+    pass
+
+
+@dataclass
+class Patch:
+    """
+    A change to a single branch.
+
+    - file: branch file path relative to the store root
+    - match: fields that identify the branch (all must be equal)
+    - expect: numeric fields that must currently be within `tolerance`
+    - update: fields to set
+    - stamp: fields set alongside `update` (e.g. a verification date) that
+      are not compared when deciding whether the patch is already applied
+    - note: text appended to the branch's "notes" (once) when applied
+    """
+
+    file: str
+    match: Dict[str, Any]
+    update: Dict[str, Any]
+    expect: Dict[str, float] = field(default_factory=dict)
+    stamp: Dict[str, Any] = field(default_factory=dict)
+    tolerance: float = 0.0
+    note: Optional[str] = None
+    label: Optional[str] = None
+
+    @property
+    def description(self):
+        return self.label or ", ".join(f"{k}={v}" for k, v in self.match.items())
+
+
+@dataclass
+class PatchOutcome:
+    """What happened to one patch."""
+
+    patch: Patch
+    status: str
+    message: str = ""
+    before: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PatchResult:
+    """Outcome of PatchSet.apply()."""
+
+    outcomes: List[PatchOutcome]
+    written: List[str] = field(default_factory=list)
+    dry_run: bool = False
+
+    def count(self, status):
+        return sum(1 for o in self.outcomes if o.status == status)
+
+    @property
+    def committed(self):
+        return self.count(FAILED) == 0
+
+
+class PatchSet:
+    """An ordered collection of patches applied as one transaction."""
+
+    def __init__(self, patches: List[Patch]):
+        self.patches = list(patches)
+
+    def by_file(self) -> Dict[str, List[Patch]]:
+        grouped = {}
+        for patch in self.patches:
+            grouped.setdefault(patch.file, []).append(patch)
+        return grouped
+
+    def _apply_one(self, patch: Patch, branches: List[dict]) -> PatchOutcome:
+        matches = [
+            branch for branch in branches
+            if all(branch.get(k) == v for k, v in patch.match.items())
+        ]
+        if not matches:
+            return PatchOutcome(patch, FAILED, "Branch not found")
+        if len(matches) > 1:
+            return PatchOutcome(patch, FAILED, f"{len(matches)} branches match")
+
+        branch = matches[0]
+        before = {k: branch.get(k) for k in {**patch.expect, **patch.update}}
+
+        if all(branch.get(k) == v for k, v in patch.update.items()):
+            return PatchOutcome(patch, ALREADY_APPLIED, "Already applied", before)
+
+        for key, expected in patch.expect.items():
+            current = branch.get(key)
+            if not isinstance(current, (int, float)) or abs(current - expected) >= patch.tolerance:
+                return PatchOutcome(
+                    patch, FAILED, f"{key} is {current}, expected {expected}", before
+                )
+
+        branch.update(patch.update)
+        branch.update(patch.stamp)
+        if patch.note:
+            notes = branch.get("notes", "")
+            if patch.note not in notes:
+                branch["notes"] = (notes + " " + patch.note).strip()
+
+        return PatchOutcome(patch, APPLIED, "", before)
+
+    def apply(self, store: BranchStore, dry_run: bool = False) -> PatchResult:
+        """
+        Apply every patch, writing each touched file at most once.
+
+        Returns a PatchResult; nothing is written (and the store is not
+        changed) unless every patch either applied or was already applied.
+        """
+        files_by_path = {f.rel_path: f for f in store.files}
+        outcomes = []
+        staged = {}  # rel_path -> (BranchFile, patched data)
+
+        for rel_path, patches in self.by_file().items():
+            branch_file = files_by_path.get(rel_path)
+            if branch_file is None:
+                outcomes.extend(PatchOutcome(p, FAILED, f"File not found: {rel_path}") for p in patches)
+                continue
+
+            data = copy.deepcopy(branch_file.data)
+            file_outcomes = [self._apply_one(p, data.get("branches", [])) for p in patches]
+            outcomes.extend(file_outcomes)
+
+            if any(o.status == APPLIED for o in file_outcomes):
+                staged[rel_path] = (branch_file, data)
+
+        # Report in input order rather than grouped by file
+        order = {id(patch): i for i, patch in enumerate(self.patches)}
+        outcomes.sort(key=lambda o: order[id(o.patch)])
+
+        result = PatchResult(outcomes=outcomes, dry_run=dry_run)
+        if not result.committed or dry_run or not staged:
+            return result
+
+        commit_files([(branch_file, data) for branch_file, data in staged.values()])
+        result.written = sorted(staged)
+        return result
+
+
+def commit_files(changes: List[tuple]):
+    """
+    Write (BranchFile, data) pairs all-or-nothing.
+
+    Every file is first written and fsynced to a temporary sibling; only then
+    are the temporaries renamed over the originals. If a rename fails, files
+    already replaced are restored from their previous contents. Once every
+    file is in place, the index entries listing them are rebuilt.
+    """
+    staged = []
+    tmp_paths = []
+    try:
+        for branch_file, data in changes:
+            tmp_path = branch_file.path.with_name(branch_file.path.name + ".tmp")
+            tmp_paths.append(tmp_path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(format_json(data))
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append((branch_file, data, tmp_path, branch_file.path.read_bytes()))
+    except OSError as e:
+        for tmp_path in tmp_paths:
+            tmp_path.unlink(missing_ok=True)
+        raise PatchError(f"Could not stage {branch_file.rel_path}: {e}") from e
+
+    replaced = []
+    try:
+        for branch_file, data, tmp_path, original in staged:
+            os.replace(tmp_path, branch_file.path)
+            replaced.append((branch_file, original))
+    except OSError as e:
+        for branch_file, original in replaced:
+            branch_file.path.write_bytes(original)
+        for tmp_path in tmp_paths:
+            tmp_path.unlink(missing_ok=True)
+        raise PatchError(f"Could not replace {branch_file.rel_path}: {e}") from e
+
+    for branch_file, data, _, _ in staged:
+        branch_file.data = data
+        branch_file.modified = False
+    refresh_indexes(branch_file for branch_file, _, _, _ in staged)
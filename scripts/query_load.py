@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Load generator for query_service.py.
+
+Opens --connections keep-alive connections to a running service and sends
+requests as fast as each connection gets responses, for --duration
+seconds. The request mix resembles field-app traffic:
+
+- nearest queries around points drawn from a fixed pool of job sites
+  (--points); a small pool means hot, cacheable queries;
+- trade-filtered nearest queries;
+- branch-by-id and directions lookups.
+
+A fraction of requests (--conditional) revalidates with the ETag seen on
+the previous response for the same target, which exercises 304 handling.
+Targets are built from the local data directory, so ids and coordinates
+are real.
+
+Reports throughput, latency percentiles, status counts and bytes received.
+
+Usage:
+    python3 scripts/query_service.py --port 8080 &
+    python3 scripts/query_load.py --port 8080 --connections 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List
+
+from branch_store import BranchStore, write_json
+
+
+TRADES = ("HVAC", "Plumbing", "Electrical")
+
+
+def build_targets(store: BranchStore, points: int, seed: int) -> List[str]:
+    """A deterministic pool of request targets drawn from the data."""
+    rng = random.Random(seed)
+    records = list({r.id: r for r in store.branches() if r.lat is not None}.values())
+    if not records:
+        raise ValueError("No branches with coordinates to build requests from")
+
+    targets = []
+    for _ in range(points):
+        record = rng.choice(records)
+        lat = round(record.lat + rng.uniform(-0.1, 0.1), 4)
+        lon = round(record.lon + rng.uniform(-0.1, 0.1), 4)
+        targets.append(f"/branches/nearest?lat={lat}&lon={lon}&k=5")
+        targets.append(f"/branches/nearest?lat={lat}&lon={lon}&k=5&trade={rng.choice(TRADES)}")
+    for record in rng.sample(records, min(points, len(records))):
+        targets.append(f"/branches/{record.id}")
+        targets.append(f"/branches/{record.id}/directions")
+    return targets
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.bytes = 0
+        self.errors = 0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+
+async def _worker(host, port, targets, deadline, conditional, accept_encoding, rng, stats, etags):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            target = rng.choice(targets)
+            lines = [f"GET {target} HTTP/1.1", f"Host: {host}"]
+            if accept_encoding:
+                lines.append(f"Accept-Encoding: {accept_encoding}")
+            if target in etags and rng.random() < conditional:
+                lines.append(f"If-None-Match: {etags[target]}")
+            request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            try:
+                status, headers, body = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                stats.errors += 1
+                break
+            stats.latencies.append(time.perf_counter() - started)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes += len(body)
+            if "etag" in headers:
+                etags[target] = headers["etag"]
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, targets, connections, duration, conditional, accept_encoding, seed):
+    stats = LoadStats()
+    etags: Dict[str, str] = {}
+    deadline = time.perf_counter() + duration
+    workers = [
+        _worker(host, port, targets, deadline, conditional, accept_encoding,
+                random.Random(seed + i), stats, etags)
+        for i in range(connections)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*workers, return_exceptions=False)
+    return stats, time.perf_counter() - started
+
+
+def main():
+    """Drive load against a running query service and print a summary."""
+    parser = argparse.ArgumentParser(description="Load generator for query_service.py.")
+    parser.add_argument("--root", help="Data directory used to build requests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds (default: %(default)s)")
+    parser.add_argument("--points", type=int, default=200,
+                        help="Distinct job sites in the request pool (default: %(default)s)")
+    parser.add_argument("--conditional", type=float, default=0.3,
+                        help="Fraction of repeat requests sent with If-None-Match (default: %(default)s)")
+    parser.add_argument("--accept-encoding", default="gzip, br",
+                        help="Accept-Encoding header ('' for identity)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("-o", "--output", help="Write the summary as JSON")
+    args = parser.parse_args()
+
+    targets = build_targets(BranchStore.load(args.root), args.points, args.seed)
+    try:
+        stats, elapsed = asyncio.run(run_load(args.host, args.port, targets, args.connections,
+                                              args.duration, args.conditional,
+                                              args.accept_encoding, args.seed))
+    except OSError as e:
+        print(f"❌ Could not reach {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+
+    total = len(stats.latencies)
+    summary = {
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "requestsPerSecond": round(total / elapsed, 1) if elapsed else 0.0,
+        "latencyMs": {p: round(stats.percentile(float(p[1:])) * 1000, 3)
+                      for p in ("p50", "p95", "p99")},
+        "statuses": {str(k): v for k, v in sorted(stats.statuses.items())},
+        "bytesReceived": stats.bytes,
+        "errors": stats.errors,
+    }
+
+    print(f"Requests:   {total} in {elapsed:.1f}s ({summary['requestsPerSecond']} req/s)")
+    print("Latency:    " + "  ".join(f"{p} {ms:.2f} ms" for p, ms in summary["latencyMs"].items()))
+    print("Statuses:   " + "  ".join(f"{k}: {v}" for k, v in summary["statuses"].items()))
+    print(f"Received:   {stats.bytes:,} bytes body")
+    if stats.errors:
+        print(f"Errors:     {stats.errors}")
+
+    if args.output:
+        write_json(args.output, summary)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Local HTTP query service over the supply house directory.
+
+Field apps used to download the raw metro JSON files and filter them on the
+device. This service answers the same questions server-side from the
+in-memory indexes (FilterIndex + its GeoIndex), using only the standard
+library's asyncio streams:
+
+    GET /branches/nearest?lat=..&lon=..[&k=5][&radius=mi][&trade=HVAC]
+    GET /branches/search?<field>=<value>...[&lat=..&lon=..][&radius=mi][&k=n]
+    GET /branches/<id>
+    GET /branches/<id>/directions
+    GET /health
+
+Search fields are the FilterIndex fields (trades, primaryTrade, brandsRep,
+chain, ...); repeating a field ORs its values. A search near a point with
+neither radius nor k returns the DEFAULT_K nearest matches. Directions follow
+DIRECTIONS_URL_GUIDE.md: coordinate-based Google and Apple Maps URLs built
+from arrivalLat/arrivalLon, falling back to lat/lon.
+
+Every response body is produced once and kept in an LRU of hot responses
+keyed by path and query. Each cached response carries:
+
+- a strong ETag (sha256 of the body), with a distinct tag per content
+  coding as strong validators require;
+- gzip and, when the optional `brotli` module is installed, brotli
+  encodings compressed once at insertion time.
+
+Requests with a matching If-None-Match get 304 Not Modified without a body.
+
+Usage:
+    python3 scripts/query_service.py --port 8080
+    curl -s 'http://127.0.0.1:8080/branches/nearest?lat=39.7392&lon=-104.9903&k=3&trade=HVAC'
+
+See query_load.py for a load generator.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import signal
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from branch_store import BranchRecord, BranchStore
+from filter_index import FilterIndex
+
+try:
+    import brotli
+except ImportError:  # optional: responses are served gzip-only without it
+    brotli = None
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Hot responses kept in memory
+DEFAULT_CACHE_SIZE = 4096
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+DEFAULT_K = 10
+MAX_K = 200
+
+# Request size limits
+MAX_REQUEST_LINE = 8192
+MAX_HEADERS = 100
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error"}
+
+GOOGLE_DIRECTIONS_URL = "https://www.google.com/maps/dir/?api=1&destination={lat},{lon}"
+APPLE_DIRECTIONS_URL = "http://maps.apple.com/?daddr={lat},{lon}"
+
+
+class HTTPError(Exception):
+    """An error that maps directly to an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def directions_urls(record: BranchRecord) -> dict:
+    """Coordinate-based directions per DIRECTIONS_URL_GUIDE.md."""
+    lat, lon = record.routing_coords
+    if lat is None or lon is None:
+        raise HTTPError(404, f"Branch '{record.id}' has no coordinates")
+    return {
+        "id": record.id,
+        "name": record.name,
+        "arrival": {"lat": lat, "lon": lon},
+        "arrivalType": record.get("arrivalType"),
+        "usesArrivalCoords": record.arrival_lat is not None and record.arrival_lon is not None,
+        "google": GOOGLE_DIRECTIONS_URL.format(lat=lat, lon=lon),
+        "apple": APPLE_DIRECTIONS_URL.format(lat=lat, lon=lon),
+    }
+
+
+@dataclass
+class Response:
+    """A rendered response body with its precomputed encodings."""
+
+    status: int
+    body: bytes
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def json(cls, status: int, payload) -> "Response":
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        response = cls(status, body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        if len(body) >= MIN_COMPRESS_BYTES:
+            response.encoded["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                response.encoded["br"] = brotli.compress(body, quality=5)
+        return response
+
+    def variant_etag(self, coding: Optional[str]) -> str:
+        return self.etag if coding is None else f'{self.etag[:-1]}-{coding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """If-None-Match check against every variant of this response."""
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        tags = {tag[2:] if tag.startswith("W/") else tag for tag in tags}
+        variants = {self.variant_etag(None)} | {self.variant_etag(c) for c in self.encoded}
+        return bool(tags & variants)
+
+
+def choose_coding(accept_encoding: str, available) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for coding in ("br", "gzip"):
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if coding in available and quality > 0:
+            return coding
+    return None
+
+
+class ResponseCache:
+    """LRU of rendered responses keyed by request path and query."""
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE):
+        self.capacity = capacity
+        self._entries: "OrderedDict[tuple, Response]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[Response]:
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key, response: Response):
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _float(params, name, required=True) -> Optional[float]:
+    value = params.get(name)
+    if value is None:
+        if required:
+            raise HTTPError(400, f"Missing parameter '{name}'")
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        raise HTTPError(400, f"Parameter '{name}' must be a number")
+    if not math.isfinite(number):
+        raise HTTPError(400, f"Parameter '{name}' must be finite")
+    return number
+
+
+def _radius(params) -> Optional[float]:
+    radius = _float(params, "radius", required=False)
+    if radius is not None and radius < 0:
+        raise HTTPError(400, "Parameter 'radius' must not be negative")
+    return radius
+
+
+def _int(params, name, default) -> int:
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HTTPError(400, f"Parameter '{name}' must be an integer")
+    if not 1 <= number <= MAX_K:
+        raise HTTPError(400, f"Parameter '{name}' must be between 1 and {MAX_K}")
+    return number
+
+
+class QueryService:
+    """Request routing and query evaluation; transport-independent."""
+
+    def __init__(self, store: BranchStore, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.index = FilterIndex.from_store(store)
+        self.by_id = {record.id: record for record in self.index.records}
+        self.cache = ResponseCache(cache_size)
+
+    def handle(self, target: str) -> Response:
+        """Resolve a request target to a (possibly cached) response."""
+        parts = urlsplit(target)
+        pairs = parse_qsl(parts.query, keep_blank_values=False)
+        key = (parts.path, tuple(sorted(pairs)))
+
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+
+        try:
+            payload = self.route(unquote(parts.path), pairs)
+            response = Response.json(200, payload)
+        except HTTPError as e:
+            # Errors are not cached: they are cheap and often transient typos
+            return Response.json(e.status, {"error": str(e)})
+
+        self.cache.put(key, response)
+        return response
+
+    def route(self, path: str, pairs: List[Tuple[str, str]]):
+        segments = [s for s in path.split("/") if s]
+        params = dict(pairs)
+
+        if segments == ["health"]:
+            return {"status": "ok", "branches": len(self.index)}
+        if len(segments) < 2 or segments[0] != "branches":
+            raise HTTPError(404, f"No route for {path}")
+        if segments[1:] == ["nearest"]:
+            return self.nearest(params)
+        if segments[1:] == ["search"]:
+            return self.search(pairs)
+
+        record = self.by_id.get(segments[1])
+        if record is None:
+            raise HTTPError(404, f"Unknown branch id '{segments[1]}'")
+        if len(segments) == 2:
+            return record.data
+        if segments[2:] == ["directions"]:
+            return directions_urls(record)
+        raise HTTPError(404, f"No route for {path}")
+
+    @staticmethod
+    def _results(hits, total=None) -> dict:
+        return {
+            "count": len(hits) if total is None else total,
+            "results": [{"miles": round(miles, 3), "branch": record.data} for miles, record in hits],
+        }
+
+    def nearest(self, params) -> dict:
+        lat = _float(params, "lat")
+        lon = _float(params, "lon")
+        radius = _radius(params)
+        k = _int(params, "k", DEFAULT_K)
+        criteria = {"trades": params["trade"]} if "trade" in params else {}
+        return self._results(self.index.search(criteria, near=(lat, lon), radius_miles=radius, k=k))
+
+    def search(self, pairs) -> dict:
+        params = dict(pairs)
+        criteria: Dict[str, List[str]] = {}
+        for name, value in pairs:
+            if name in ("lat", "lon", "radius", "k"):
+                continue
+            if name not in self.index.fields:
+                raise HTTPError(400, f"Cannot filter on '{name}'. "
+                                     f"Filterable fields: {', '.join(self.index.fields)}")
+            criteria.setdefault(name, []).append(value)
+
+        k = _int(params, "k", DEFAULT_K) if "k" in params else None
+        near = None
+        if "lat" in params or "lon" in params:
+            near = (_float(params, "lat"), _float(params, "lon"))
+        radius = _radius(params)
+        if near is None and radius is not None:
+            raise HTTPError(400, "'radius' requires 'lat' and 'lon'")
+
+        if near is not None:
+            if radius is None and k is None:
+                k = DEFAULT_K
+            return self._results(self.index.search(criteria, near=near, radius_miles=radius, k=k))
+        # Without a location, report the total but return at most k (MAX_K) matches
+        hits = self.index.search(criteria)
+        return self._results(hits[:k or MAX_K], total=len(hits))
+
+
+class HTTPServer:
+    """Minimal HTTP/1.1 front end (GET/HEAD, keep-alive) for a QueryService."""
+
+    def __init__(self, service: QueryService):
+        self.service = service
+        self.requests = 0
+        self.not_modified = 0
+
+    @staticmethod
+    async def _readline(reader, status: int, message: str) -> bytes:
+        """One line of at most MAX_REQUEST_LINE bytes; longer lines raise HTTPError(status)."""
+        try:
+            line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):  # longer than the stream's buffer limit
+            raise HTTPError(status, message)
+        if len(line) > MAX_REQUEST_LINE:
+            raise HTTPError(status, message)
+        return line
+
+    async def _read_request(self, reader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        line = await self._readline(reader, 400, "Request line too long")
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for _ in range(MAX_HEADERS + 1):
+            header = await self._readline(reader, 431, "Header line too long")
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(400, "Too many headers")
+        return method, target, version, headers
+
+    def _write(self, writer, status, headers, body=b""):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        head += [f"{name}: {value}" for name, value in headers]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    def respond(self, writer, method, headers, response: Response, keep_alive: bool):
+        coding = choose_coding(headers.get("accept-encoding", ""), response.encoded)
+        body = response.encoded[coding] if coding else response.body
+        out = [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("ETag", response.variant_etag(coding)),
+            ("Vary", "Accept-Encoding"),
+            ("Cache-Control", "no-cache"),
+            ("Connection", "keep-alive" if keep_alive else "close"),
+        ]
+        if coding:
+            out.append(("Content-Encoding", coding))
+
+        if "if-none-match" in headers and response.status == 200 \
+                and response.matches(headers["if-none-match"]):
+            self.not_modified += 1
+            self._write(writer, 304, [h for h in out if h[0] not in ("Content-Type", "Content-Encoding")])
+            return
+
+        out.append(("Content-Length", str(len(body))))
+        self._write(writer, response.status, out, b"" if method == "HEAD" else body)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    self.respond(writer, "GET", {}, Response.json(e.status, {"error": str(e)}), False)
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                self.requests += 1
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                if method not in ("GET", "HEAD"):
+                    response = Response.json(405, {"error": f"Method {method} not allowed"})
+                else:
+                    try:
+                        response = self.service.handle(target)
+                    except Exception as e:  # keep serving other requests
+                        response = Response.json(500, {"error": f"{type(e).__name__}: {e}"})
+
+                self.respond(writer, method, headers, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving {len(self.service.index)} branches on {addresses}", file=sys.stderr)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):  # e.g. Windows event loops
+                pass
+        async with server:
+            await stop.wait()
+
+
+def main():
+    """Load the directory and serve queries until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve branch queries over HTTP.")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Hot responses kept in memory (default: %(default)s)")
+    args = parser.parse_args()
+
+    store = BranchStore.load(args.root)
+    server = HTTPServer(QueryService(store, cache_size=args.cache_size))
+    if brotli is None:
+        print("brotli not installed; serving gzip only", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    cache = server.service.cache
+    print(f"\n{server.requests} requests, {server.not_modified} not modified, "
+          f"cache {cache.hits} hits / {cache.misses} misses", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,12 +12,13 @@ Based on manual verification using:
 - Business listings
 """
 
-import json
-import os
+import argparse
 import sys
-from pathlib import Path
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+from patch_engine import ALREADY_APPLIED, APPLIED, FAILED, Patch, PatchError, PatchSet
+
 
 # Constants
 DATE_FORMAT = "%Y-%m-%d"
@@ -230,82 +231,54 @@ COORDINATE_REFINEMENTS = [
 ]
 
 
-def find_and_update_branch(file_path, branch_name, address1, old_lat, old_lon, 
-                           new_lat, new_lon, geo_precision, geo_source, reason):
-    """
-    Find a branch by name and address, then update its coordinates.
-    
-    Returns True if update was successful, False otherwise.
-    """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"  ❌ Error reading file: {e}")
-        return False
-    
-    branches = data.get("branches", [])
-    updated = False
-    
-    for branch in branches:
-        # Match by name and address
-        if (branch.get("name") == branch_name and 
-            branch.get("address1") == address1):
-            
-            # Verify current coordinates match expected values (with tolerance)
-            current_lat = branch.get("lat")
-            current_lon = branch.get("lon")
-            
-            if (abs(current_lat - old_lat) < COORDINATE_MATCH_TOLERANCE and 
-                abs(current_lon - old_lon) < COORDINATE_MATCH_TOLERANCE):
-                
-                # Update coordinates
-                branch["lat"] = new_lat
-                branch["lon"] = new_lon
-                branch["geoPrecision"] = geo_precision
-                branch["geoSource"] = geo_source
-                branch["geoVerifiedDate"] = datetime.now().strftime(DATE_FORMAT)
-                
-                # Add update note
-                current_notes = branch.get("notes", "")
-                update_note = f" [Coordinate refinement {datetime.now().strftime(DATE_FORMAT)}: {reason}]"
-                if update_note not in current_notes:
-                    branch["notes"] = (current_notes + update_note).strip()
-                
-                updated = True
-                
-                print(f"  ✅ Updated: {branch_name}")
-                print(f"     Old coords: ({old_lat}, {old_lon})")
-                print(f"     New coords: ({new_lat}, {new_lon})")
-                print(f"     Precision: {geo_precision}")
-                print(f"     Reason: {reason}")
-                
-                break
-            else:
-                print(f"  ⚠️  Warning: Coordinates don't match for {branch_name}")
-                print(f"     Expected: ({old_lat}, {old_lon})")
-                print(f"     Found: ({current_lat}, {current_lon})")
-                return False
-    
-    if not updated:
-        print(f"  ❌ Branch not found: {branch_name}")
-        return False
-    
-    # Write updated data back to file
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-            f.write('\n')  # Add newline at end of file
-        return True
-    except Exception as e:
-        print(f"  ❌ Error writing file: {e}")
-        return False
+def build_patch(refinement, store_root, today):
+    """Turn a COORDINATE_REFINEMENTS entry into a Patch."""
+    return Patch(
+        file=(REPO_ROOT / refinement["file"]).relative_to(store_root).as_posix(),
+        match={"name": refinement["branch_name"], "address1": refinement["address1"]},
+        expect={"lat": refinement["old_lat"], "lon": refinement["old_lon"]},
+        tolerance=COORDINATE_MATCH_TOLERANCE,
+        update={
+            "lat": refinement["new_lat"],
+            "lon": refinement["new_lon"],
+            "geoPrecision": refinement["geoPrecision"],
+            "geoSource": refinement["geoSource"],
+        },
+        stamp={"geoVerifiedDate": today},
+        note=f"[Coordinate refinement {today}: {refinement['reason']}]",
+        label=refinement["branch_name"],
+    )
+
+
+def print_outcome(outcome):
+    """Print the per-refinement result line(s)."""
+    patch = outcome.patch
+    before = outcome.before
+
+    if outcome.status == APPLIED:
+        print(f"  ✅ Updated: {patch.label}")
+        print(f"     Old coords: ({before.get('lat')}, {before.get('lon')})")
+        print(f"     New coords: ({patch.update['lat']}, {patch.update['lon']})")
+        print(f"     Precision: {patch.update['geoPrecision']}")
+    elif outcome.status == ALREADY_APPLIED:
+        print(f"  ⏭️  Already applied: {patch.label}")
+    elif before:
+        print(f"  ⚠️  Warning: Coordinates don't match for {patch.label}")
+        print(f"     Expected: ({patch.expect['lat']}, {patch.expect['lon']})")
+        print(f"     Found: ({before.get('lat')}, {before.get('lon')})")
+    else:
+        print(f"  ❌ {outcome.message}: {patch.label}")
 
 
 def main():
     """Main refinement function."""
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    parser = argparse.ArgumentParser(description="Apply verified arrival-point coordinate refinements.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Check every refinement without writing any file")
+    args = parser.parse_args()
+
+    store = BranchStore.load(REPO_ROOT / "supply-house-directory")
+    today = datetime.now().strftime(DATE_FORMAT)
     
     print("=" * 80)
     print("Supply House Coordinate Refinement - Arrival Point Accuracy")
@@ -315,62 +288,53 @@ def main():
     print(f"Total refinements to apply: {len(COORDINATE_REFINEMENTS)}")
     print()
     
-    successful_updates = 0
-    failed_updates = 0
+    patch_set = PatchSet([build_patch(r, store.root, today) for r in COORDINATE_REFINEMENTS])
+    
+    try:
+        result = patch_set.apply(store, dry_run=args.dry_run)
+    except PatchError as e:
+        print(f"❌ {e}")
+        print("No files were changed.")
+        return 1
     
-    for i, refinement in enumerate(COORDINATE_REFINEMENTS, 1):
-        print(f"{i}. Processing: {refinement['branch_name']}")
-        
-        file_path = repo_root / refinement["file"]
-        
-        if not file_path.exists():
-            print(f"  ❌ File not found: {file_path}")
-            failed_updates += 1
-            continue
-        
-        success = find_and_update_branch(
-            file_path=str(file_path),
-            branch_name=refinement["branch_name"],
-            address1=refinement["address1"],
-            old_lat=refinement["old_lat"],
-            old_lon=refinement["old_lon"],
-            new_lat=refinement["new_lat"],
-            new_lon=refinement["new_lon"],
-            geo_precision=refinement["geoPrecision"],
-            geo_source=refinement["geoSource"],
-            reason=refinement["reason"]
-        )
-        
-        if success:
-            successful_updates += 1
-        else:
-            failed_updates += 1
-        
+    for i, outcome in enumerate(result.outcomes, 1):
+        print(f"{i}. Processing: {outcome.patch.label}")
+        print_outcome(outcome)
         print()
     
+    applied = result.count(APPLIED)
+    failed = result.count(FAILED)
+    
     # Summary
     print("=" * 80)
     print("Refinement Summary")
     print("=" * 80)
     print(f"Total refinements:      {len(COORDINATE_REFINEMENTS)}")
-    print(f"Successful updates:     {successful_updates}")
-    print(f"Failed updates:         {failed_updates}")
+    print(f"Applied:                {applied}")
+    print(f"Already applied:        {result.count(ALREADY_APPLIED)}")
+    print(f"Failed:                 {failed}")
+    print(f"Files written:          {len(result.written)}")
     print()
     
-    if successful_updates > 0:
-        print(f"✅ {successful_updates} branch(es) updated with precise entrance coordinates")
+    if failed > 0:
+        print(f"⚠️  {failed} refinement(s) failed their preconditions - no files were written")
+        print("   Fix or remove the failing entries and re-run; refinements apply all-or-nothing")
+        return 1
+    
+    if applied > 0 and args.dry_run:
+        print(f"✅ {applied} refinement(s) would be applied (dry run, nothing written)")
+    elif applied > 0:
+        print(f"✅ {applied} branch(es) updated with precise entrance coordinates")
         print()
         print("Changes made:")
         print("  • Coordinates moved from road/parkway to actual building entrance")
         print("  • geoPrecision updated to reflect actual arrival point type")
         print("  • geoSource updated with verification method")
         print("  • geoVerifiedDate updated to current date")
+        for rel_path in result.written:
+            print(f"  • Wrote {rel_path}")
         print()
     
-    if failed_updates > 0:
-        print(f"⚠️  {failed_updates} update(s) failed - manual intervention may be needed")
-        return 1
-    
     return 0
 
 
@@ -13,13 +13,15 @@ Strategy:
 4. Preserve manual adjustments (don't override existing different coordinates)
 """
 
-import json
 import math
 import os
 import sys
-from pathlib import Path
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+from build_indexes import refresh_indexes
+from keyword_matcher import keyword_categories
+
 # Constants
 MIGRATION_DATE = datetime.now().strftime("%Y-%m-%d")
 MIN_COORD_DIFFERENCE = 0.0001  # ~11 meters
@@ -58,29 +60,30 @@ def needs_refinement(branch):
     if distance >= MIN_COORD_DIFFERENCE:
         return False, "Already has custom arrival coordinates", 0
     
-    # Check risk factors
-    address1 = branch.get("address1", "").lower()
+    # Check risk factors (keyword categories from keyword_matcher.KEYWORDS)
     geo_precision = branch.get("geoPrecision", "")
-    notes = branch.get("notes", "").lower()
+    address_hits = keyword_categories(branch.get("address1", ""))
+    site_hits = address_hits | keyword_categories(branch.get("notes", ""))
+    multi_tenant = bool(address_hits & {"suite", "unit", "unit_number"})
     
     # High priority: Industrial parks with suite numbers
-    if ("suite" in address1 or "unit" in address1 or "#" in address1):
-        if any(kw in address1 or kw in notes for kw in ["industrial", "park", "warehouse"]):
+    if multi_tenant:
+        if "industrial" in site_hits:
             return True, "Multi-tenant industrial complex", MEDIUM_OFFSET
     
     # High priority: Parkway/Boulevard addresses
-    if any(kw in address1 for kw in ["parkway", "boulevard", "freeway"]):
-        if "suite" in address1 or "unit" in address1:
+    if "major_road" in address_hits:
+        if address_hits & {"suite", "unit"}:
             return True, "Multi-tenant on parkway/boulevard", MEDIUM_OFFSET
         else:
             return True, "Parkway/Boulevard address", SMALL_OFFSET
     
     # Medium priority: Multi-tenant complexes
-    if "suite" in address1 or "unit" in address1 or "#" in address1:
+    if multi_tenant:
         return True, "Multi-tenant complex", SMALL_OFFSET
     
     # Medium priority: Industrial/warehouse without suite
-    if any(kw in address1 or kw in notes for kw in ["industrial", "park", "warehouse", "distribution"]):
+    if site_hits & {"industrial", "distribution"}:
         if geo_precision == "warehouse":
             return True, "Warehouse location", MEDIUM_OFFSET
         else:
@@ -115,20 +118,13 @@ def refine_arrival_coordinates(branch, offset_magnitude):
     return arrival_lat, arrival_lon
 
 
-def refine_file(file_path):
+def refine_file(branch_file):
     """
-    Refine arrival coordinates in a single file.
+    Refine arrival coordinates in a loaded branch file.
     
     Returns: (total_branches, refined_count, skipped_count, details)
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"  ❌ Error reading file: {e}")
-        return 0, 0, 0, []
-    
-    branches = data.get("branches", [])
+    branches = branch_file.branches
     if not branches:
         return 0, 0, 0, []
     
@@ -169,44 +165,19 @@ def refine_file(file_path):
     
     # Write updated data back
     if refined > 0:
+        branch_file.mark_modified()
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write('\n')
-        except Exception as e:
+            branch_file.save()
+        except OSError as e:
             print(f"  ❌ Error writing file: {e}")
             return 0, 0, 0, []
     
     return total, refined, skipped, details
 
 
-def find_branch_files(base_dir):
-    """Find all JSON files containing branch data."""
-    branch_files = []
-    
-    for root, dirs, files in os.walk(base_dir):
-        if '_meta' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.json') and not file.startswith('_'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if "branches" in data:
-                            branch_files.append(file_path)
-                except:
-                    pass
-    
-    return sorted(branch_files)
-
-
 def main():
     """Main refinement function."""
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    repo_root = REPO_ROOT
     supply_dir = repo_root / "supply-house-directory"
     
     if not supply_dir.exists():
@@ -223,8 +194,9 @@ def main():
     print("might terminate at road centerlines instead of customer entrances.")
     print()
     
-    # Find all branch files
-    branch_files = find_branch_files(supply_dir)
+    # Load all branch files
+    store = BranchStore.load(supply_dir)
+    branch_files = store.files
     
     if not branch_files:
         print("No branch files found!", file=sys.stderr)
@@ -238,13 +210,15 @@ def main():
     total_refined = 0
     total_skipped = 0
     all_details = []
+    refined_files = []
     
-    for file_path in branch_files:
-        rel_path = os.path.relpath(file_path, repo_root)
+    for branch_file in branch_files:
+        rel_path = os.path.relpath(branch_file.path, repo_root)
         
-        total, refined, skipped, details = refine_file(file_path)
+        total, refined, skipped, details = refine_file(branch_file)
         
         if refined > 0:
+            refined_files.append(branch_file)
             print(f"✅ {rel_path}")
             print(f"   Refined: {refined}/{total} branches")
             
@@ -253,6 +227,8 @@ def main():
             total_skipped += skipped
             all_details.extend([{**d, "file": rel_path} for d in details])
     
+    # Keep the index hashes and bounding boxes in step with the new data
+    refresh_indexes(refined_files)
     print()
     
     # Summary
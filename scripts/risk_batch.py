@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Batch road-snap risk scoring over the whole dataset.
+
+identify_road_snapped_coords.calculate_risk_score works one branch at a
+time: it lowercases strings, re-runs every keyword scan, parses the
+verification date and builds reason strings for each call. For dataset-wide
+reports, benchmarks and the query service only the score and which factors
+fired are needed, so this module splits the work in two:
+
+1. RiskFeatures.from_branches extracts one column per input, once:
+   coordinate arrays (NaN when missing) and precomputed feature columns
+   (industrial keyword hit, driveway keyword, suite, precision enum,
+   vague source, verification age in days);
+2. score_features turns the columns into an int score and a reason bitmask
+   per branch in one vectorized pass with NumPy.
+
+Scores are identical to calculate_risk_score (for the same "now"); reasons
+are bit flags (see REASON_BITS) rather than sentences. Columns are built
+once per dataset, so re-scoring (after a threshold change, or for each
+report) costs only step 2. NumPy is optional: without it score_features
+runs the same arithmetic as a plain loop over the columns.
+
+The coordinate precision and round-number checks from
+detect_road_centerline_coords are vectorized the same way
+(decimal_places, round_number_mask).
+
+Usage:
+    features = RiskFeatures.from_branches(branches)
+    scores, masks = score_features(features)
+
+    python3 scripts/risk_batch.py --top 20
+    python3 scripts/risk_batch.py --check    # compare with calculate_risk_score
+"""
+
+import argparse
+import math
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence
+
+from branch_store import BranchStore
+from detect_road_centerline_coords import COORDINATE_SCALE_FACTOR
+from identify_road_snapped_coords import (
+    DRIVEWAY_CATEGORIES,
+    INDUSTRIAL_CATEGORIES,
+    MIN_COORD_DIFFERENCE,
+    MULTI_TENANT_CATEGORIES,
+    VAGUE_SOURCE_CATEGORIES,
+    calculate_risk_score,
+    categorize_risk,
+)
+from keyword_matcher import keyword_categories
+
+try:
+    import numpy as np
+except ImportError:  # optional: score_features falls back to a Python loop
+    np = None
+
+
+# Reason bit flags, in the order calculate_risk_score checks them
+MISSING_ARRIVAL = 1 << 0
+IDENTICAL_ARRIVAL = 1 << 1
+INDUSTRIAL = 1 << 2
+DRIVEWAY = 1 << 3
+MULTI_TENANT = 1 << 4
+GENERIC_ENTRANCE = 1 << 5
+CENTROID = 1 << 6
+VAGUE_SOURCE = 1 << 7
+VERIFIED_OVER_YEAR = 1 << 8
+VERIFIED_OVER_6_MONTHS = 1 << 9
+
+REASON_BITS = {
+    MISSING_ARRIVAL: "missing arrival coordinates",
+    IDENTICAL_ARRIVAL: "arrival identical to display coordinates",
+    INDUSTRIAL: "industrial/warehouse location",
+    DRIVEWAY: "long driveway potential",
+    MULTI_TENANT: "multi-tenant complex",
+    GENERIC_ENTRANCE: "generic geoPrecision 'entrance'",
+    CENTROID: "geoPrecision 'centroid'",
+    VAGUE_SOURCE: "non-specific geoSource",
+    VERIFIED_OVER_YEAR: "verified over a year ago",
+    VERIFIED_OVER_6_MONTHS: "verified over 6 months ago",
+}
+
+# geoPrecision column values
+PRECISION_OTHER = 0
+PRECISION_ENTRANCE = 1
+PRECISION_CENTROID = 2
+
+# Decimal places checked by detect_road_centerline_coords.check_coordinate_precision
+MAX_DECIMALS = 10
+
+
+@dataclass
+class RiskFeatures:
+    """Column-oriented inputs to the risk score, one entry per branch."""
+
+    lat: Sequence[float]
+    lon: Sequence[float]
+    arrival_lat: Sequence[float]
+    arrival_lon: Sequence[float]
+    industrial: Sequence[bool]
+    driveway: Sequence[bool]
+    suite: Sequence[bool]
+    precision: Sequence[int]
+    vague_source: Sequence[bool]
+    age_days: Sequence[float]
+
+    def __len__(self):
+        return len(self.lat)
+
+    @classmethod
+    def from_branches(cls, branches: Iterable[dict], now: Optional[datetime] = None) -> "RiskFeatures":
+        """Extract feature columns (NumPy arrays when available, else lists)."""
+        now = now or datetime.now()
+        columns = {name: [] for name in cls.__dataclass_fields__}
+        for branch in branches:
+            address_hits = keyword_categories(branch.get("address1"))
+            notes_hits = keyword_categories(branch.get("notes"))
+            geo_precision = branch.get("geoPrecision", "")
+
+            for name, key in (("lat", "lat"), ("lon", "lon"),
+                              ("arrival_lat", "arrivalLat"), ("arrival_lon", "arrivalLon")):
+                value = branch.get(key)
+                columns[name].append(math.nan if value is None else float(value))
+
+            columns["industrial"].append(bool((address_hits | notes_hits) & INDUSTRIAL_CATEGORIES))
+            columns["driveway"].append(bool(address_hits & DRIVEWAY_CATEGORIES))
+            columns["suite"].append(bool(address_hits & MULTI_TENANT_CATEGORIES))
+            columns["precision"].append(PRECISION_ENTRANCE if geo_precision == "entrance"
+                                        else PRECISION_CENTROID if geo_precision == "centroid"
+                                        else PRECISION_OTHER)
+            columns["vague_source"].append(bool(keyword_categories(branch.get("geoSource"))
+                                                & VAGUE_SOURCE_CATEGORIES))
+            columns["age_days"].append(_age_days(branch.get("geoVerifiedDate", ""), now))
+
+        if np is not None:
+            dtypes = {"industrial": bool, "driveway": bool, "suite": bool,
+                      "vague_source": bool, "precision": np.int8}
+            return cls(**{name: np.asarray(values, dtype=dtypes.get(name, np.float64))
+                          for name, values in columns.items()})
+        return cls(**columns)
+
+
+def _age_days(value, now: datetime) -> float:
+    if not value:
+        return math.nan
+    try:
+        return float((now - datetime.strptime(value, "%Y-%m-%d")).days)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def score_features(features: RiskFeatures):
+    """Return (scores, reason masks) for every branch in `features`."""
+    if np is None:
+        return _score_loop(features)
+
+    lat, lon = features.lat, features.lon
+    arrival_lat, arrival_lon = features.arrival_lat, features.arrival_lon
+    age = features.age_days
+
+    missing = np.isnan(arrival_lat) | np.isnan(arrival_lon)
+    # NaN display coordinates compare False, as calculate_risk_score skips them
+    with np.errstate(invalid="ignore"):
+        distance = np.sqrt((arrival_lat - lat) ** 2 + (arrival_lon - lon) ** 2)
+        identical = ~missing & (distance < MIN_COORD_DIFFERENCE)
+        over_year = age > 365
+        over_half_year = ~over_year & (age > 180)
+    entrance = features.precision == PRECISION_ENTRANCE
+    centroid = features.precision == PRECISION_CENTROID
+
+    factors = (
+        (missing, 30, MISSING_ARRIVAL),
+        (identical, 25, IDENTICAL_ARRIVAL),
+        (features.industrial, 20, INDUSTRIAL),
+        (features.driveway, 15, DRIVEWAY),
+        (features.suite, 10, MULTI_TENANT),
+        (entrance, 25, GENERIC_ENTRANCE),
+        (centroid, 40, CENTROID),
+        (features.vague_source, 15, VAGUE_SOURCE),
+        (over_year, 15, VERIFIED_OVER_YEAR),
+        (over_half_year, 10, VERIFIED_OVER_6_MONTHS),
+    )
+    scores = np.zeros(len(features), dtype=np.int32)
+    masks = np.zeros(len(features), dtype=np.int32)
+    for hit, points, bit in factors:
+        scores += hit * points
+        masks |= hit * bit
+    return scores, masks
+
+
+def _score_loop(features: RiskFeatures):
+    scores, masks = [], []
+    for i in range(len(features)):
+        score = mask = 0
+        arrival_lat, arrival_lon = features.arrival_lat[i], features.arrival_lon[i]
+        if math.isnan(arrival_lat) or math.isnan(arrival_lon):
+            score, mask = 30, MISSING_ARRIVAL
+        elif not (math.isnan(features.lat[i]) or math.isnan(features.lon[i])):
+            distance = math.sqrt((arrival_lat - features.lat[i]) ** 2 + (arrival_lon - features.lon[i]) ** 2)
+            if distance < MIN_COORD_DIFFERENCE:
+                score, mask = 25, IDENTICAL_ARRIVAL
+        if features.industrial[i]:
+            score, mask = score + 20, mask | INDUSTRIAL
+        if features.driveway[i]:
+            score, mask = score + 15, mask | DRIVEWAY
+        if features.suite[i]:
+            score, mask = score + 10, mask | MULTI_TENANT
+        if features.precision[i] == PRECISION_ENTRANCE:
+            score, mask = score + 25, mask | GENERIC_ENTRANCE
+        elif features.precision[i] == PRECISION_CENTROID:
+            score, mask = score + 40, mask | CENTROID
+        if features.vague_source[i]:
+            score, mask = score + 15, mask | VAGUE_SOURCE
+        age = features.age_days[i]
+        if age > 365:
+            score, mask = score + 15, mask | VERIFIED_OVER_YEAR
+        elif age > 180:
+            score, mask = score + 10, mask | VERIFIED_OVER_6_MONTHS
+        scores.append(score)
+        masks.append(mask)
+    return scores, masks
+
+
+def reason_names(mask: int) -> List[str]:
+    """Human-readable names of the bits set in a reason mask."""
+    return [name for bit, name in REASON_BITS.items() if mask & bit]
+
+
+def decimal_places(values):
+    """
+    Decimal places of each coordinate as printed with 10 digits, trailing
+    zeros stripped (detect_road_centerline_coords.check_coordinate_precision).
+    """
+    if np is None:
+        return [len(f"{v:.10f}".rstrip("0").split(".")[-1]) for v in values]
+    scaled = np.rint(np.abs(np.asarray(values, dtype=np.float64)) * 10 ** MAX_DECIMALS).astype(np.int64)
+    trailing = np.zeros(scaled.shape, dtype=np.int64)
+    for power in range(1, MAX_DECIMALS + 1):
+        trailing += (scaled % 10 ** power) == 0
+    return MAX_DECIMALS - trailing
+
+
+def round_number_mask(values):
+    """True where the 5th-6th decimal digits are 00, 10, ..., 90 (check_round_numbers)."""
+    if np is None:
+        return [int((abs(v) * COORDINATE_SCALE_FACTOR) % 100) % 10 == 0 for v in values]
+    last_digits = np.floor(np.mod(np.abs(np.asarray(values, dtype=np.float64)) * COORDINATE_SCALE_FACTOR, 100))
+    return last_digits % 10 == 0
+
+
+def main():
+    """Score every branch in one batch and print the riskiest."""
+    parser = argparse.ArgumentParser(description="Batch road-snap risk scoring.")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--top", type=int, default=20, help="Branches to list (default: %(default)s)")
+    parser.add_argument("--check", action="store_true",
+                        help="Verify scores against calculate_risk_score")
+    args = parser.parse_args()
+
+    branches = [record.data for record in BranchStore.load(args.root).branches()]
+    now = datetime.now()
+    scores, masks = score_features(RiskFeatures.from_branches(branches, now=now))
+
+    if args.check:
+        mismatches = [i for i, branch in enumerate(branches)
+                      if calculate_risk_score(branch)[0] != int(scores[i])]
+        if mismatches:
+            print(f"❌ {len(mismatches)} of {len(branches)} scores differ from calculate_risk_score")
+            for i in mismatches[:10]:
+                print(f"   {branches[i].get('id')}: {int(scores[i])} vs {calculate_risk_score(branches[i])[0]}")
+            return 1
+        print(f"✅ {len(branches)} scores match calculate_risk_score"
+              f" ({'numpy' if np is not None else 'pure Python'})")
+        return 0
+
+    order = sorted(range(len(branches)), key=lambda i: (-int(scores[i]), branches[i].get("id", "")))
+    for i in order[:args.top]:
+        branch = branches[i]
+        print(f"{categorize_risk(int(scores[i]))} {int(scores[i]):3d}  {branch.get('name')}  "
+              f"[{branch.get('id')}]  {', '.join(reason_names(int(masks[i])))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
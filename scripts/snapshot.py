@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Compile the whole directory into one columnar binary snapshot.
+
+Loading the tree from JSON means opening every pretty-printed branch file and
+allocating a dict per branch. `compile` writes a single file instead:
+
+- float64 columns for lat, lon, arrivalLat and arrivalLon (NaN when missing)
+- one interned string table shared by every text column
+- uint32 string-id columns for scalar fields (id, name, chain, ...)
+- offsets + uint32 string-id values for list fields (trades, brandsRep, ...),
+  plus a presence byte per branch so a missing list differs from an empty one
+- the minified JSON of every branch, decoded only on demand
+- a header with the format version and a SHA-256 hash of the source data
+
+Snapshot.open() memory-maps the file and exposes the columns as memoryviews
+over the mapping, so opening is O(1) in the number of branches and worker
+processes reading the same snapshot share its pages.
+
+File layout (all integers little-endian):
+
+    header   magic "SFSNAP\\0\\0", u32 version, u32 branch count,
+             u32 section count, u32 reserved, 32-byte content hash
+    table    per section: 32-byte name, u64 offset, u64 length
+    sections each aligned to 8 bytes
+
+Usage:
+    python3 scripts/snapshot.py compile [-o build/supply-house-directory.snap]
+    python3 scripts/snapshot.py info [build/supply-house-directory.snap]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from branch_store import BranchStore, REPO_ROOT
+
+
+MAGIC = b"SFSNAP\0\0"
+FORMAT_VERSION = 1
+
+DEFAULT_OUTPUT = REPO_ROOT / "build" / "supply-house-directory.snap"
+
+HEADER = struct.Struct("<8sIIII32s")
+SECTION = struct.Struct("<32sQQ")
+
+# String id stored for a missing scalar value
+MISSING = 0xFFFFFFFF
+
+FLOAT_COLUMNS = (
+    "lat",
+    "lon",
+    "arrivalLat",
+    "arrivalLon",
+)
+
+STRING_COLUMNS = (
+    "id",
+    "name",
+    "chain",
+    "parentChain",
+    "primaryTrade",
+    "address1",
+    "city",
+    "state",
+    "postalCode",
+    "phone",
+    "geoPrecision",
+    "arrivalType",
+)
+
+LIST_COLUMNS = (
+    "trades",
+    "brandsRep",
+    "manufacturersPartsFor",
+    "partsFor",
+    "tags",
+)
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated or incompatible."""
+    pass
+
+
+def content_hash(store: BranchStore) -> bytes:
+    """SHA-256 over every branch file's path and canonical JSON content."""
+    digest = hashlib.sha256()
+    for branch_file in store.files:
+        digest.update(branch_file.rel_path.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(branch_file.data, sort_keys=True, ensure_ascii=False,
+                                 separators=(",", ":")).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def _u32(values) -> bytes:
+    data = array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _f64(values) -> bytes:
+    data = array("d", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def compile_snapshot(store: BranchStore, output_path) -> Tuple[int, bytes]:
+    """
+    Write a snapshot of every branch record in `store`.
+
+    Records are stored one per file occurrence, in store order, with a "file"
+    column recording their provenance. Returns (branch count, content hash).
+    """
+    records = list(store.branches())
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value) -> int:
+        if value is None:
+            return MISSING
+        value = str(value)
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = len(strings)
+            string_ids[value] = string_id
+            strings.append(value)
+        return string_id
+
+    sections: Dict[str, bytes] = {}
+
+    for field in FLOAT_COLUMNS:
+        sections[f"f64:{field}"] = _f64(
+            float(r.get(field)) if r.get(field) is not None else math.nan for r in records
+        )
+
+    for field in STRING_COLUMNS:
+        sections[f"str:{field}"] = _u32(intern(r.get(field)) for r in records)
+    sections["str:file"] = _u32(intern(r.file.rel_path) for r in records)
+
+    for field in LIST_COLUMNS:
+        offsets = [0]
+        values = []
+        for r in records:
+            items = r.get(field) or []
+            if not isinstance(items, list):
+                items = [items]
+            values.extend(intern(item) for item in items)
+            offsets.append(len(values))
+        sections[f"off:{field}"] = _u32(offsets)
+        sections[f"val:{field}"] = _u32(values)
+        sections[f"has:{field}"] = bytes(field in r.data for r in records)
+
+    # Full branch documents for on-demand decoding
+    doc_offsets = [0]
+    docs = bytearray()
+    for r in records:
+        docs += json.dumps(r.data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        doc_offsets.append(len(docs))
+    sections["off:json"] = _u32(doc_offsets)
+    sections["blob:json"] = bytes(docs)
+
+    # String table goes last so every column above can intern into it
+    string_offsets = [0]
+    blob = bytearray()
+    for value in strings:
+        blob += value.encode("utf-8")
+        string_offsets.append(len(blob))
+    sections["off:strings"] = _u32(string_offsets)
+    sections["blob:strings"] = bytes(blob)
+
+    digest = content_hash(store)
+
+    # Lay out sections after the header and section table, 8-byte aligned
+    position = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for name, payload in sections.items():
+        position += -position % 8
+        table.append((name, position, len(payload)))
+        position += len(payload)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(sections), 0, digest))
+        for name, offset, length in table:
+            f.write(SECTION.pack(name.encode("ascii"), offset, length))
+        for (name, offset, length), payload in zip(table, sections.values()):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(payload)
+
+    os.replace(tmp_path, output_path)
+    return len(records), digest
+
+
+class SnapshotRecord:
+    """
+    Lightweight view of one branch in a snapshot.
+
+    Column fields are read straight from the mapped arrays; any other field
+    decodes the branch's stored JSON on first access.
+    """
+
+    __slots__ = ("_snapshot", "position", "_data")
+
+    def __init__(self, snapshot, position):
+        self._snapshot = snapshot
+        self.position = position
+        self._data = None
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = self._snapshot.branch(self.position)
+        return self._data
+
+    @property
+    def id(self) -> str:
+        return self._snapshot.string_value("id", self.position) or "unknown"
+
+    @property
+    def name(self) -> str:
+        return self._snapshot.string_value("name", self.position) or "unknown"
+
+    @property
+    def file(self) -> str:
+        return self._snapshot.string_value("file", self.position)
+
+    @property
+    def lat(self) -> Optional[float]:
+        return self._snapshot.float_value("lat", self.position)
+
+    @property
+    def lon(self) -> Optional[float]:
+        return self._snapshot.float_value("lon", self.position)
+
+    @property
+    def trades(self) -> List[str]:
+        return self._snapshot.list_value("trades", self.position)
+
+    @property
+    def routing_coords(self) -> Tuple[Optional[float], Optional[float]]:
+        """Navigation destination, falling back to display coordinates."""
+        snapshot, i = self._snapshot, self.position
+        lat = snapshot.float_value("arrivalLat", i)
+        lon = snapshot.float_value("arrivalLon", i)
+        if lat is None:
+            lat = snapshot.float_value("lat", i)
+        if lon is None:
+            lon = snapshot.float_value("lon", i)
+        return lat, lon
+
+    def get(self, key, default=None):
+        snapshot = self._snapshot
+        if key in FLOAT_COLUMNS:
+            value = snapshot.float_value(key, self.position)
+        elif key in STRING_COLUMNS:
+            value = snapshot.string_value(key, self.position)
+        elif key in LIST_COLUMNS:
+            if not snapshot.has_value(key, self.position):
+                return default
+            value = snapshot.list_value(key, self.position)
+        else:
+            return self.data.get(key, default)
+        return default if value is None else value
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a compiled snapshot."""
+
+    def __init__(self, path, buffer, mapping=None):
+        self.path = Path(path)
+        self._mapping = mapping
+        self._buffer = memoryview(buffer)
+        self._views = [self._buffer]
+
+        if len(self._buffer) < HEADER.size:
+            raise SnapshotError(f"{self.path} is too small to be a snapshot")
+
+        magic, version, count, section_count, _, digest = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a snapshot file")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(
+                f"{self.path} has format version {version}; expected {FORMAT_VERSION}"
+            )
+
+        self.version = version
+        self.count = count
+        self.content_hash = digest.hex()
+        self._sections: Dict[str, memoryview] = {}
+
+        for i in range(section_count):
+            raw_name, offset, length = SECTION.unpack_from(self._buffer, HEADER.size + i * SECTION.size)
+            if offset + length > len(self._buffer):
+                raise SnapshotError(f"{self.path} is truncated")
+            section = self._buffer[offset:offset + length]
+            self._views.append(section)
+            self._sections[raw_name.rstrip(b"\0").decode("ascii")] = section
+
+        self._floats = {f: self._column(f"f64:{f}", "d") for f in FLOAT_COLUMNS}
+        self._strings = {f: self._column(f"str:{f}", "I") for f in STRING_COLUMNS + ("file",)}
+        self._lists = {
+            f: (self._column(f"off:{f}", "I"), self._column(f"val:{f}", "I")) for f in LIST_COLUMNS
+        }
+        self._present = {f: self._sections[f"has:{f}"] for f in LIST_COLUMNS}
+        self._string_offsets = self._column("off:strings", "I")
+        self._string_blob = self._sections["blob:strings"]
+        self._json_offsets = self._column("off:json", "I")
+        self._json_blob = self._sections["blob:json"]
+
+    @classmethod
+    def open(cls, path=DEFAULT_OUTPUT):
+        """Memory-map a snapshot file."""
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot open snapshot {path}: {e}") from e
+        return cls(path, mapping, mapping)
+
+    def close(self):
+        """Release the memory mapping; columns handed out become invalid."""
+        self._sections.clear()
+        self._floats = self._strings = self._lists = self._present = {}
+        self._string_offsets = self._string_blob = None
+        self._json_offsets = self._json_blob = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _column(self, name, fmt):
+        section = self._sections[name]
+        if sys.byteorder == "little":
+            view = section.cast(fmt)
+            self._views.append(view)
+            return view
+        # Big-endian hosts cannot view the data in place; fall back to a copy
+        data = array(fmt, bytes(section))
+        data.byteswap()
+        return data
+
+    @property
+    def section_names(self) -> List[str]:
+        return list(self._sections)
+
+    def float_column(self, field):
+        """The float64 column for lat, lon, arrivalLat or arrivalLon."""
+        return self._floats[field]
+
+    def float_value(self, field, position) -> Optional[float]:
+        value = self._floats[field][position]
+        return None if math.isnan(value) else value
+
+    def string(self, string_id) -> Optional[str]:
+        """Look up an entry in the interned string table."""
+        if string_id == MISSING:
+            return None
+        start = self._string_offsets[string_id]
+        end = self._string_offsets[string_id + 1]
+        return str(self._string_blob[start:end], "utf-8")
+
+    def string_value(self, field, position) -> Optional[str]:
+        return self.string(self._strings[field][position])
+
+    def has_value(self, field, position) -> bool:
+        """Whether the branch at `position` defines the list field at all."""
+        return self._present[field][position] == 1
+
+    def list_value(self, field, position) -> List[str]:
+        offsets, values = self._lists[field]
+        return [self.string(values[i]) for i in range(offsets[position], offsets[position + 1])]
+
+    def branch(self, position) -> dict:
+        """Decode the full branch document at `position`."""
+        start = self._json_offsets[position]
+        end = self._json_offsets[position + 1]
+        return json.loads(str(self._json_blob[start:end], "utf-8"))
+
+    def records(self) -> List[SnapshotRecord]:
+        """
+        Views over every distinct branch, usable with GeoIndex and FilterIndex.
+
+        The snapshot has one row per file occurrence, so a branch listed in
+        both a metro and a trade file appears twice; like
+        FilterIndex.from_store, only the first occurrence of each id is kept.
+        """
+        records = []
+        seen = set()
+        for position in range(self.count):
+            record = SnapshotRecord(self, position)
+            if record.id not in seen:
+                seen.add(record.id)
+                records.append(record)
+        return records
+
+
+def main():
+    """Compile a snapshot or describe an existing one."""
+    parser = argparse.ArgumentParser(description="Compile or inspect a binary directory snapshot.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = subparsers.add_parser("compile", help="Compile the directory into a snapshot")
+    compile_parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="Snapshot path")
+
+    info_parser = subparsers.add_parser("info", help="Describe a compiled snapshot")
+    info_parser.add_argument("path", nargs="?", default=str(DEFAULT_OUTPUT), help="Snapshot path")
+
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        store = BranchStore.load()
+        count, digest = compile_snapshot(store, args.output)
+        size = os.path.getsize(args.output)
+        print(f"✅ Compiled {count} branches from {len(store.files)} files")
+        print(f"   Output:       {args.output} ({size:,} bytes)")
+        print(f"   Content hash: {digest.hex()}")
+        return 0
+
+    try:
+        with Snapshot.open(args.path) as snapshot:
+            print(f"Snapshot:       {snapshot.path}")
+            print(f"Format version: {snapshot.version}")
+            print(f"Branches:       {len(snapshot)}")
+            print(f"Content hash:   {snapshot.content_hash}")
+            print(f"Sections:       {len(snapshot.section_names)}")
+    except SnapshotError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Registry of distinct sources with canonical forms, ids and cached authority.
+
+Branches cite sources as free strings in `sources` and
+`verification.sources`: the same locator page appears as
+"https://www.uri.com/locations/" and "http://uri.com/locations", and
+update_address_verification_status.py re-ran its keyword heuristics on
+every string on every run. The registry keeps one entry per distinct
+source in _meta/sources.json:
+
+    {"id": 12, "source": "https://www.johnstonesupply.com/locations",
+     "key": "https://johnstonesupply.com/locations",
+     "kind": "official_locator", "authoritative": true,
+     "variants": ["https://johnstonesupply.com/locations/"]}
+
+- URLs are canonicalized into `key`: scheme folded to https, host
+  lowercased without "www.", default ports, fragments, tracking
+  parameters (utm_*, gclid, fbclid) and trailing slashes dropped, query
+  parameters sorted. Labels ("LennoxPros store locator") are keyed by
+  their casefolded, whitespace-collapsed text.
+- Each entry is classified once into KINDS; `authoritative` follows from
+  the kind. Ids and kinds persist across runs, so a hand-corrected kind in
+  sources.json sticks and branch references stay stable.
+- At run time, raw strings resolve through a per-string cache, so the
+  authority question for a branch is a dict lookup per source.
+
+Branch files keep citing sources as strings; `ids()` maps them to registry
+ids in memory.
+
+Usage:
+    registry = SourceRegistry.load()
+    registry.authority("https://www.google.com/maps/place/...")  # (True, "Google Business Profile")
+
+    python3 scripts/source_registry.py sync      # register new sources, write sources.json
+    python3 scripts/source_registry.py check     # exit 1 if sources.json is missing sources
+    python3 scripts/source_registry.py show URL_OR_LABEL
+"""
+
+import argparse
+import re
+import sys
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from branch_store import DEFAULT_ROOT, BranchStore, read_json, write_json
+from keyword_matcher import keyword_categories
+
+
+SOURCES_FILE = "_meta/sources.json"
+REGISTRY_VERSION = 1
+
+# Source kinds and the verification label of the authoritative ones
+KINDS = ("google_maps", "official_locator", "official_website",
+         "manufacturer_line_card", "directory", "other")
+AUTHORITY_LABELS = {
+    "google_maps": "Google Business Profile",
+    "official_locator": "Official Store Locator",
+    "official_website": "Official Website",
+}
+
+# Query parameters that never identify a page
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid)$", re.IGNORECASE)
+
+_URL = re.compile(r"^https?://", re.IGNORECASE)
+
+
+def is_url(source: str) -> bool:
+    return bool(_URL.match(source.strip()))
+
+
+def canonical_key(source: str) -> str:
+    """
+    Deduplication key of a source (canonical URL, or normalized label).
+
+    URLs that urllib cannot parse (scraped text such as "https://x.com]" or
+    a bad port) are keyed like labels.
+    """
+    text = " ".join(str(source).split())
+    if not is_url(text):
+        return text.casefold()
+
+    try:
+        parts = urlsplit(text)
+        port = parts.port
+    except ValueError:
+        return text.casefold()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def classify_source(source: str) -> str:
+    """
+    Kind of a source, from keyword_matcher categories.
+
+    Checked in order: Google Maps / Business Profile, store locators, a
+    company site's location or contact pages, manufacturer line cards,
+    directory sites, then any other .com site (a company's own website).
+    """
+    hits = keyword_categories(source)
+    if "google_business" in hits:
+        return "google_maps"
+    if "store_locator" in hits:
+        return "official_locator"
+    if "com_path" in hits and "location_page" in hits:
+        return "official_website"
+    if "line_card" in hits:
+        return "manufacturer_line_card"
+    if "directory_domain" in hits or "non_authoritative_source" in hits:
+        return "directory"
+    if "com_domain" in hits:
+        return "official_website"
+    return "other"
+
+
+@dataclass
+class SourceEntry:
+    id: int
+    source: str
+    key: str
+    kind: str
+    variants: List[str] = field(default_factory=list)
+
+    @property
+    def authoritative(self) -> bool:
+        return self.kind in AUTHORITY_LABELS
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["authoritative"] = self.authoritative
+        if not self.variants:
+            del data["variants"]
+        return data
+
+
+def branch_sources(branch: dict) -> List[str]:
+    """Every source string a branch cites (sources, then verification.sources)."""
+    verification = branch.get("verification") or {}
+    return [str(s) for s in (branch.get("sources") or []) + (verification.get("sources") or [])]
+
+
+class SourceRegistry:
+    """Canonical sources keyed by id and by canonical key, with a raw-string cache."""
+
+    def __init__(self, entries: Iterable[SourceEntry] = (), path: Optional[Path] = None):
+        self.path = path
+        self.entries: Dict[int, SourceEntry] = {}
+        self._by_key: Dict[str, SourceEntry] = {}
+        self._cache: Dict[str, SourceEntry] = {}
+        self.added: List[SourceEntry] = []
+        for entry in entries:
+            self.entries[entry.id] = entry
+            self._by_key[entry.key] = entry
+
+    @classmethod
+    def load(cls, root=None) -> "SourceRegistry":
+        """Read <root>/_meta/sources.json (an empty registry if it does not exist)."""
+        path = (Path(root) if root else DEFAULT_ROOT) / SOURCES_FILE
+        if not path.exists():
+            return cls(path=path)
+        data = read_json(path)
+        entries = []
+        for item in data.get("sources", []):
+            if item.get("kind") not in KINDS:
+                raise ValueError(f"Source {item.get('id')} has unknown kind '{item.get('kind')}'")
+            entries.append(SourceEntry(id=item["id"], source=item["source"], key=item["key"],
+                                       kind=item["kind"], variants=item.get("variants", [])))
+        return cls(entries, path=path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[SourceEntry]:
+        return iter(sorted(self.entries.values(), key=lambda e: e.id))
+
+    def resolve(self, source: str) -> SourceEntry:
+        """Entry for a raw source string, registering (and classifying) it if new."""
+        entry = self._cache.get(source)
+        if entry is not None:
+            return entry
+        key = canonical_key(source)
+        entry = self._by_key.get(key)
+        text = " ".join(str(source).split())
+        if entry is None:
+            entry = SourceEntry(id=max(self.entries, default=0) + 1, source=text, key=key,
+                                kind=classify_source(text))
+            self.entries[entry.id] = entry
+            self._by_key[key] = entry
+            self.added.append(entry)
+        elif text != entry.source and text not in entry.variants:
+            entry.variants.append(text)
+        self._cache[source] = entry
+        return entry
+
+    def ids(self, sources: Iterable[str]) -> Tuple[int, ...]:
+        """Distinct registry ids of a list of source strings, in first-seen order."""
+        seen = []
+        for source in sources:
+            source_id = self.resolve(source).id
+            if source_id not in seen:
+                seen.append(source_id)
+        return tuple(seen)
+
+    def authority(self, source: str) -> Tuple[bool, Optional[str]]:
+        """(authoritative, verification label) for a source string."""
+        entry = self.resolve(source)
+        return entry.authoritative, AUTHORITY_LABELS.get(entry.kind)
+
+    def sync(self, store: BranchStore) -> Counter:
+        """Register every source cited in a store; returns references per kind."""
+        kinds = Counter()
+        for record in store.branches():
+            for source in branch_sources(record.data):
+                kinds[self.resolve(source).kind] += 1
+        return kinds
+
+    def to_dict(self) -> dict:
+        return {"version": REGISTRY_VERSION, "sources": [entry.to_dict() for entry in self]}
+
+    def save(self, path=None):
+        path = Path(path) if path else self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(path, self.to_dict())
+
+
+def main():
+    """Sync, check or query the source registry."""
+    parser = argparse.ArgumentParser(description="Canonical source registry (_meta/sources.json).")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="Register sources cited by branches and write sources.json")
+    sub.add_parser("check", help="Exit 1 if branches cite sources missing from sources.json")
+    show_parser = sub.add_parser("show", help="Canonical form and classification of a source")
+    show_parser.add_argument("source")
+    args = parser.parse_args()
+
+    try:
+        registry = SourceRegistry.load(args.root)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    if args.command == "show":
+        entry = registry.resolve(args.source)
+        status = "new" if entry in registry.added else f"id {entry.id}"
+        print(f"{entry.key}  ({status})")
+        print(f"  kind: {entry.kind}  authoritative: {entry.authoritative}")
+        return 0
+
+    store = BranchStore.load(args.root)
+    kinds = registry.sync(store)
+    references = sum(kinds.values())
+    print(f"{references} source references -> {len(registry)} distinct sources")
+    for kind in KINDS:
+        if kinds[kind]:
+            print(f"  {kind:<24} {kinds[kind]:>5}")
+
+    if args.command == "check":
+        if registry.added:
+            print(f"❌ {len(registry.added)} sources are not registered; run: "
+                  f"python3 scripts/source_registry.py sync")
+            return 1
+        print("✅ All cited sources are registered")
+        return 0
+
+    registry.save()
+    print(f"✅ Wrote {registry.path} ({len(registry.added)} new)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,69 +7,48 @@ minimal parsing, based on insights from the Price-Cal repository supply page.
 
 The standardization removes redundant suffixes like "Electric", "Lighting", 
 "International", "Industries", etc., to create cleaner, more parseable names.
+
+Canonical names and their variant spellings are maintained in the "aliases"
+tables of _meta/brands.json and _meta/manufacturers.json (see
+brand_registry.py); add a new variant there rather than in this script.
+Names that are not registered at all are left unchanged and reported.
 """
 
-import json
-import glob
+import argparse
 import os
-from typing import Dict, List
-
-# Standardization mapping - compound names → simplified names
-# Based on Price-Cal repository insights: simplify to require minimal parsing
-STANDARDIZATION_MAP = {
-    "Mitsubishi Electric": "Mitsubishi",
-    "Acuity Brands": "Acuity",
-    "Schneider Electric": "Schneider",
-    "Lithonia Lighting": "Lithonia",
-    "Cooper Lighting": "Cooper",
-    "Rockwell Automation": "Rockwell",
-    "WaterFurnace International": "WaterFurnace",
-    "Baltimore Aircoil Company": "Baltimore Aircoil",
-    "Mueller Industries": "Mueller",
-    "Anvil International": "Anvil",
-    "Armstrong Fluid Technology": "Armstrong",
-    "Johnson Controls": "Johnson",
-    "Smith Cast Iron Boilers": "Smith",
-    "AO Smith": "A.O. Smith",  # Standardize spacing
-    "Armstrong Air": "Armstrong",  # Consolidate with Armstrong Fluid Technology
-    "Advanced Cooling Technologies": "Advanced Cooling",
-    "Advanced Thermal Hydronics": "Advanced Thermal",
-    "Air Flow Technologies": "Air Flow",
-    "Airedale by Modine": "Airedale",
-    "Alfa Laval": "Alfa",
-    "Climate by Design International": "Climate by Design",
-    "Columbus Industries": "Columbus",
-    "Dynamic Air Quality Solutions": "Dynamic AQ",
-    "RBI Boilers": "RBI",
-    "Roberts Gordon": "Roberts",
-    "Technical Systems Inc": "Technical Systems",
-    "Blender Products": "Blender",
-    "FanAm": "FanAm",
-    "Flexmaster USA": "Flexmaster",
-    "Roof Products and Systems": "Roof Products",
-    "Young Regulator": "Young",
-    "Price Industries": "Price",
-    "RAB Lighting": "RAB",
-    "Paragon Controls": "Paragon"
-}
+
+from brand_registry import BRAND_FIELDS, BrandRegistry
+from branch_store import BranchFile, BranchStore, REPO_ROOT
+from file_pool import add_workers_argument, map_files
+
+# Loaded on first use (once per worker process)
+_registry = None
+
+
+def get_registry() -> BrandRegistry:
+    """Canonical names and aliases from _meta/brands.json and _meta/manufacturers.json."""
+    global _registry
+    if _registry is None:
+        _registry = BrandRegistry.load()
+    return _registry
 
 
 def standardize_name(name: str) -> str:
     """
-    Standardize a manufacturer name if it's in the mapping.
+    Standardize a manufacturer name using the brand registry.
     
     Args:
         name: Original manufacturer name
         
     Returns:
-        Standardized name if mapping exists, otherwise original name
+        Canonical name if the name or an alias is registered, otherwise original name
     """
-    return STANDARDIZATION_MAP.get(name, name)
+    return get_registry().canonical(name)
 
 
 def update_branch_brands(branch: dict) -> tuple[dict, int]:
     """
-    Update brandsRep field in a branch with standardized names.
+    Update brandsRep and manufacturersPartsFor fields in a branch with standardized names.
     
     Args:
         branch: Branch dictionary
@@ -79,79 +58,84 @@ def update_branch_brands(branch: dict) -> tuple[dict, int]:
     """
     changes = 0
     
-    if 'brandsRep' in branch and isinstance(branch['brandsRep'], list):
-        new_brands = []
-        for brand in branch['brandsRep']:
-            standardized = standardize_name(brand)
-            if standardized != brand:
-                changes += 1
-            new_brands.append(standardized)
-        branch['brandsRep'] = new_brands
+    for field in BRAND_FIELDS:
+        if field in branch and isinstance(branch[field], list):
+            new_brands = []
+            for brand in branch[field]:
+                standardized = standardize_name(brand)
+                if standardized != brand:
+                    changes += 1
+                new_brands.append(standardized)
+            branch[field] = new_brands
     
     return branch, changes
 
 
-def process_file(filepath: str) -> tuple[int, int]:
+def process_file(branch_file: BranchFile) -> tuple[int, int, list]:
     """
-    Process a single JSON file and update manufacturer names.
+    Update manufacturer names in a branch file, in a single pass.
+    
+    Marks the file modified if anything changed; writing is left to the caller.
     
     Args:
-        filepath: Path to JSON file
+        branch_file: Branch file from BranchStore.stream() or BranchStore.load()
         
     Returns:
-        Tuple of (branches processed, total changes made)
+        Tuple of (branches processed, total changes made, unregistered names)
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if 'branches' not in data:
-            return 0, 0
-        
-        branches_processed = 0
-        total_changes = 0
-        
-        for branch in data['branches']:
-            branch, changes = update_branch_brands(branch)
-            if changes > 0:
-                branches_processed += 1
-                total_changes += changes
-        
-        # Write back with same formatting
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-            f.write('\n')  # Add trailing newline
-        
-        return branches_processed, total_changes
-        
-    except Exception as e:
-        print(f"Error processing {filepath}: {e}")
-        return 0, 0
+    branches_processed = 0
+    total_changes = 0
+    unknown = set()
+    registry = get_registry()
+    
+    for branch in branch_file.branches:
+        branch, changes = update_branch_brands(branch)
+        if changes > 0:
+            branches_processed += 1
+            total_changes += changes
+        for field in BRAND_FIELDS:
+            for brand in branch.get(field) or []:
+                if registry.lookup(brand, count_unknown=False) is None:
+                    unknown.add(brand)
+    
+    if total_changes > 0:
+        branch_file.mark_modified()
+    
+    return branches_processed, total_changes, sorted(unknown)
 
 
 def main():
     """Main execution function."""
-    print("Standardizing manufacturer names across all branch files...")
-    print(f"Using {len(STANDARDIZATION_MAP)} standardization mappings\n")
+    parser = argparse.ArgumentParser(description="Standardize manufacturer names in branch files.")
+    add_workers_argument(parser)
+    args = parser.parse_args()
     
-    # Find all JSON files in the supply-house-directory
-    pattern = 'supply-house-directory/us/**/*.json'
-    files = glob.glob(pattern, recursive=True)
+    print("Standardizing manufacturer names across all branch files...")
+    registry = get_registry()
+    print(f"Using {len(registry)} canonical brands from _meta/brands.json and _meta/manufacturers.json\n")
     
-    # Exclude meta files
-    files = [f for f in files if '/_meta/' not in f and '/index.json' not in f]
+    # Discover branch files; each is streamed and rewritten in one pass
+    store = BranchStore.stream(rewrite=True)
     
     total_files = 0
     total_branches = 0
     total_changes = 0
+    unknown = {}
     
-    for filepath in sorted(files):
-        branches, changes = process_file(filepath)
+    for result in map_files(process_file, store.files, workers=args.workers):
+        branch_file = result.branch_file
+        if result.error:
+            print(f"Error processing {branch_file.path}: {result.error}")
+            continue
+        
+        branches, changes, unknown_names = result.stats
+        for name in unknown_names:
+            unknown[name] = unknown.get(name, 0) + 1
         if changes > 0:
             total_files += 1
             total_branches += branches
             total_changes += changes
-            rel_path = os.path.relpath(filepath)
+            rel_path = os.path.relpath(branch_file.path, REPO_ROOT)
             print(f"✓ {rel_path}: {branches} branches, {changes} names standardized")
     
     print(f"\n{'='*60}")
@@ -165,6 +149,11 @@ def main():
         print("\nNo changes needed - all manufacturer names already standardized!")
     else:
         print(f"\n✓ Successfully standardized {total_changes} manufacturer names")
+    
+    if unknown:
+        print(f"\n⚠️  {len(unknown)} names are not in the brand registry (add them or an alias to _meta/brands.json):")
+        for name, files in sorted(unknown.items()):
+            print(f"   {name} ({files} files)")
 
 
 if __name__ == '__main__':
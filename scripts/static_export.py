@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, pre-compressed static export of the directory.
+
+The repository stores JSON with indent=2 for readable diffs, which is wasted
+bytes on the wire, and clients that fetch files directly cannot tell which
+shards changed without downloading them. This exporter writes a CDN-ready
+tree:
+
+- every index, branch file, state summary and _meta file is minified;
+- each is written under a content-hashed name next to its logical path
+  (us/co/hvac/denver-metro.json -> us/co/hvac/denver-metro.3f2a9c1b7e4d.json)
+  with .gz and, when the optional `brotli` module is installed, .br
+  siblings, so a server can hand out the precompressed bytes directly;
+- manifest.json maps each logical path to its hashed name, sha256 and sizes.
+
+Hashed files never change, so they can be cached forever; clients refetch
+only manifest.json and the shards whose hash moved. Exports are
+incremental: files whose hashed name already exists are not rewritten, and
+--prune removes hashed files that the previous manifest in the output
+directory listed and the new one no longer does. Nothing else in the
+output directory is ever deleted, and --prune refuses to run in a
+directory without a manifest.
+
+Usage:
+    python3 scripts/static_export.py
+    python3 scripts/static_export.py --output build/static --prune
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import posixpath
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from branch_store import DEFAULT_ROOT, REPO_ROOT, ROOT_INDEX, read_json, write_json_atomic
+from build_indexes import SUMMARY_FILE
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz siblings are written without it
+    brotli = None
+
+
+DEFAULT_OUTPUT = REPO_ROOT / "build" / "static"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Hex digits of the sha256 used in file names
+HASH_LENGTH = 12
+
+# Names this exporter writes (the only files --prune may delete)
+HASHED_FILE = re.compile(r"^.+\.[0-9a-f]{%d}\.json(?:\.gz|\.br)?$" % HASH_LENGTH)
+
+
+def minify(document) -> bytes:
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def hashed_name(logical_path: str, digest: str) -> str:
+    stem, dot, suffix = logical_path.rpartition(".")
+    return f"{stem}.{digest[:HASH_LENGTH]}.{suffix}" if dot else f"{logical_path}.{digest[:HASH_LENGTH]}"
+
+
+def export_paths(root: Path) -> List[str]:
+    """Logical paths of every published JSON file, in hierarchy order."""
+    paths = [ROOT_INDEX]
+
+    def add(rel_path):
+        if rel_path not in paths and (root / rel_path).exists():
+            paths.append(rel_path)
+
+    def add_metros(index):
+        for metro in index.get("metros", []):
+            if metro.get("file"):
+                add(metro["file"])
+
+    country = read_json(root / ROOT_INDEX)
+    for state_entry in country.get("states", []):
+        add(state_entry["index"])
+        state_index = read_json(root / state_entry["index"])
+        add(posixpath.join(posixpath.dirname(state_entry["index"]), SUMMARY_FILE))
+        add_metros(state_index)
+        for trade_entry in state_index.get("trades", {}).values():
+            add(trade_entry["index"])
+            add_metros(read_json(root / trade_entry["index"]))
+
+    meta_dir = root / "_meta"
+    if meta_dir.is_dir():
+        for path in sorted(meta_dir.glob("*.json")):
+            add(path.relative_to(root).as_posix())
+    return paths
+
+
+class StaticExporter:
+    """Writes minified, hashed and precompressed copies plus a manifest."""
+
+    def __init__(self, root=None, output=None):
+        self.root = Path(root) if root else DEFAULT_ROOT
+        self.output = Path(output) if output else DEFAULT_OUTPUT
+        self.written = 0
+        self.reused = 0
+
+    def _write(self, rel_path: str, data: bytes):
+        path = self.output / rel_path
+        if path.exists():
+            self.reused += 1
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self.written += 1
+
+    def export_file(self, logical_path: str) -> dict:
+        source = self.root / logical_path
+        raw_size = source.stat().st_size
+        body = minify(read_json(source))
+        digest = hashlib.sha256(body).hexdigest()
+        name = hashed_name(logical_path, digest)
+
+        entry = {"path": name, "sha256": digest, "sourceBytes": raw_size, "bytes": len(body)}
+        self._write(name, body)
+
+        gz = gzip.compress(body, compresslevel=9, mtime=0)
+        self._write(name + ".gz", gz)
+        entry["gzipBytes"] = len(gz)
+        if brotli is not None:
+            br = brotli.compress(body, quality=11)
+            self._write(name + ".br", br)
+            entry["brotliBytes"] = len(br)
+        return entry
+
+    def export(self) -> dict:
+        files: Dict[str, dict] = {}
+        for logical_path in export_paths(self.root):
+            files[logical_path] = self.export_file(logical_path)
+
+        totals = {key: sum(f.get(key, 0) for f in files.values())
+                  for key in ("sourceBytes", "bytes", "gzipBytes", "brotliBytes")}
+        if brotli is None:
+            del totals["brotliBytes"]
+
+        manifest = {"version": MANIFEST_VERSION, "root": ROOT_INDEX, "totals": totals, "files": files}
+        self.output.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.output / MANIFEST_FILE, manifest)
+        return manifest
+
+    def unsafe_output(self) -> Optional[str]:
+        """Why the output directory must not be written to, or None if it is safe."""
+        output = self.output.resolve()
+        guarded = (("the data directory", self.root.resolve()), ("the repository", REPO_ROOT.resolve()))
+        for name, path in guarded:
+            if output == path or output in path.parents:
+                return f"the output directory contains {name}"
+        if self.root.resolve() in output.parents:
+            return "the output directory is inside the data directory"
+        return None
+
+    def previous_manifest(self) -> Optional[dict]:
+        """The manifest of the last export into the output directory, if any."""
+        path = self.output / MANIFEST_FILE
+        if not path.is_file():
+            return None
+        manifest = read_json(path)
+        return manifest if isinstance(manifest.get("files"), dict) else None
+
+    @staticmethod
+    def _names(manifest: dict) -> set:
+        names = set()
+        for entry in manifest["files"].values():
+            names.update({entry["path"], entry["path"] + ".gz", entry["path"] + ".br"})
+        return names
+
+    def prune(self, manifest: dict, previous: dict) -> List[Path]:
+        """
+        Delete hashed files that `previous` listed and `manifest` does not.
+
+        Only names matching HASHED_FILE that stay inside the output
+        directory are considered, so files this exporter did not write are
+        never touched.
+        """
+        output = self.output.resolve()
+        removed = []
+        for name in sorted(self._names(previous) - self._names(manifest)):
+            if not HASHED_FILE.match(name) or ".." in name.split("/"):
+                continue
+            path = self.output / name
+            if output not in path.resolve().parents or not path.is_file():
+                continue
+            path.unlink()
+            removed.append(path)
+        return removed
+
+
+def main():
+    """Export the directory as a static, content-addressed tree."""
+    parser = argparse.ArgumentParser(description="Export minified, hashed, precompressed JSON.")
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--output", help=f"Output directory (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--prune", action="store_true",
+                        help="Remove hashed files the previous manifest listed and the new one does not")
+    args = parser.parse_args()
+
+    exporter = StaticExporter(args.root, args.output)
+    reason = exporter.unsafe_output()
+    if reason:
+        print(f"❌ Refusing to export to {exporter.output}: {reason}", file=sys.stderr)
+        return 1
+
+    previous = exporter.previous_manifest()
+    if args.prune and previous is None:
+        print(f"❌ Refusing to prune {exporter.output}: it has no {MANIFEST_FILE} from an earlier export",
+              file=sys.stderr)
+        return 1
+
+    manifest = exporter.export()
+    totals = manifest["totals"]
+
+    print(f"Exported {len(manifest['files'])} files to {exporter.output}")
+    print(f"  written: {exporter.written}  unchanged: {exporter.reused}")
+    print(f"  source (indent=2): {totals['sourceBytes']:>12,} bytes")
+    print(f"  minified:          {totals['bytes']:>12,} bytes")
+    print(f"  gzip:              {totals['gzipBytes']:>12,} bytes")
+    if "brotliBytes" in totals:
+        print(f"  brotli:            {totals['brotliBytes']:>12,} bytes")
+    else:
+        print("  brotli:            not installed, .br siblings skipped")
+
+    if args.prune:
+        removed = exporter.prune(manifest, previous)
+        print(f"  pruned: {len(removed)} stale files")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
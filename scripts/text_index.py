@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Typeahead search over branch names, chains, cities and brands.
+
+Technicians type "john" or "ferg aur" and expect matches as they type.
+Scanning every branch's strings per keystroke does not scale, so TextIndex
+precomputes:
+
+- a vocabulary of words per field group (name/operatingName, chain/
+  parentChain, city, brandsRep), kept sorted so that every word starting
+  with a prefix is one bisect range;
+- a posting bitmap per (group, word), using the same document numbering and
+  Python-int bitmaps as FilterIndex, so a query is a handful of OR/AND
+  operations and combines directly with trade/brand filters and GeoIndex;
+- trigram postings over the vocabulary, used only when a query word
+  matches no prefix (typos such as "fergusen"): candidate words sharing
+  trigrams are checked with a bounded edit distance against the typed
+  length.
+
+Every query word must match (as a prefix, or within MAX_EDITS); words may
+match in different fields ("ferg aur" = chain Ferguson, city Aurora).
+Matches where all words hit the same group are ranked first (name, then
+chain, city, brands), then up to RERANK_CANDIDATES of them are re-ranked by
+edit cost, whole-word hits and, for proximity searches, distance.
+
+Prefix bitmaps of short prefixes are cached (PREFIX_CACHE_SIZE), since
+those are both the most common keystrokes and the widest ORs.
+
+Usage:
+    index = TextIndex.from_store(BranchStore.load())
+    index.search("ferg aur", criteria={"trades": "Plumbing"}, near=(39.7, -104.9), k=10)
+
+    python3 scripts/text_index.py "ferg aur"
+    python3 scripts/text_index.py "johnst" --where trades=HVAC --lat 39.7392 --lon -104.9903
+"""
+
+import argparse
+import heapq
+import re
+import sys
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from branch_store import BranchStore
+from filter_index import BitmapSet, FilterIndex, bitmap, iter_bits, parse_criteria
+from geo_index import haversine_miles
+
+
+# Field groups in ranking order: a query matched entirely in an earlier
+# group ranks above one matched in a later group
+FIELD_GROUPS = (
+    ("name", ("name", "operatingName")),
+    ("chain", ("chain", "parentChain")),
+    ("city", ("city",)),
+    ("brands", ("brandsRep",)),
+)
+
+# Matches re-ranked per query; the rest keep document order
+RERANK_CANDIDATES = 100
+
+# Cached prefix bitmaps (per group and prefix)
+PREFIX_CACHE_SIZE = 4096
+
+# Fuzzy matching: allowed edits by query word length
+MIN_FUZZY_LENGTH = 3
+MAX_EDITS = 2
+FUZZY_CANDIDATES = 200
+
+# Proximity searches measure distances directly below this many matches
+SPARSE_MATCHES = 2000
+
+# Without a radius, nearest matches re-ranked per requested result
+NEAREST_CANDIDATES_PER_RESULT = 3
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase ASCII words of a field value ("Johnstone's – Aurora" -> johnstones, aurora)."""
+    if not text:
+        return []
+    text = str(text).casefold()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text.replace("’", ""))
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text.replace("'", ""))
+
+
+def trigrams(word: str) -> set:
+    padded = f"^{word}"
+    return {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+
+
+def prefix_distance(typed: str, word: str, limit: int) -> int:
+    """
+    Levenshtein distance from `typed` to the closest prefix of `word`, or
+    limit + 1 as soon as it must exceed limit.
+    """
+    word = word[:len(typed) + limit]
+    previous = list(range(len(word) + 1))
+    for i, ct in enumerate(typed, 1):
+        current = [i]
+        for j, cw in enumerate(word, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ct != cw)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    # The last row holds the distance to every prefix word[:j]
+    return min(previous)
+
+
+def allowed_edits(word: str) -> int:
+    if len(word) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(word) <= 5 else MAX_EDITS
+
+
+@dataclass
+class TextMatch:
+    """One search result."""
+
+    record: object
+    group: Optional[str]  # group holding every query word, if any
+    cost: int             # total edits over query words
+    miles: Optional[float] = None
+
+
+class TextIndex:
+    """Prefix and trigram index over a FilterIndex's documents."""
+
+    def __init__(self, filters: FilterIndex):
+        self.filters = filters
+        self.records = filters.records
+        # " word word ... " per document, for re-ranking without re-tokenizing
+        self._doc_words: List[str] = []
+        self._coords = [record.routing_coords for record in self.records]
+
+        # Collect ascending doc ids per word, then build each bitmap once
+        doc_ids: Dict[str, Dict[str, List[int]]] = {group: {} for group, _ in FIELD_GROUPS}
+        for doc_id, record in enumerate(self.records):
+            doc_words = set()
+            for group, fields in FIELD_GROUPS:
+                group_ids = doc_ids[group]
+                for word in self._words(record, fields):
+                    group_ids.setdefault(word, []).append(doc_id)
+                    doc_words.add(word)
+            self._doc_words.append(f" {' '.join(sorted(doc_words))} ")
+        self.postings: Dict[str, Dict[str, int]] = {
+            group: {word: bitmap(ids) for word, ids in group_ids.items()}
+            for group, group_ids in doc_ids.items()
+        }
+
+        self.vocabulary: Dict[str, List[str]] = {
+            group: sorted(postings) for group, postings in self.postings.items()
+        }
+        self._trigrams: Dict[str, List[str]] = {}
+        for word in sorted(set().union(*self.postings.values())):
+            for gram in trigrams(word):
+                self._trigrams.setdefault(gram, []).append(word)
+        self._prefix_cache: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+    @classmethod
+    def from_store(cls, store: BranchStore) -> "TextIndex":
+        return cls(FilterIndex.from_store(store))
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def _words(record, fields) -> set:
+        words = set()
+        for field in fields:
+            value = record.get(field)
+            for item in value if isinstance(value, list) else [value]:
+                words.update(tokenize(item))
+        return words
+
+    def prefix_mask(self, group: str, prefix: str) -> int:
+        """Bitmap of documents with a word starting with `prefix` in `group`."""
+        key = (group, prefix)
+        mask = self._prefix_cache.get(key)
+        if mask is not None:
+            self._prefix_cache.move_to_end(key)
+            return mask
+
+        words = self.vocabulary[group]
+        postings = self.postings[group]
+        mask = 0
+        position = bisect_left(words, prefix)
+        while position < len(words) and words[position].startswith(prefix):
+            mask |= postings[words[position]]
+            position += 1
+
+        self._prefix_cache[key] = mask
+        if len(self._prefix_cache) > PREFIX_CACHE_SIZE:
+            self._prefix_cache.popitem(last=False)
+        return mask
+
+    def fuzzy_words(self, typed: str) -> Dict[str, int]:
+        """Vocabulary words whose prefix is within the allowed edits of `typed`."""
+        limit = allowed_edits(typed)
+        if not limit:
+            return {}
+        grams = trigrams(typed)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for word in self._trigrams.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        # Each edit destroys at most three trigrams
+        needed = len(grams) - 3 * limit
+        candidates = sorted((w for w, n in shared.items() if n >= needed),
+                            key=lambda w: (-shared[w], w))[:FUZZY_CANDIDATES]
+        matches = {}
+        for word in candidates:
+            distance = prefix_distance(typed, word, limit)
+            if distance <= limit:
+                matches[word] = distance
+        return matches
+
+    def word_masks(self, typed: str) -> Tuple[Dict[str, int], Optional[Dict[str, int]]]:
+        """
+        Per-group bitmaps for one query word: prefix matches, or else fuzzy
+        matches (returned as word -> edits, None for a prefix match).
+        """
+        masks = {group: self.prefix_mask(group, typed) for group, _ in FIELD_GROUPS}
+        if any(masks.values()):
+            return masks, None
+        fuzzy = self.fuzzy_words(typed)
+        for word in fuzzy:
+            for group, postings in self.postings.items():
+                masks[group] |= postings.get(word, 0)
+        return masks, fuzzy
+
+    def _cost(self, doc_id: int, query: Sequence[Tuple[str, Optional[Dict[str, int]]]]) -> Tuple[int, int]:
+        """(total edits, query words not equal to a whole field word) for re-ranking."""
+        words = self._doc_words[doc_id]
+        cost = partial = 0
+        for typed, fuzzy in query:
+            if f" {typed} " in words:
+                continue
+            partial += 1
+            if fuzzy is not None:
+                cost += min((fuzzy[w] for w in words.split() if w in fuzzy), default=MAX_EDITS + 1)
+        return cost, partial
+
+    def search(self, text: str, criteria: Optional[Dict[str, object]] = None,
+               near: Optional[Tuple[float, float]] = None, radius_miles: Optional[float] = None,
+               k: int = 10) -> List[TextMatch]:
+        """
+        Typeahead matches for `text`, optionally filtered like FilterIndex.search
+        and restricted to radius_miles around `near` (or ordered by distance
+        among equally good text matches).
+        """
+        query = tokenize(text)
+        if not query or k <= 0:
+            return []
+
+        mask = self.filters.match(criteria) if criteria else self.filters.all_docs
+        group_masks = {group: mask for group, _ in FIELD_GROUPS}
+        matched = []
+        for typed in query:
+            if not mask:
+                return []
+            masks, fuzzy = self.word_masks(typed)
+            matched.append((typed, fuzzy))
+            any_group = 0
+            for group, word_mask in masks.items():
+                any_group |= word_mask
+                group_masks[group] &= word_mask
+            mask &= any_group
+        if not mask:
+            return []
+
+        miles = {}
+        if near is not None:
+            limit = min(RERANK_CANDIDATES, NEAREST_CANDIDATES_PER_RESULT * k)
+            miles = self._distances(mask, near, radius_miles, limit)
+        candidates = self._candidates(mask, group_masks, miles if near is not None else None)
+        group_rank = {group: rank for rank, (group, _) in enumerate(FIELD_GROUPS)}
+        ranked = []
+        for doc_id, group in candidates.items():
+            record = self.records[doc_id]
+            cost, partial = self._cost(doc_id, matched)
+            ranked.append((
+                group_rank.get(group, len(FIELD_GROUPS)), cost, partial,
+                miles.get(doc_id, 0.0), len(record.name or ""), doc_id,
+            ))
+        ranked.sort()
+
+        return [TextMatch(record=self.records[doc_id],
+                          group=FIELD_GROUPS[rank][0] if rank < len(FIELD_GROUPS) else None,
+                          cost=cost, miles=miles.get(doc_id) if near is not None else None)
+                for rank, cost, _, _, _, doc_id in ranked[:k]]
+
+    def _distances(self, mask: int, near: Tuple[float, float],
+                   radius_miles: Optional[float], limit: int) -> Dict[int, float]:
+        """
+        Miles to matching documents: all within radius_miles, else the
+        `limit` nearest. Few matches are measured directly; a tree search
+        with a sparse predicate would visit most of the tree.
+        """
+        lat, lon = near
+        if mask.bit_count() <= SPARSE_MATCHES:
+            hits = []
+            for doc_id in iter_bits(mask):
+                doc_lat, doc_lon = self._coords[doc_id]
+                if doc_lat is None or doc_lon is None:
+                    continue
+                miles = haversine_miles(lat, lon, doc_lat, doc_lon)
+                if radius_miles is None or miles <= radius_miles:
+                    hits.append((miles, doc_id))
+            if radius_miles is None:
+                hits = heapq.nsmallest(limit, hits)
+        else:
+            members = BitmapSet(mask, len(self.records)).__contains__
+            if radius_miles is not None:
+                hits = self.filters.geo.within(lat, lon, radius_miles, predicate=members)
+            else:
+                hits = self.filters.geo.nearest(lat, lon, k=limit, predicate=members)
+        return {doc_id: miles for miles, doc_id in hits}
+
+    def _candidates(self, mask: int, group_masks: Dict[str, int],
+                    miles: Optional[Dict[int, float]]) -> Dict[int, Optional[str]]:
+        """
+        Up to RERANK_CANDIDATES document ids mapped to the group holding every
+        query word: single-group matches in group order, then the rest. For
+        proximity searches only documents in `miles` qualify, nearest first.
+        """
+        candidates: Dict[int, Optional[str]] = {}
+        if miles is not None:
+            size = len(self.records)
+            members = [(group, BitmapSet(group_mask, size)) for group, group_mask in group_masks.items()]
+            for doc_id in sorted(miles, key=lambda d: (miles[d], d)):
+                candidates[doc_id] = next((group for group, m in members if doc_id in m), None)
+            # Keep the best groups when the radius holds more than we re-rank
+            rank = {group: i for i, (group, _) in enumerate(FIELD_GROUPS)}
+            best = sorted(candidates, key=lambda d: rank.get(candidates[d], len(rank)))
+            return {d: candidates[d] for d in best[:RERANK_CANDIDATES]}
+
+        remaining = mask
+        for group, _ in FIELD_GROUPS:
+            for doc_id in iter_bits(group_masks[group] & remaining):
+                if len(candidates) >= RERANK_CANDIDATES:
+                    return candidates
+                candidates[doc_id] = group
+            remaining &= ~group_masks[group]
+        for doc_id in iter_bits(remaining):
+            if len(candidates) >= RERANK_CANDIDATES:
+                break
+            candidates[doc_id] = None
+        return candidates
+
+
+def main():
+    """Run one typeahead query."""
+    parser = argparse.ArgumentParser(description="Typeahead search over branch text fields.")
+    parser.add_argument("query", help='Text as typed, e.g. "ferg aur"')
+    parser.add_argument("--root", help="Data directory (default: supply-house-directory)")
+    parser.add_argument("--where", action="append", default=[], metavar="FIELD=VALUE",
+                        help="Filter as in filter_index.py (e.g. trades=HVAC)")
+    parser.add_argument("--lat", type=float, help="Latitude to search near")
+    parser.add_argument("--lon", type=float, help="Longitude to search near")
+    parser.add_argument("--radius", type=float, help="Only branches within this many miles")
+    parser.add_argument("-k", type=int, default=10, help="Number of results (default: %(default)s)")
+    args = parser.parse_args()
+
+    if (args.lat is None) != (args.lon is None):
+        print("Error: --lat and --lon must be given together", file=sys.stderr)
+        return 2
+    try:
+        criteria = parse_criteria(args.where)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    index = TextIndex.from_store(BranchStore.load(args.root))
+    near = (args.lat, args.lon) if args.lat is not None else None
+    try:
+        results = index.search(args.query, criteria=criteria, near=near,
+                               radius_miles=args.radius, k=args.k)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 2
+
+    for i, match in enumerate(results, 1):
+        distance = f"{match.miles:7.2f} mi  " if match.miles is not None else ""
+        fuzzy = f"  (~{match.cost} edits)" if match.cost else ""
+        print(f"{i:3}. {distance}{match.record.name}  ({match.record.get('city', '')})"
+              f"  [{match.group or 'mixed'}]{fuzzy}")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
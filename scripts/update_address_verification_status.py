@@ -10,41 +10,34 @@ This script identifies branches that have:
 And updates their addressVerified field to True and addressSource to reflect the actual sources used.
 """
 
-import json
-import glob
+import os
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+from source_registry import SourceRegistry
+
+# Loaded on first use
+_source_registry = None
+
+
+def get_source_registry():
+    """Source classifications from _meta/sources.json (see source_registry.py)."""
+    global _source_registry
+    if _source_registry is None:
+        _source_registry = SourceRegistry.load()
+    return _source_registry
+
+
 def is_authoritative_source(source_str):
     """
     Determine if a source is authoritative for address verification.
-    """
-    source_lower = source_str.lower()
-    
-    # Google Business Profile is top tier
-    if 'google.com/maps' in source_lower or 'google business' in source_lower:
-        return True, "Google Business Profile"
-    
-    # Official store locators are authoritative
-    if '/locations' in source_lower or '/store' in source_lower or 'locator' in source_lower:
-        return True, "Official Store Locator"
-    
-    # Company's own website location pages are authoritative
-    if ('.com/' in source_lower and 
-        any(keyword in source_lower for keyword in ['/contact', '/about', '/location', 'portal', 'chamber'])):
-        return True, "Official Website"
     
-    # Company's own website (even just homepage) is authoritative for their own locations
-    # Filter out yellow pages, mapquest, and other directories
-    non_authoritative_domains = ['yellowpages', 'mapquest', 'manta', 'alignable', 
-                                   'chamberofcommerce', 'youtube', 'finduslocal', 
-                                   'allpages', 'thebluebook', 'industrialfiltersource']
-    
-    if '.com' in source_lower and not any(domain in source_lower for domain in non_authoritative_domains):
-        # If it's a company's own domain, it's authoritative
-        # Examples: comfortairdistributing.com, rampartsupply.com, etc.
-        return True, "Official Website"
-    
-    return False, None
+    Each distinct source is classified once (source_registry.classify_source)
+    and cached in the source registry; this is a lookup for known sources.
+    Returns (is_authoritative, "Google Business Profile" | "Official Store Locator" |
+    "Official Website" | None).
+    """
+    return get_source_registry().authority(source_str)
 
 def update_verification_status():
     """
@@ -59,21 +52,12 @@ def update_verification_status():
         'files_modified': set()
     }
     
-    files = glob.glob("supply-house-directory/us/**/*.json", recursive=True)
+    store = BranchStore.load()
     
-    for file_path in files:
-        if "/_meta/" in file_path or "STATEWIDE" in file_path:
-            continue
-        
-        modified = False
-        
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+    for branch_file in store.files:
+        file_path = os.path.relpath(branch_file.path, REPO_ROOT)
         
-        if "branches" not in data:
-            continue
-        
-        for branch in data["branches"]:
+        for branch in branch_file.branches:
             stats['total_processed'] += 1
             verification = branch.get('verification', {})
             
@@ -133,15 +117,18 @@ def update_verification_status():
                 
                 stats['newly_verified'] += 1
                 stats['files_modified'].add(file_path)
-                modified = True
+                branch_file.mark_modified()
             else:
                 stats['non_authoritative_only'] += 1
-        
-        # Write back if modified
-        if modified:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                f.write('\n')  # Add trailing newline
+    
+    # Write back modified files
+    store.save_modified()
+    
+    # Persist classifications of sources seen for the first time
+    registry = get_source_registry()
+    stats['sources_registered'] = len(registry.added)
+    if registry.added:
+        registry.save()
     
     return stats
 
@@ -164,6 +151,8 @@ def main():
     print(f"Non-authoritative sources only: {stats['non_authoritative_only']}")
     print()
     print(f"Files modified: {len(stats['files_modified'])}")
+    if stats['sources_registered']:
+        print(f"New sources registered in _meta/sources.json: {stats['sources_registered']}")
     print()
     
     total_verified = stats['already_verified'] + stats['newly_verified']
@@ -177,7 +166,6 @@ def main():
     if stats['files_modified']:
         print()
         print("Modified files:")
-        import os
         cwd = os.getcwd()
         for f in sorted(stats['files_modified']):
             # Show relative path
@@ -11,11 +11,11 @@ This script checks:
 6. Flag potential road-centerline snapping
 """
 
-import json
 import math
 import os
 import sys
-from pathlib import Path
+
+from branch_store import BranchStore, REPO_ROOT
 
 # Constants
 COLORADO_BOUNDS = {
@@ -114,55 +114,23 @@ def validate_branch(branch, file_path):
     return len(errors) == 0, warnings, errors
 
 
-def find_branch_files(base_dir):
-    """Find all JSON files containing branch data."""
-    branch_files = []
-    
-    for root, dirs, files in os.walk(base_dir):
-        if '_meta' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.json') and not file.startswith('_'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if "branches" in data:
-                            branch_files.append(file_path)
-                except:
-                    pass
-    
-    return sorted(branch_files)
-
-
-def validate_file(file_path, repo_root):
+def validate_file(branch_file, repo_root):
     """
-    Validate all branches in a file.
+    Validate all branches in a branch file, in a single pass.
     
     Returns: (total, valid, invalid, all_warnings, all_errors)
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        return 0, 0, 0, [], [f"Error reading file: {e}"]
-    
-    branches = data.get("branches", [])
-    if not branches:
-        return 0, 0, 0, [], []
-    
-    total = len(branches)
+    total = 0
     valid = 0
     invalid = 0
     all_warnings = []
     all_errors = []
     
-    rel_path = os.path.relpath(file_path, repo_root)
+    rel_path = os.path.relpath(branch_file.path, repo_root)
     
-    for branch in branches:
-        is_valid, warnings, errors = validate_branch(branch, file_path)
+    for branch in branch_file.branches:
+        total += 1
+        is_valid, warnings, errors = validate_branch(branch, branch_file.path)
         
         if is_valid and not warnings:
             valid += 1
@@ -186,8 +154,7 @@ def validate_file(file_path, repo_root):
 
 def main():
     """Main validation function."""
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    repo_root = REPO_ROOT
     supply_dir = repo_root / "supply-house-directory"
     
     if not supply_dir.exists():
@@ -199,8 +166,9 @@ def main():
     print("=" * 80)
     print()
     
-    # Find all branch files
-    branch_files = find_branch_files(supply_dir)
+    # Discover branch files; each is streamed while it is validated
+    store = BranchStore.stream(supply_dir)
+    branch_files = store.files
     
     if not branch_files:
         print("No branch files found!", file=sys.stderr)
@@ -216,8 +184,16 @@ def main():
     all_warnings = []
     all_errors = []
     
-    for file_path in branch_files:
-        total, valid, invalid, warnings, errors = validate_file(file_path, repo_root)
+    for rel_path, error in store.load_errors:
+        total_invalid += 1
+        all_errors.append({
+            "file": rel_path,
+            "branch": "(file)",
+            "errors": [f"Error reading file: {error}"]
+        })
+    
+    for branch_file in branch_files:
+        total, valid, invalid, warnings, errors = validate_file(branch_file, repo_root)
         
         total_branches += total
         total_valid += valid
@@ -6,12 +6,12 @@ This script validates that all supply house branches have the required
 geo precision metadata fields and that the values are valid.
 """
 
-import json
 import os
 import sys
-from pathlib import Path
 from datetime import datetime
 
+from branch_store import BranchStore, REPO_ROOT
+
 
 class ValidationError(Exception):
     """Custom exception for validation errors."""
@@ -129,60 +129,26 @@ def validate_branch(branch, file_path):
     return errors
 
 
-def validate_json_file(file_path):
+def validate_branch_file(branch_file):
     """
-    Validate a single JSON file.
+    Validate all branches in a branch file, in a single pass.
     
     Returns (total_branches, errors) tuple.
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        return (0, [f"JSON parse error in {file_path}: {e}"])
-    except Exception as e:
-        return (0, [f"Error reading {file_path}: {e}"])
-    
-    branches = data.get("branches", [])
-    if not branches:
-        return (0, [])
-    
+    total = 0
     all_errors = []
-    for branch in branches:
-        branch_errors = validate_branch(branch, file_path)
+    for branch in branch_file.branches:
+        total += 1
+        branch_errors = validate_branch(branch, branch_file.path)
         all_errors.extend(branch_errors)
     
-    return (len(branches), all_errors)
-
-
-def find_branch_files(base_dir):
-    """Find all JSON files containing branch data."""
-    branch_files = []
-    
-    for root, dirs, files in os.walk(base_dir):
-        if '_meta' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.json') and not file.startswith('_'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if "branches" in data:
-                            branch_files.append(file_path)
-                except:
-                    pass
-    
-    return sorted(branch_files)
+    return (total, all_errors)
 
 
 def main():
     """Main validation function."""
     # Determine base directory
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
+    repo_root = REPO_ROOT
     supply_dir = repo_root / "supply-house-directory"
     
     if not supply_dir.exists():
@@ -194,8 +160,9 @@ def main():
     print("=" * 80)
     print()
     
-    # Find all branch files
-    branch_files = find_branch_files(supply_dir)
+    # Discover branch files; each is streamed while it is validated
+    store = BranchStore.stream(supply_dir)
+    branch_files = store.files
     
     if not branch_files:
         print("No branch files found!", file=sys.stderr)
@@ -209,9 +176,13 @@ def main():
     all_errors = []
     files_with_errors = 0
     
-    for file_path in branch_files:
-        rel_path = os.path.relpath(file_path, repo_root)
-        branches, errors = validate_json_file(file_path)
+    for rel_path, error in store.load_errors:
+        files_with_errors += 1
+        all_errors.append(f"[{rel_path}] Error reading file: {error}")
+    
+    for branch_file in branch_files:
+        rel_path = os.path.relpath(branch_file.path, repo_root)
+        branches, errors = validate_branch_file(branch_file)
         
         total_branches += branches
         
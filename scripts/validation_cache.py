@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of validation verdicts for the validation engine.
+
+A CI run after a one-file commit should not re-check every branch. The cache
+remembers, for each branch file, its size, mtime and SHA-256 plus the content
+hash, id and name of every branch it contains, and for each branch content
+hash the issues the rule set reported. On the next run:
+
+- files whose size and mtime are unchanged, or whose bytes still hash to the
+  stored SHA-256 (a fresh checkout gives every file a new mtime), reuse
+  their stored entry; when every branch in it has a verdict, the engine
+  reports the file without parsing it at all;
+- branches whose content hash already has a verdict reuse it, even if the
+  branch moved to another file;
+- only new or edited branches are passed to the rules.
+
+Verdicts are only valid for the rule set that produced them, so the cache is
+discarded whenever the rule-set fingerprint (rule names and versions)
+changes. Rules that compare against today's date (verification age, dates in
+the future) add the date to the fingerprint, so their verdicts are only
+reused on the day they were computed.
+
+Usage:
+    cache = ValidationCache.load(DEFAULT_CACHE_PATH, engine.fingerprint)
+    report = engine.run(store, cache=cache)
+    cache.save()
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from branch_store import REPO_ROOT, BranchFile
+
+
+DEFAULT_CACHE_PATH = REPO_ROOT / "build" / "validation-cache.json"
+
+# Bump when the cache layout changes
+CACHE_VERSION = 2
+
+
+def branch_hash(branch: dict) -> str:
+    """Stable content hash of a branch, independent of key order and formatting."""
+    canonical = json.dumps(branch, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def file_hash(path) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """
+    Branch verdicts keyed by content hash, plus per-file fingerprints.
+
+    Issues are stored as plain [severity, message, data] lists tagged with the
+    rule that produced them, so the cache does not depend on the engine's
+    classes.
+    """
+
+    def __init__(self, path, ruleset: str):
+        self.path = Path(path)
+        self.ruleset = ruleset
+        self.files: Dict[str, dict] = {}
+        self.verdicts: Dict[str, List[list]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._seen_files = set()
+        self._seen_verdicts = set()
+
+    @classmethod
+    def load(cls, path=DEFAULT_CACHE_PATH, ruleset: str = ""):
+        """Load a cache from disk; a missing, unreadable or stale cache starts empty."""
+        cache = cls(path, ruleset)
+        try:
+            with open(cache.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return cache
+
+        if data.get("version") != CACHE_VERSION or data.get("ruleset") != ruleset:
+            return cache
+
+        cache.files = data.get("files", {})
+        cache.verdicts = data.get("verdicts", {})
+        return cache
+
+    def file_entry(self, branch_file: BranchFile) -> Optional[dict]:
+        """
+        The stored entry of a file unchanged on disk since the last run, or None.
+
+        Matching size and mtime are trusted; otherwise a matching SHA-256 of
+        the file's bytes is, and the stored mtime is refreshed. Files edited
+        in memory never match.
+        """
+        self._seen_files.add(branch_file.rel_path)
+        entry = self.files.get(branch_file.rel_path)
+        if not entry or branch_file.modified:
+            return None
+        try:
+            stat = os.stat(branch_file.path)
+        except OSError:
+            return None
+        if entry["size"] != stat.st_size:
+            return None
+        if entry["mtime_ns"] != stat.st_mtime_ns:
+            if entry["sha256"] != file_hash(branch_file.path):
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return entry
+
+    def cached_file(self, branch_file: BranchFile) -> Optional[dict]:
+        """file_entry(), but only if every branch in it has a verdict."""
+        entry = self.file_entry(branch_file)
+        if entry is None or not all(h in self.verdicts for h in entry["branches"]):
+            return None
+        return entry
+
+    def put_file(self, branch_file: BranchFile, hashes: List[str], ids: List[list]):
+        """Store the branch hashes and [id, name] pairs of a file as it is on disk."""
+        if branch_file.modified:
+            return
+        try:
+            stat = os.stat(branch_file.path)
+        except OSError:
+            return
+        self._seen_files.add(branch_file.rel_path)
+        self.files[branch_file.rel_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(branch_file.path),
+            "branches": hashes,
+            "ids": ids,
+        }
+
+    def branch_hashes(self, branch_file: BranchFile) -> List[str]:
+        """
+        Content hashes of the branches in a file, in file order.
+
+        Uses the stored hashes when the file on disk is unchanged since the
+        last run (and has not been edited in memory).
+        """
+        entry = self.file_entry(branch_file)
+        if entry is not None:
+            return entry["branches"]
+
+        hashes, ids = [], []
+        for branch in branch_file.branches:
+            hashes.append(branch_hash(branch))
+            ids.append([branch.get("id", "unknown"), branch.get("name", "unknown")])
+        self.put_file(branch_file, hashes, ids)
+        return hashes
+
+    def get(self, content_hash: str) -> Optional[List[list]]:
+        """Cached [rule, severity, message, data] entries for a branch, if any."""
+        issues = self.verdicts.get(content_hash)
+        if issues is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._seen_verdicts.add(content_hash)
+        return issues
+
+    def put(self, content_hash: str, issues: List[list]):
+        self.verdicts[content_hash] = issues
+        self._seen_verdicts.add(content_hash)
+
+    def save(self, prune: bool = True):
+        """
+        Write the cache atomically.
+
+        With prune=True, entries for files and branches not seen during this
+        run are dropped so the cache does not grow without bound.
+        """
+        files = self.files
+        verdicts = self.verdicts
+        if prune:
+            files = {k: v for k, v in files.items() if k in self._seen_files}
+            verdicts = {k: v for k, v in verdicts.items() if k in self._seen_verdicts}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": CACHE_VERSION,
+                "ruleset": self.ruleset,
+                "files": dict(sorted(files.items())),
+                "verdicts": verdicts,
+            }, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, self.path)
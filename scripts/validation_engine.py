@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Pluggable single-pass validation engine for supply house branches.
+
+validate_geo_precision.py, validate_arrival_coordinates.py,
+detect_road_centerline_coords.py and identify_road_snapped_coords.py each
+walk the whole tree and print their own report. This module registers their
+checks as rules and runs every rule over every branch in one traversal of a
+BranchStore, producing a single structured result set.
+
+Each rule is a function that takes a branch dictionary and returns a list of
+Issue tuples. Rules are registered with the @rule decorator; adding a rule
+adds its own per-branch cost but never another pass over the data.
+
+    @rule("my_check", "Describe what is checked")
+    def check_something(branch):
+        if ...:
+            return [Issue(ERROR, "Something is wrong")]
+        return []
+
+The individual check functions still live in (and are imported from) the
+original validator scripts, which remain available as focused reports.
+
+Usage:
+    python3 scripts/validation_engine.py
+    python3 scripts/validation_engine.py --rule arrival_coordinates --json results.json
+    python3 scripts/validation_engine.py --list-rules
+    python3 scripts/validation_engine.py --no-cache
+    python3 scripts/validation_engine.py --no-cache --stream   # constant memory per file
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import detect_road_centerline_coords as centerline
+import identify_road_snapped_coords as road_snap
+import validate_arrival_coordinates as arrival
+import validate_geo_precision as geo_precision
+from branch_store import BranchRecord, BranchStore, write_json
+from validation_cache import DEFAULT_CACHE_PATH, ValidationCache, branch_hash
+
+
+# Severity levels, most severe first
+ERROR = "error"
+WARNING = "warning"
+INFO = "info"
+SEVERITIES = (ERROR, WARNING, INFO)
+
+
+class Issue(NamedTuple):
+    """A single problem reported by a rule for one branch."""
+
+    severity: str
+    message: str
+    data: Optional[dict] = None
+
+
+@dataclass
+class Rule:
+    """A registered validation rule."""
+
+    name: str
+    description: str
+    check: Callable[[dict], List[Issue]]
+    version: int = 1
+    # The verdict depends on today's date, not only on the branch
+    volatile: bool = False
+
+
+@dataclass
+class Finding:
+    """An Issue attributed to a rule, a branch and its file."""
+
+    rule: str
+    severity: str
+    message: str
+    branch_id: str
+    branch_name: str
+    file: str
+    data: Optional[dict] = None
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(name, description, version=1, volatile=False):
+    """
+    Register a validation rule.
+
+    Bump `version` whenever the rule's logic changes so cached results keyed on
+    the rule-set fingerprint are invalidated. Set `volatile` for rules whose
+    verdict depends on the current date (ages, future dates), so cached
+    results are only reused on the day they were computed.
+    """
+    def decorator(check):
+        if name in RULES:
+            raise ValueError(f"Rule '{name}' is already registered")
+        RULES[name] = Rule(name=name, description=description, check=check, version=version,
+                           volatile=volatile)
+        return check
+    return decorator
+
+
+def ruleset_fingerprint(rules: Iterable[Rule], today: Optional[str] = None) -> str:
+    """
+    Stable identifier for a set of rules and their versions.
+
+    Volatile rules also contribute `today` (default: the current date), so
+    the fingerprint of a set that includes one changes every day.
+    """
+    today = today or date.today().isoformat()
+    digest = hashlib.sha256()
+    for r in sorted(rules, key=lambda r: r.name):
+        key = f"{r.name}:{r.version}@{today}" if r.volatile else f"{r.name}:{r.version}"
+        digest.update(f"{key}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# Built-in rules
+# ---------------------------------------------------------------------------
+
+@rule("geo_metadata", "geoPrecision, geoVerifiedDate and geoSource are present and valid",
+      volatile=True)
+def check_geo_metadata(branch):
+    missing = [f for f in ("geoPrecision", "geoVerifiedDate", "geoSource") if f not in branch]
+    if missing:
+        return [Issue(ERROR, f"Missing '{f}' field") for f in missing]
+
+    issues = []
+    for validate, field_name in (
+        (geo_precision.validate_geo_precision, "geoPrecision"),
+        (geo_precision.validate_geo_verified_date, "geoVerifiedDate"),
+        (geo_precision.validate_geo_source, "geoSource"),
+    ):
+        try:
+            validate(branch[field_name])
+        except geo_precision.ValidationError as e:
+            issues.append(Issue(ERROR, str(e)))
+
+    if branch.get("geoPrecision") == "centroid":
+        issues.append(Issue(
+            WARNING, "geoPrecision='centroid' indicates coordinates may need refinement"
+        ))
+    return issues
+
+
+@rule("coordinate_bounds", "Display coordinates fall inside the state bounds")
+def check_coordinate_bounds(branch):
+    if "lat" not in branch or "lon" not in branch:
+        return []
+    try:
+        geo_precision.validate_coordinates(branch["lat"], branch["lon"])
+    except geo_precision.ValidationError as e:
+        return [Issue(ERROR, str(e))]
+    return []
+
+
+@rule("arrival_coordinates", "Arrival coordinates exist, are in bounds and sit near the display pin")
+def check_arrival_coordinates(branch):
+    _, warnings, errors = arrival.validate_branch(branch, None)
+    return [Issue(ERROR, e) for e in errors] + [Issue(WARNING, w) for w in warnings]
+
+
+@rule("coordinate_precision", "Coordinates carry enough decimal places for the location type")
+def check_coordinate_precision(branch):
+    lat = branch.get("lat")
+    lon = branch.get("lon")
+    if lat is None or lon is None:
+        return []
+
+    issues = []
+    is_precise, precision_level, warning = centerline.check_coordinate_precision(lat, lon)
+    if warning:
+        issues.append(Issue(WARNING, warning, {"precision": precision_level}))
+
+    should_be_precise, reason = centerline.should_have_precise_coords(branch)
+    if should_be_precise and not is_precise:
+        issues.append(Issue(
+            WARNING, f"{reason} but coordinate precision is only {precision_level}",
+            {"precision": precision_level},
+        ))
+    return issues
+
+
+@rule("round_numbers", "Coordinates do not end in suspiciously round digits")
+def check_round_numbers(branch):
+    lat = branch.get("lat")
+    lon = branch.get("lon")
+    if lat is None or lon is None:
+        return []
+    return [Issue(WARNING, w) for w in centerline.check_round_numbers(lat, lon)]
+
+
+@rule("centerline_patterns", "No centroid precision or vague entrance pins on boulevards/parkways",
+      version=2)
+def check_centerline_patterns(branch):
+    if branch.get("lat") is None or branch.get("lon") is None:
+        return []
+
+    issues = []
+    geo_precision_value = branch.get("geoPrecision")
+
+    if geo_precision_value == "centroid":
+        issues.append(Issue(ERROR, "geoPrecision is 'centroid' - coordinate needs refinement"))
+
+    if centerline.is_vague_entrance_on_major_road(branch):
+        issues.append(Issue(
+            WARNING,
+            "Generic 'entrance' precision on Boulevard/Parkway with non-specific source",
+        ))
+    return issues
+
+
+@rule("road_snap_risk", "Risk score for road-snapped coordinates stays below the review threshold",
+      volatile=True)
+def check_road_snap_risk(branch):
+    score, reasons = road_snap.calculate_risk_score(branch)
+    if score < 20:
+        return []
+    level = road_snap.categorize_risk(score)
+    return [Issue(WARNING, f"Road-snap risk {level} (score {score})",
+                  {"score": score, "reasons": reasons})]
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ValidationReport:
+    """Results of one engine run."""
+
+    ruleset: str
+    rules: List[str]
+    files: int = 0
+    branches: int = 0
+    evaluated: int = 0
+    findings: List[Finding] = field(default_factory=list)
+    generated: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+    def count(self, severity=None, rule_name=None):
+        return sum(
+            1 for f in self.findings
+            if (severity is None or f.severity == severity)
+            and (rule_name is None or f.rule == rule_name)
+        )
+
+    @property
+    def passed(self):
+        return self.count(ERROR) == 0
+
+    def add(self, results, branch_id, branch_name, rel_path):
+        """Record the (rule name, issue) pairs reported for one branch."""
+        for rule_name, issue in results:
+            self.findings.append(Finding(
+                rule=rule_name,
+                severity=issue.severity,
+                message=issue.message,
+                branch_id=branch_id,
+                branch_name=branch_name,
+                file=rel_path,
+                data=issue.data,
+            ))
+
+    def to_dict(self):
+        return {
+            "generated": self.generated,
+            "ruleset": self.ruleset,
+            "rules": self.rules,
+            "summary": {
+                "files": self.files,
+                "branches": self.branches,
+                "evaluated": self.evaluated,
+                "errors": self.count(ERROR),
+                "warnings": self.count(WARNING),
+                "byRule": {
+                    name: {s: self.count(s, name) for s in SEVERITIES}
+                    for name in self.rules
+                },
+            },
+            "findings": [asdict(f) for f in self.findings],
+        }
+
+    def format_text(self, max_examples=5):
+        """Human-readable report grouped by rule."""
+        lines = [
+            "=" * 80,
+            "Branch Validation Report",
+            "=" * 80,
+            f"Rule set:       {self.ruleset} ({len(self.rules)} rules)",
+            f"Files:          {self.files}",
+            f"Branches:       {self.branches} ({self.evaluated} evaluated, "
+            f"{self.branches - self.evaluated} cached)",
+            f"Errors:         {self.count(ERROR)}",
+            f"Warnings:       {self.count(WARNING)}",
+            "",
+        ]
+
+        for name in self.rules:
+            errors = self.count(ERROR, name)
+            warnings = self.count(WARNING, name)
+            status = "❌" if errors else ("⚠️ " if warnings else "✅")
+            lines.append(f"{status} {name:24} {errors:4} errors  {warnings:4} warnings")
+        lines.append("")
+
+        for name in self.rules:
+            findings = [f for f in self.findings if f.rule == name and f.severity != INFO]
+            if not findings:
+                continue
+
+            lines.append("-" * 80)
+            lines.append(f"{name}: {RULES[name].description}")
+            lines.append("-" * 80)
+
+            by_message = {}
+            for f in findings:
+                by_message.setdefault((f.severity, f.message), []).append(f)
+
+            for (severity, message), items in sorted(
+                by_message.items(), key=lambda x: (SEVERITIES.index(x[0][0]), -len(x[1]))
+            ):
+                icon = "❌" if severity == ERROR else "⚠️ "
+                lines.append(f"{icon} {message}")
+                lines.append(f"   Affects {len(items)} branch(es)")
+                for f in items[:max_examples]:
+                    lines.append(f"   - {f.branch_name} ({f.file})")
+                if len(items) > max_examples:
+                    lines.append(f"   ... and {len(items) - max_examples} more")
+            lines.append("")
+
+        lines.append("=" * 80)
+        if self.passed:
+            lines.append("✅ VALIDATION PASSED" + (" WITH WARNINGS" if self.count(WARNING) else ""))
+        else:
+            lines.append(f"❌ VALIDATION FAILED: {self.count(ERROR)} errors")
+        return "\n".join(lines)
+
+
+class ValidationEngine:
+    """Runs a set of registered rules over branches in a single traversal."""
+
+    def __init__(self, rule_names: Optional[Iterable[str]] = None):
+        names = list(rule_names) if rule_names is not None else list(RULES)
+        unknown = [n for n in names if n not in RULES]
+        if unknown:
+            raise KeyError(f"Unknown rule(s): {', '.join(unknown)}")
+        self.rules = [RULES[n] for n in names]
+        self.fingerprint = ruleset_fingerprint(self.rules)
+
+    def check_branch(self, branch) -> List[Tuple[str, Issue]]:
+        """Run every rule on one branch; returns (rule name, issue) pairs."""
+        results = []
+        for r in self.rules:
+            for issue in r.check(branch):
+                results.append((r.name, issue))
+        return results
+
+    def _check_hashed(self, branch, content_hash, cache):
+        """check_branch(), reusing the cached verdict for this content hash."""
+        cached = cache.get(content_hash)
+        if cached is not None:
+            return [(rule_name, Issue(severity, message, data))
+                    for rule_name, severity, message, data in cached], False
+
+        results = self.check_branch(branch)
+        cache.put(content_hash, [[rule_name, issue.severity, issue.message, issue.data]
+                                 for rule_name, issue in results])
+        return results, True
+
+    def _check_cached(self, record, cache, file_hashes):
+        """
+        check_branch() for a record, reusing a cached verdict for unchanged content.
+
+        With file_hashes None (a store not read from the working tree, such
+        as a git revision), branches are hashed directly and the per-file
+        entries, which describe the working-tree files, are not consulted.
+        """
+        if file_hashes is None:
+            content_hash = branch_hash(record.data)
+        else:
+            hashes = file_hashes.get(record.file.rel_path)
+            if hashes is None:
+                hashes = file_hashes[record.file.rel_path] = cache.branch_hashes(record.file)
+            content_hash = hashes[record.position]
+        return self._check_hashed(record.data, content_hash, cache)
+
+    def _run_file(self, report, branch_file, cache):
+        """
+        Validate one working-tree file with the cache.
+
+        A file whose cache entry is current and fully covered by verdicts is
+        reported from the cache without being read; any other file is read
+        once, hashing and checking each branch as it goes.
+        """
+        entry = cache.cached_file(branch_file)
+        if entry is not None:
+            for content_hash, (branch_id, branch_name) in zip(entry["branches"], entry["ids"]):
+                results, _ = self._check_hashed(None, content_hash, cache)
+                report.branches += 1
+                report.add(results, branch_id, branch_name, branch_file.rel_path)
+            return
+
+        hashes, ids = [], []
+        for branch in branch_file.branches:
+            record = BranchRecord(data=branch, file=branch_file, position=len(hashes))
+            content_hash = branch_hash(branch)
+            hashes.append(content_hash)
+            ids.append([record.id, record.name])
+            results, evaluated = self._check_hashed(branch, content_hash, cache)
+            report.branches += 1
+            report.evaluated += evaluated
+            report.add(results, record.id, record.name, branch_file.rel_path)
+        cache.put_file(branch_file, hashes, ids)
+
+    def run(self, store: BranchStore, records=None,
+            cache: Optional[ValidationCache] = None) -> ValidationReport:
+        """
+        Validate every branch in `store` (or just `records`, if given).
+
+        With a ValidationCache, branches whose content is unchanged since the
+        cached run reuse their verdicts and only new or edited branches are
+        evaluated; for a whole-store run on the working tree, unchanged files
+        are checked against the cache before they are read. The cache must
+        have been loaded for this engine's fingerprint. Files that failed to
+        load are reported as errors under the pseudo-rule "load".
+        """
+        if cache is not None and cache.ruleset != self.fingerprint:
+            raise ValueError("Validation cache was built for a different rule set")
+
+        report = ValidationReport(ruleset=self.fingerprint, rules=[r.name for r in self.rules])
+        report.files = len(store.files)
+        file_hashes = {} if store.on_disk else None
+
+        for rel_path, error in store.load_errors:
+            report.findings.append(Finding(
+                rule="load", severity=ERROR, message=f"Error reading file: {error}",
+                branch_id="", branch_name="(file)", file=rel_path,
+            ))
+
+        if records is None and cache is not None and file_hashes is not None:
+            for branch_file in store.files:
+                self._run_file(report, branch_file, cache)
+            return report
+
+        for record in (records if records is not None else store.branches()):
+            report.branches += 1
+            if cache is None:
+                results, evaluated = self.check_branch(record.data), True
+            else:
+                results, evaluated = self._check_cached(record, cache, file_hashes)
+            report.evaluated += evaluated
+            report.add(results, record.id, record.name, record.file.rel_path)
+
+        return report
+
+
+def main():
+    """Run all (or selected) validation rules and print a report."""
+    parser = argparse.ArgumentParser(description="Validate every branch in a single pass.")
+    parser.add_argument("--rule", action="append", dest="rules", metavar="NAME",
+                        help="Only run this rule (repeatable)")
+    parser.add_argument("--json", metavar="PATH",
+                        help="Also write structured results to PATH ('-' for stdout only)")
+    parser.add_argument("--list-rules", action="store_true", help="List registered rules and exit")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_PATH), metavar="PATH",
+                        help="Verdict cache location (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Evaluate every branch and leave the cache untouched")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read branch files incrementally instead of loading them whole "
+                             "(always done with the cache, so unchanged files are not parsed)")
+    args = parser.parse_args()
+
+    if args.list_rules:
+        for r in RULES.values():
+            print(f"{r.name:24} v{r.version}  {r.description}")
+        return 0
+
+    try:
+        engine = ValidationEngine(args.rules)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 2
+
+    cache = None if args.no_cache else ValidationCache.load(args.cache, engine.fingerprint)
+    # With the cache, files are only discovered here; unchanged ones are never parsed
+    store = BranchStore.stream() if args.stream or cache is not None else BranchStore.load()
+    report = engine.run(store, cache=cache)
+    if cache is not None:
+        cache.save()
+
+    if args.json == "-":
+        json.dump(report.to_dict(), sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(report.format_text())
+        if args.json:
+            write_json(args.json, report.to_dict())
+            print(f"\nWrote structured results to {args.json}")
+
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())